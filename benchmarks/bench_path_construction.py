@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per entry cost of building the :class:`~fsxpathlib.path.FsxPath` of a
+directory listing entry, the public constructor vs ``_make_descendant``. No FSx
+connection is needed. Usage::
+
+    python benchmarks/bench_path_construction.py
+"""
+
+import timeit
+
+from fsxpathlib.path import FsxPath
+
+N = 100000
+
+parent = FsxPath("server", "share", "database", "table", "year=2023", "month=01")
+names = [f"part-{i:05d}.parquet" for i in range(1000)]
+
+
+def construct():
+    for name in names:
+        str(FsxPath(parent, name))
+
+
+def make_descendant():
+    for name in names:
+        str(parent._make_descendant(name))
+
+
+def main():
+    number = N // len(names)
+    for func in [construct, make_descendant]:
+        elapsed = min(timeit.repeat(func, number=number, repeat=5))
+        print(f"{func.__name__:>12}: {elapsed / N * 1e6:.2f} us per entry")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+
+"""
+Parallel bulk delete, retention cleanup and move.
+
+Deleting a file or a directory on FSx costs at least one round trip, so
+deleting many entries one at a time is bounded by the network latency.
+:class:`BulkRemover` keeps ``workers`` requests in flight: directories are
+listed concurrently, files are deleted concurrently as soon as their parent
+is listed, a directory is removed as soon as all its children are removed.
+"""
+
+import stat
+import fnmatch
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Tuple, Iterable, Callable, Optional, Union
+
+from .hashes import DEFAULT_WORKERS
+from .helper import repr_data_size, get_cutoff
+from .logger import logger, TAB1
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .path import FsxPath
+
+DEFAULT_LOG_EVERY = 1000
+
+
+class BulkResult:
+    """
+    Summary of a bulk operation.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(self):
+        self.n_files = 0
+        self.n_dirs = 0
+        self.n_bytes = 0
+        self.errors: List[Tuple['FsxPath', Exception]] = list()
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(n_files={self.n_files}, "
+            f"n_dirs={self.n_dirs}, n_bytes={repr_data_size(self.n_bytes)}, "
+            f"n_errors={len(self.errors)})"
+        )
+
+    @property
+    def n_done(self) -> int:
+        """
+        Number of files and directories processed successfully.
+        """
+        return self.n_files + self.n_dirs
+
+    @property
+    def ok(self) -> bool:
+        return len(self.errors) == 0
+
+
+class _Progress:
+    """
+    Thread safe progress reporting of a bulk operation.
+    """
+
+    def __init__(
+        self,
+        result: BulkResult,
+        on_progress: Callable[[BulkResult], None] = None,
+        log_every: int = DEFAULT_LOG_EVERY,
+    ):
+        self.result = result
+        self.on_progress = on_progress
+        self.log_every = log_every
+        self._lock = threading.Lock()
+
+    def report(
+        self,
+        fpath: 'FsxPath',
+        error: Exception = None,
+        is_dir: bool = False,
+        size: int = 0,
+    ):
+        with self._lock:
+            if error is not None:
+                self.result.errors.append((fpath, error))
+            elif is_dir:
+                self.result.n_dirs += 1
+            else:
+                self.result.n_files += 1
+                self.result.n_bytes += size
+            n = self.result.n_done + len(self.result.errors)
+        if self.log_every and (n % self.log_every == 0):
+            logger.info(f"{TAB1}processed {n} entries, {len(self.result.errors)} errors")
+        if self.on_progress is not None:
+            self.on_progress(self.result)
+
+    def log_done(self, verb: str):
+        logger.info(
+            f"{TAB1}done, {verb} {self.result.n_files} files "
+            f"({repr_data_size(self.result.n_bytes)}) and "
+            f"{self.result.n_dirs} dirs, {len(self.result.errors)} errors"
+        )
+
+
+class _DirNode:
+    """
+    A directory being removed, it can be removed once ``pending`` drops to 0.
+    """
+
+    __slots__ = ("fpath", "parent", "pending", "failed")
+
+    def __init__(self, fpath: 'FsxPath', parent: Optional['_DirNode']):
+        self.fpath = fpath
+        self.parent = parent
+        self.pending = 0
+        self.failed = False
+
+
+class BulkRemover:
+    """
+    Remove files and directory trees with a thread pool.
+
+    :param workers: number of concurrent SMB requests.
+    :param on_progress: called with the :class:`BulkResult` after every
+        processed entry, from the worker threads. Keep it cheap.
+    :param log_every: log the progress every this many entries, 0 to disable.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        on_progress: Callable[[BulkResult], None] = None,
+        log_every: int = DEFAULT_LOG_EVERY,
+    ):
+        if workers < 1:
+            raise ValueError("workers cannot smaller than 1")
+        self.workers = workers
+        self.on_progress = on_progress
+        self.log_every = log_every
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._outstanding = 0
+        self._executor: ThreadPoolExecutor = None
+        self._fatal: BaseException = None
+        self._progress: _Progress = None
+        self.result: BulkResult = None
+
+    def _report(self, fpath: 'FsxPath', **kwargs):
+        self._progress.report(fpath, **kwargs)
+
+    def _submit(self, func, *args):
+        self._executor.submit(self._run, func, *args)
+
+    def _run(self, func, *args):
+        try:
+            func(*args)
+        except BaseException as e:  # pragma: no cover, abort on bug
+            self._fatal = e
+            self._done.set()
+
+    def _child_done(self, node: Optional[_DirNode], ok: bool):
+        """
+        Called when a child of ``node`` is removed or failed. ``None`` means
+        a top level entry.
+        """
+        with self._lock:
+            if node is None:
+                self._outstanding -= 1
+                if self._outstanding == 0:
+                    self._done.set()
+                return
+            node.pending -= 1
+            if not ok:
+                node.failed = True
+            ready = node.pending == 0
+        if ready:
+            self._finish_dir(node)
+
+    def _finish_dir(self, node: _DirNode):
+        if node.failed:  # cannot remove a non-empty directory
+            self._child_done(node.parent, ok=False)
+        else:
+            self._submit(self._remove_dir, node)
+
+    def _remove_file(self, fpath: 'FsxPath', parent: Optional[_DirNode]):
+        try:
+            size = fpath._stat().st_size  # usually cached by the listing
+            fpath.remove()
+        except OSError as e:
+            self._report(fpath, error=e)
+            self._child_done(parent, ok=False)
+        else:
+            self._report(fpath, size=size)
+            self._child_done(parent, ok=True)
+
+    def _remove_dir(self, node: _DirNode):
+        try:
+            node.fpath.rmdir()
+        except OSError as e:
+            self._report(node.fpath, error=e)
+            self._child_done(node.parent, ok=False)
+        else:
+            self._report(node.fpath, is_dir=True)
+            self._child_done(node.parent, ok=True)
+
+    def _list_dir(self, node: _DirNode):
+        try:
+            dirs, files = node.fpath._scandir()
+        except OSError as e:
+            self._report(node.fpath, error=e)
+            self._child_done(node.parent, ok=False)
+            return
+        with self._lock:
+            node.pending = len(dirs) + len(files)
+        if node.pending == 0:
+            self._finish_dir(node)
+            return
+        for p in files:
+            self._submit(self._remove_file, p, node)
+        for p in dirs:
+            child = _DirNode(p, node)
+            if stat.S_ISLNK(p._stat().st_mode):  # remove the link only
+                self._submit(self._remove_dir, child)
+            else:
+                self._submit(self._list_dir, child)
+
+    def run(
+        self,
+        files: Iterable['FsxPath'] = tuple(),
+        dirs: Iterable['FsxPath'] = tuple(),
+        result: BulkResult = None,
+    ) -> BulkResult:
+        """
+        Remove the ``files`` and the directory trees ``dirs`` in parallel,
+        errors are collected in the returned :class:`BulkResult` instead of
+        raised.
+
+        :param result: collect the progress into this object.
+        """
+        files, dirs = list(files), list(dirs)
+        self.result = BulkResult() if result is None else result
+        self._progress = _Progress(self.result, self.on_progress, self.log_every)
+        self._outstanding = len(files) + len(dirs)
+        self._fatal = None
+        self._done.clear()
+        if self._outstanding == 0:
+            return self.result
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            self._executor = executor
+            for p in files:
+                self._submit(self._remove_file, p, None)
+            for p in dirs:
+                self._submit(self._list_dir, _DirNode(p, None))
+            self._done.wait()
+        self._executor = None
+        if self._fatal is not None:  # pragma: no cover
+            raise self._fatal
+        self._progress.log_done("removed")
+        return self.result
+
+
+def rmtree(
+    fpath: 'FsxPath',
+    workers: int = DEFAULT_WORKERS,
+    on_progress: Callable[[BulkResult], None] = None,
+    log_every: int = DEFAULT_LOG_EVERY,
+) -> BulkResult:
+    """
+    Remove a directory tree in parallel, see :class:`BulkRemover`.
+
+    .. versionadded:: 0.0.2
+    """
+    logger.info(f"remove dir tree {fpath.abspath} with {workers} workers")
+    return BulkRemover(
+        workers=workers,
+        on_progress=on_progress,
+        log_every=log_every,
+    ).run(dirs=[fpath])
+
+
+def remove_many(
+    paths: Iterable['FsxPath'],
+    workers: int = DEFAULT_WORKERS,
+    on_progress: Callable[[BulkResult], None] = None,
+    log_every: int = DEFAULT_LOG_EVERY,
+) -> BulkResult:
+    """
+    Remove many files in parallel, for example the result of
+    :meth:`~fsxpathlib.path.FsxPath.select_file`. Directories in ``paths``
+    are removed with everything inside.
+
+    .. versionadded:: 0.0.2
+    """
+    files, dirs = list(), list()
+    for p in paths:
+        if stat.S_ISDIR(p._stat().st_mode):
+            dirs.append(p)
+        else:
+            files.append(p)
+    logger.info(f"remove {len(files)} files and {len(dirs)} dirs with {workers} workers")
+    return BulkRemover(
+        workers=workers,
+        on_progress=on_progress,
+        log_every=log_every,
+    ).run(files=files, dirs=dirs)
+
+
+class PurgeResult(BulkResult):
+    """
+    Result of :func:`purge`. ``matched`` are the files matching the rules,
+    in dry run mode nothing is deleted and ``n_files`` / ``n_bytes`` are
+    what would be reclaimed.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(self, dry_run: bool = True):
+        super(PurgeResult, self).__init__()
+        self.dry_run = dry_run
+        self.matched: List['FsxPath'] = list()
+
+
+def purge(
+    paths: Iterable['FsxPath'],
+    older_than: Union[timedelta, datetime] = None,
+    larger_than: int = None,
+    pattern: str = None,
+    dry_run: bool = True,
+    workers: int = DEFAULT_WORKERS,
+    on_progress: Callable[[BulkResult], None] = None,
+    log_every: int = DEFAULT_LOG_EVERY,
+) -> PurgeResult:
+    """
+    Delete the files matching all the given rules in parallel.
+
+    :param paths: candidate files, for example
+        :meth:`~fsxpathlib.path.FsxPath.select_file`, the rules are evaluated
+        on the stat cached from the directory listing.
+    :param older_than: the last modified time is older than this
+        ``timedelta`` from now, or before this ``datetime``.
+    :param larger_than: the size in bytes is larger than this.
+    :param pattern: the file name matches this glob pattern, case insensitive,
+        for example ``*.log``.
+    :param dry_run: only find the matched files, don't delete anything.
+
+    .. versionadded:: 0.0.2
+    """
+    cutoff = get_cutoff(older_than)
+    if pattern is not None:
+        pattern = pattern.lower()
+
+    def is_match(p: 'FsxPath') -> bool:
+        st = p._stat()
+        if (cutoff is not None) and (st.st_mtime >= cutoff):
+            return False
+        if (larger_than is not None) and (st.st_size <= larger_than):
+            return False
+        if (pattern is not None) and (
+            not fnmatch.fnmatchcase(p.basename.lower(), pattern)
+        ):
+            return False
+        return True
+
+    result = PurgeResult(dry_run=dry_run)
+    result.matched = [p for p in paths if is_match(p)]
+    if dry_run:
+        result.n_files = len(result.matched)
+        result.n_bytes = sum(p._stat().st_size for p in result.matched)
+        logger.info(
+            f"dry run, {result.n_files} files "
+            f"({repr_data_size(result.n_bytes)}) would be deleted"
+        )
+    else:
+        logger.info(f"purge {len(result.matched)} files with {workers} workers")
+        BulkRemover(
+            workers=workers,
+            on_progress=on_progress,
+            log_every=log_every,
+        ).run(files=result.matched, result=result)
+    return result
+
+
+def move_many(
+    pairs: Iterable[Tuple['FsxPath', 'FsxPath']],
+    overwrite: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    on_progress: Callable[[BulkResult], None] = None,
+    log_every: int = DEFAULT_LOG_EVERY,
+) -> BulkResult:
+    """
+    Move many ``(src, dst)`` pairs concurrently with
+    :meth:`~fsxpathlib.path.FsxPath.move_to`. Errors are collected in the
+    returned :class:`BulkResult` instead of raised.
+
+    .. versionadded:: 0.0.2
+    """
+    if workers < 1:
+        raise ValueError("workers cannot smaller than 1")
+    pairs = list(pairs)
+    logger.info(f"move {len(pairs)} paths with {workers} workers")
+    progress = _Progress(BulkResult(), on_progress, log_every)
+
+    def move(pair: Tuple['FsxPath', 'FsxPath']):
+        src, dst = pair
+        try:
+            st = src._stat()
+            src.move_to(dst, overwrite=overwrite)
+        except (OSError, ValueError) as e:
+            progress.report(src, error=e)
+        else:
+            is_dir = stat.S_ISDIR(st.st_mode)
+            progress.report(src, is_dir=is_dir, size=0 if is_dir else st.st_size)
+
+    if workers == 1 or len(pairs) <= 1:
+        for pair in pairs:
+            move(pair)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(move, pairs):
+                pass
+    progress.log_done("moved")
+    return progress.result
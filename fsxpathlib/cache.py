@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local read-through disk cache for FSx files.
+
+A cached copy is keyed by the absolute path, size and modification time of
+the FSx file. Every lookup sends one ``stat`` request to validate the cached
+copy, a hit doesn't transfer any data. Example::
+
+    >>> from fsxpathlib.cache import DiskCache
+    >>> cache = DiskCache("/tmp/fsx-cache", max_size=10 * 1024 ** 3)
+    >>> data = fpath.read_bytes(cache=cache)
+
+The cache directory can be shared by multiple processes on the same host:
+new entries are downloaded to a temp file and atomically renamed into place,
+readers always see a complete file.
+"""
+
+import os
+import hashlib
+import tempfile
+from typing import TYPE_CHECKING, Tuple
+
+import smbclient
+
+from . import exc
+from .hashes import DEFAULT_WORKERS
+from .transfer import download_ranged
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .path import FsxPath
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".fsxpathlib", "cache")
+DEFAULT_MAX_SIZE = 1 << 30  # 1 GB
+TEMP_SUFFIX = ".tmp"
+MAX_DOWNLOAD_ATTEMPTS = 3
+
+
+def _version(st: smbclient.SMBStatResult) -> Tuple[int, int]:
+    return st.st_size, st.st_mtime_ns
+
+
+class DiskCache:
+    """
+    Keep local copies of FSx files in ``dir_cache``. When the total size
+    exceeds ``max_size`` bytes, the least recently used copies are deleted.
+    Files larger than ``max_size`` are never cached.
+
+    :param workers: number of streams used to download a file on cache miss,
+        see :func:`~fsxpathlib.transfer.download_ranged`.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(
+        self,
+        dir_cache: str = DEFAULT_CACHE_DIR,
+        max_size: int = DEFAULT_MAX_SIZE,
+        workers: int = DEFAULT_WORKERS,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size cannot smaller than 1")
+        self.dir_cache = os.fspath(dir_cache)
+        self.max_size = max_size
+        self.workers = workers
+        os.makedirs(self.dir_cache, exist_ok=True)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(dir_cache={self.dir_cache!r}, "
+            f"max_size={self.max_size})"
+        )
+
+    def _key(self, abspath: str, size: int, mtime_ns: int) -> str:
+        return hashlib.sha256(
+            f"{abspath}\n{size}\n{mtime_ns}".encode("utf-8")
+        ).hexdigest()
+
+    def _cache_path(self, fpath: 'FsxPath', st: smbclient.SMBStatResult) -> str:
+        return os.path.join(
+            self.dir_cache,
+            self._key(fpath.abspath, st.st_size, st.st_mtime_ns),
+        )
+
+    def _download(self, fpath: 'FsxPath') -> str:
+        """
+        Download the file to a temp file, then move it into place. If the
+        file is modified during the download, try again.
+        """
+        for _ in range(MAX_DOWNLOAD_ATTEMPTS):
+            fd, temp_path = tempfile.mkstemp(dir=self.dir_cache, suffix=TEMP_SUFFIX)
+            os.close(fd)
+            try:
+                before = self._fresh_stat(fpath)
+                try:
+                    download_ranged(fpath, temp_path, workers=self.workers)
+                except (EOFError, exc.FsxError):  # size changed while downloading
+                    continue
+                after = self._fresh_stat(fpath)
+                if _version(before) == _version(after):
+                    self._check_size(fpath, after)  # grew after the lookup
+                    cache_path = self._cache_path(fpath, after)
+                    os.replace(temp_path, cache_path)
+                    self._evict(keep=cache_path)
+                    return cache_path
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        raise exc.FsxError(
+            f"{fpath.abspath} keeps changing while downloading, "
+            f"tried {MAX_DOWNLOAD_ATTEMPTS} times"
+        )
+
+    def _fresh_stat(self, fpath: 'FsxPath') -> smbclient.SMBStatResult:
+        fpath._stat_cache = None
+        return fpath._stat()
+
+    def _lookup(self, fpath: 'FsxPath', st: smbclient.SMBStatResult) -> str:
+        cache_path = self._cache_path(fpath, st)
+        try:
+            os.utime(cache_path)  # mark as recently used
+            return cache_path
+        except FileNotFoundError:
+            return self._download(fpath)
+
+    def _check_size(self, fpath: 'FsxPath', st: smbclient.SMBStatResult):
+        if st.st_size > self.max_size:
+            raise ValueError(
+                f"{fpath.abspath} is larger than max_size "
+                f"({st.st_size} > {self.max_size}), cannot be cached"
+            )
+
+    def get(self, fpath: 'FsxPath') -> str:
+        """
+        Return the path of the up-to-date local copy of the FSx file,
+        download it on cache miss. A cache hit costs one ``stat`` request.
+        Files larger than ``max_size`` raise ``ValueError``.
+        """
+        st = self._fresh_stat(fpath)
+        self._check_size(fpath, st)
+        return self._lookup(fpath, st)
+
+    def open(
+        self,
+        fpath: 'FsxPath',
+        mode: str = "rb",
+        buffering: int = -1,
+        encoding: str = None,
+        errors: str = None,
+        newline: str = None,
+    ):
+        """
+        Open the local copy of the FSx file for reading. Files larger than
+        ``max_size`` are opened from FSx directly.
+        """
+        if mode not in ("r", "rb", "rt"):
+            raise ValueError(f"invalid mode {mode!r}, only read mode is supported")
+        kwargs = dict(
+            mode=mode,
+            buffering=buffering,
+            encoding=encoding,
+            errors=errors,
+            newline=newline,
+        )
+        st = self._fresh_stat(fpath)
+        if st.st_size > self.max_size:
+            return fpath.open(**kwargs)
+        try:
+            return open(self._lookup(fpath, st), **kwargs)
+        except FileNotFoundError:  # evicted by another process just now
+            return open(self._download(fpath), **kwargs)
+
+    def _evict(self, keep: str = None):
+        """
+        Delete the least recently used copies until the total size is under
+        ``max_size``. Temp files of the in-progress downloads are ignored.
+        """
+        entries = list()
+        total = 0
+        for entry in os.scandir(self.dir_cache):
+            if entry.name.endswith(TEMP_SUFFIX) or (not entry.is_file()):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:  # deleted by another process
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:  # pragma: no cover, opened by others on Windows
+                continue
+            total -= size
+
+    def total_size(self) -> int:
+        """
+        Total size of the cached copies.
+        """
+        return sum(
+            entry.stat().st_size
+            for entry in os.scandir(self.dir_cache)
+            if entry.is_file() and (not entry.name.endswith(TEMP_SUFFIX))
+        )
+
+    def clear(self):
+        """
+        Delete all cached copies.
+        """
+        for entry in os.scandir(self.dir_cache):
+            if entry.is_file() and (not entry.name.endswith(TEMP_SUFFIX)):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+Find duplicate files. Files are filtered in three stages, each stage only
+looks at the candidates left by the previous one:
+
+1. group by size, the size comes from the directory listing.
+2. group by the hash of the first ``nbytes``.
+3. group by the hash of the entire content.
+"""
+
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Iterable, Callable
+
+from .hashes import get_hash, DEFAULT_READ_SIZE, DEFAULT_WORKERS
+from .helper import repr_data_size
+
+DEFAULT_NBYTES = 1 << 16
+
+
+class DuplicateGroup:
+    """
+    A group of files having exactly the same content.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(
+        self,
+        size: int,
+        hash: str,
+        paths: list,
+    ):
+        self.size = size
+        self.hash = hash
+        self.paths = paths
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(size={self.size}, hash={self.hash!r}, "
+            f"n_paths={len(self.paths)}, "
+            f"reclaimable={repr_data_size(self.reclaimable_bytes)})"
+        )
+
+    @property
+    def reclaimable_bytes(self) -> int:
+        """
+        Bytes can be released if only one copy is kept.
+        """
+        return self.size * (len(self.paths) - 1)
+
+
+def _regroup(
+    executor: ThreadPoolExecutor,
+    groups: List[list],
+    get_key: Callable,
+) -> Dict[Tuple[int, str], list]:
+    """
+    Compute the key of every path in parallel and split each group by key.
+    Only groups that still have more than one path are returned.
+    """
+    results = dict()
+    items = [p for group in groups for p in group]
+    for p, key in zip(items, executor.map(get_key, items)):
+        results.setdefault((p.size, key), list()).append(p)
+    return {
+        key: group
+        for key, group in results.items()
+        if len(group) > 1
+    }
+
+
+def find_duplicates(
+    paths: Iterable,
+    nbytes: int = DEFAULT_NBYTES,
+    hash_meth=hashlib.md5,
+    workers: int = DEFAULT_WORKERS,
+    min_size: int = 1,
+) -> List[DuplicateGroup]:
+    """
+    Find files having the same content. ``paths`` can be any iterable of
+    file objects that have ``size`` attribute and ``open`` method, for
+    example :meth:`fsxpathlib.path.FsxPath.select_file`.
+
+    :param nbytes: number of leading bytes used in the partial hash stage.
+    :param workers: number of threads used to compute hashes.
+    :param min_size: files smaller than this are ignored, by default empty
+        files are ignored.
+
+    :return: duplicate groups, sorted by reclaimable bytes in descending order.
+
+    .. versionadded:: 0.0.2
+    """
+    if nbytes < 1:
+        raise ValueError("nbytes cannot smaller than 1")
+    if workers < 1:
+        raise ValueError("workers cannot smaller than 1")
+
+    by_size = defaultdict(list)
+    for p in paths:
+        size = p.size
+        if size >= min_size:
+            by_size[size].append(p)
+    groups = [group for group in by_size.values() if len(group) > 1]
+
+    def partial_hash(p) -> str:
+        return get_hash(
+            p,
+            hash_meth=hash_meth,
+            nbytes=nbytes,
+            chunk_size=min(nbytes, DEFAULT_READ_SIZE),
+        )
+
+    def full_hash(p) -> str:
+        return get_hash(p, hash_meth=hash_meth, chunk_size=DEFAULT_READ_SIZE)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        partial_groups = _regroup(executor, groups, partial_hash)
+
+        # for small files, the partial hash is already the full hash
+        duplicates = {
+            key: group
+            for key, group in partial_groups.items()
+            if key[0] <= nbytes
+        }
+        duplicates.update(
+            _regroup(
+                executor,
+                [
+                    group
+                    for key, group in partial_groups.items()
+                    if key[0] > nbytes
+                ],
+                full_hash,
+            )
+        )
+
+    dup_groups = [
+        DuplicateGroup(size=size, hash=hash, paths=group)
+        for (size, hash), group in duplicates.items()
+    ]
+    dup_groups.sort(key=lambda g: g.reclaimable_bytes, reverse=True)
+    return dup_groups
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+
+"""
+Streaming comparison of two directory trees.
+
+Each tree is walked depth first with the children of every directory sorted
+by name, which yields the entries sorted by their relative path. The two
+sorted streams are then merged like the merge step of merge sort, so only
+the listings of the directories on the current walk path are in memory, no
+matter how large the trees are. The metadata comes from the directory
+listings, no per file ``stat`` request is sent.
+
+Both trees are walked concurrently in background threads, the listing
+latency of one side overlaps the other side.
+"""
+
+import os
+import stat
+import queue
+import threading
+from typing import TYPE_CHECKING, Tuple, Iterable, Iterator, Callable, Optional, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib_mate import Path
+    from .path import FsxPath
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+SAME = "same"
+
+DEFAULT_PREFETCH = 1000
+DEFAULT_MTIME_TOLERANCE = 2.0  # seconds
+
+
+class TreeEntry:
+    """
+    An entry of a sorted tree walk.
+
+    :param key: the lower case path components relative to the root,
+        entries are compared and sorted by it.
+    :param path: the path object of the entry, for example
+        :class:`~fsxpathlib.path.FsxPath`.
+
+    .. versionadded:: 0.0.2
+    """
+
+    __slots__ = ("key", "relpath", "is_dir", "size", "mtime_ns", "path")
+
+    def __init__(
+        self,
+        key: Tuple[str, ...],
+        relpath: str,
+        is_dir: bool,
+        size: int,
+        mtime_ns: int,
+        path: Any,
+    ):
+        self.key = key
+        self.relpath = relpath
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.path = path
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(relpath={self.relpath!r}, is_dir={self.is_dir})"
+
+
+class DiffEntry:
+    """
+    One difference between the left and the right tree.
+
+    - :data:`ADDED`: only in the right tree, ``left`` is None.
+    - :data:`REMOVED`: only in the left tree, ``right`` is None.
+    - :data:`CHANGED`: in both, with different type, size or
+      modification time.
+    - :data:`SAME`: in both, considered the same.
+
+    .. versionadded:: 0.0.2
+    """
+
+    __slots__ = ("status", "left", "right")
+
+    def __init__(
+        self,
+        status: str,
+        left: Optional[TreeEntry],
+        right: Optional[TreeEntry],
+    ):
+        self.status = status
+        self.left = left
+        self.right = right
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(status={self.status!r}, relpath={self.relpath!r})"
+
+    @property
+    def relpath(self) -> str:
+        return (self.left or self.right).relpath
+
+    @property
+    def is_dir(self) -> bool:
+        return (self.left or self.right).is_dir
+
+
+def _walk_sorted(
+    list_dir,
+    top,
+    key: Tuple[str, ...] = (),
+    relpath: str = "",
+    sep: str = "\\",
+) -> Iterable[TreeEntry]:
+    """
+    Depth first, pre-order walk with the children sorted by lower case name.
+    ``list_dir(dir)`` returns ``[(name, is_dir, size, mtime_ns, path)]``.
+    """
+    children = sorted(list_dir(top), key=lambda child: child[0].lower())
+    for name, is_dir, size, mtime_ns, path in children:
+        child_key = key + (name.lower(),)
+        child_relpath = f"{relpath}{sep}{name}" if relpath else name
+        yield TreeEntry(child_key, child_relpath, is_dir, size, mtime_ns, path)
+        if is_dir:
+            yield from _walk_sorted(list_dir, path, child_key, child_relpath, sep)
+
+
+def _list_fsx_dir(fpath: 'FsxPath'):
+    try:
+        dirs, files = fpath._scandir()
+    except OSError:
+        return []
+    children = list()
+    for p in dirs:
+        st = p._stat()
+        if stat.S_ISLNK(st.st_mode):
+            children.append((p.basename, False, st.st_size, st.st_mtime_ns, p))
+        else:
+            children.append((p.basename, True, 0, st.st_mtime_ns, p))
+    for p in files:
+        st = p._stat()
+        children.append((p.basename, False, st.st_size, st.st_mtime_ns, p))
+    return children
+
+
+def iter_fsx_tree(fpath: 'FsxPath') -> Iterable[TreeEntry]:
+    """
+    Walk the FSx directory tree in sorted order. Sub directories that
+    cannot be listed are treated as empty, symlinks are not followed.
+
+    .. versionadded:: 0.0.2
+    """
+    fpath.assert_is_dir_and_exists()
+    return _walk_sorted(_list_fsx_dir, fpath)
+
+
+def _list_local_dir(path: 'Path'):
+    children = list()
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                st = entry.stat(follow_symlinks=False)
+                is_dir = entry.is_dir(follow_symlinks=False)
+                children.append((
+                    entry.name,
+                    is_dir,
+                    0 if is_dir else st.st_size,
+                    st.st_mtime_ns,
+                    path.__class__(entry.path),
+                ))
+    except OSError:
+        return []
+    return children
+
+
+def iter_local_tree(path: 'Path') -> Iterable[TreeEntry]:
+    """
+    Walk the local directory tree in sorted order, the relative paths use
+    ``\\`` as separator to match the FSx side.
+
+    .. versionadded:: 0.0.2
+    """
+    if not path.is_dir():
+        raise NotADirectoryError(f"{path} is not a directory")
+    return _walk_sorted(_list_local_dir, path)
+
+
+_END = object()
+
+
+def prefetch(iterable: Iterable, size: int = DEFAULT_PREFETCH) -> Iterator:
+    """
+    Consume ``iterable`` in a background thread, keep at most ``size`` items
+    ahead of the caller. The error raised by the iterable is re-raised in
+    the caller.
+
+    .. versionadded:: 0.0.2
+    """
+    q = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((_END, e))
+            return
+        put((_END, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = q.get()
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def _is_changed(
+    left: TreeEntry,
+    right: TreeEntry,
+    use_mtime: bool,
+    mtime_tolerance: float,
+) -> bool:
+    if left.is_dir != right.is_dir:
+        return True
+    if left.is_dir:
+        return False
+    if left.size != right.size:
+        return True
+    if use_mtime:
+        return abs(left.mtime_ns - right.mtime_ns) > mtime_tolerance * 1000000000
+    return False
+
+
+def merge_diff(
+    left: Iterable[TreeEntry],
+    right: Iterable[TreeEntry],
+    use_mtime: bool = True,
+    mtime_tolerance: float = DEFAULT_MTIME_TOLERANCE,
+    include_same: bool = True,
+    is_changed: Callable[[TreeEntry, TreeEntry], bool] = None,
+) -> Iterable[DiffEntry]:
+    """
+    Merge two streams of :class:`TreeEntry` sorted by ``key``.
+
+    :param is_changed: custom comparison of the entries having the same
+        key, ``use_mtime`` and ``mtime_tolerance`` are ignored if given.
+
+    .. versionadded:: 0.0.2
+    """
+    if is_changed is None:
+        def is_changed(left_entry: TreeEntry, right_entry: TreeEntry) -> bool:
+            return _is_changed(left_entry, right_entry, use_mtime, mtime_tolerance)
+
+    left = iter(left)
+    right = iter(right)
+    left_entry = next(left, None)
+    right_entry = next(right, None)
+    while (left_entry is not None) or (right_entry is not None):
+        if (right_entry is None) or (
+            (left_entry is not None) and (left_entry.key < right_entry.key)
+        ):
+            yield DiffEntry(REMOVED, left_entry, None)
+            left_entry = next(left, None)
+        elif (left_entry is None) or (right_entry.key < left_entry.key):
+            yield DiffEntry(ADDED, None, right_entry)
+            right_entry = next(right, None)
+        else:
+            if is_changed(left_entry, right_entry):
+                yield DiffEntry(CHANGED, left_entry, right_entry)
+            elif include_same:
+                yield DiffEntry(SAME, left_entry, right_entry)
+            left_entry = next(left, None)
+            right_entry = next(right, None)
+
+
+def diff_trees(
+    left: Iterable[TreeEntry],
+    right: Iterable[TreeEntry],
+    use_mtime: bool = True,
+    mtime_tolerance: float = DEFAULT_MTIME_TOLERANCE,
+    include_same: bool = True,
+    prefetch_size: int = DEFAULT_PREFETCH,
+    is_changed: Callable[[TreeEntry, TreeEntry], bool] = None,
+) -> Iterable[DiffEntry]:
+    """
+    Walk both trees concurrently and merge them, see :func:`merge_diff`.
+
+    :param use_mtime: files of the same size are changed if their
+        modification time differ more than ``mtime_tolerance`` seconds.
+    :param include_same: also yield the :data:`SAME` entries.
+    :param prefetch_size: number of entries each walk can run ahead.
+
+    .. versionadded:: 0.0.2
+    """
+    if prefetch_size < 1:
+        raise ValueError("prefetch_size cannot smaller than 1")
+    left_it = prefetch(left, size=prefetch_size)
+    right_it = prefetch(right, size=prefetch_size)
+    try:
+        yield from merge_diff(
+            left_it,
+            right_it,
+            use_mtime=use_mtime,
+            mtime_tolerance=mtime_tolerance,
+            include_same=include_same,
+            is_changed=is_changed,
+        )
+    finally:
+        left_it.close()
+        right_it.close()
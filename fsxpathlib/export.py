@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+
+"""
+Columnar export of a directory tree listing, for vectorized analytics over
+millions of files. The tree is listed breadth first and turned into column
+batches as it is listed, only the directories are kept in memory::
+
+    >>> from fsxpathlib.export import to_parquet
+    >>> to_parquet(fpath_root, "/tmp/listing.parquet")
+    >>> import pandas as pd
+    >>> df = pd.read_parquet("/tmp/listing.parquet")
+    >>> df[~df.is_dir].groupby("parent")["size"].sum().nlargest(10)
+
+Columns:
+
+- ``path``: absolute path of the entry.
+- ``parent``: absolute path of the parent directory.
+- ``name``: base name of the entry.
+- ``is_dir``: the entry is a directory, symlinks are not directories.
+- ``size``: file size in bytes, 0 for directories.
+- ``mtime_ns``, ``ctime_ns``: modification / creation time in
+  nanoseconds since epoch.
+- ``attributes``: the Windows file attributes.
+- ``depth``: 1 for the direct children of the root, 2 for their children...
+
+``numpy`` and ``pyarrow`` are optional dependencies, install them with
+``pip install fsxpathlib[export]``.
+
+.. versionadded:: 0.0.2
+"""
+
+import os
+import stat
+from typing import TYPE_CHECKING, Dict, List, Iterable, Union
+
+from .listing import iter_entries
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib_mate import Path
+    from .path import FsxPath
+
+DEFAULT_BATCH_SIZE = 100000
+
+COLUMNS = (
+    "path", "parent", "name", "is_dir", "size",
+    "mtime_ns", "ctime_ns", "attributes", "depth",
+)
+
+
+def _require(module, name: str):
+    if module is None:
+        raise ImportError(
+            f"{name} is required, install it with 'pip install fsxpathlib[export]'"
+        )
+
+
+def iter_batches(
+    fpath: 'FsxPath',
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    recursive: bool = True,
+) -> Iterable[Dict[str, list]]:
+    """
+    List the directory tree and yield the entries as dict of column lists,
+    at most ``batch_size`` rows per batch. Only the paths of the directories
+    are kept in memory while listing.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size cannot smaller than 1")
+    fpath.assert_is_dir_and_exists()
+    root = fpath.abspath
+    # position of directory entry -> (abspath, depth)
+    dirs: Dict[int, tuple] = dict()
+    batch: Dict[str, list] = {column: list() for column in COLUMNS}
+    for i, (parent, p, is_dir) in enumerate(iter_entries(fpath, recursive=recursive)):
+        if parent == -1:
+            parent_path, depth = root, 1
+        else:
+            parent_path, depth = dirs[parent]
+            depth += 1
+        st = p._stat()
+        is_dir = is_dir and (not stat.S_ISLNK(st.st_mode))
+        if is_dir and recursive:
+            dirs[i] = (p.abspath, depth)
+        batch["path"].append(p.abspath)
+        batch["parent"].append(parent_path)
+        batch["name"].append(p.basename)
+        batch["is_dir"].append(is_dir)
+        batch["size"].append(0 if is_dir else st.st_size)
+        batch["mtime_ns"].append(st.st_mtime_ns)
+        batch["ctime_ns"].append(st.st_ctime_ns)
+        batch["attributes"].append(st.st_file_attributes)
+        batch["depth"].append(depth)
+        if len(batch["path"]) == batch_size:
+            yield batch
+            batch = {column: list() for column in COLUMNS}
+    if batch["path"]:
+        yield batch
+
+
+def _numpy_dtype():
+    return np.dtype([
+        ("path", object),
+        ("parent", object),
+        ("name", object),
+        ("is_dir", np.bool_),
+        ("size", np.int64),
+        ("mtime_ns", np.int64),
+        ("ctime_ns", np.int64),
+        ("attributes", np.uint32),
+        ("depth", np.int32),
+    ])
+
+
+def _arrow_schema():
+    return pa.schema([
+        ("path", pa.string()),
+        ("parent", pa.string()),
+        ("name", pa.string()),
+        ("is_dir", pa.bool_()),
+        ("size", pa.int64()),
+        ("mtime_ns", pa.int64()),
+        ("ctime_ns", pa.int64()),
+        ("attributes", pa.uint32()),
+        ("depth", pa.int32()),
+    ])
+
+
+def batches_to_numpy(batches: Iterable[Dict[str, list]]) -> 'np.ndarray':
+    """
+    Concatenate column batches into one NumPy structured array.
+    """
+    _require(np, "numpy")
+    dtype = _numpy_dtype()
+    arrays: List[np.ndarray] = list()
+    for batch in batches:
+        arr = np.empty(len(batch["path"]), dtype=dtype)
+        for column in COLUMNS:
+            arr[column] = batch[column]
+        arrays.append(arr)
+    if not arrays:
+        return np.empty(0, dtype=dtype)
+    return np.concatenate(arrays)
+
+
+def to_numpy(
+    fpath: 'FsxPath',
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    recursive: bool = True,
+) -> 'np.ndarray':
+    """
+    Export the directory tree listing to a NumPy structured array, the
+    fields are listed in :data:`COLUMNS`. Strings are stored as object.
+    """
+    return batches_to_numpy(iter_batches(fpath, batch_size=batch_size, recursive=recursive))
+
+
+def iter_record_batches(
+    fpath: 'FsxPath',
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    recursive: bool = True,
+) -> Iterable['pa.RecordBatch']:
+    """
+    Stream the directory tree listing as ``pyarrow.RecordBatch``.
+    """
+    _require(pa, "pyarrow")
+    schema = _arrow_schema()
+    for batch in iter_batches(fpath, batch_size=batch_size, recursive=recursive):
+        yield pa.RecordBatch.from_pydict(batch, schema=schema)
+
+
+def to_arrow(
+    fpath: 'FsxPath',
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    recursive: bool = True,
+) -> 'pa.Table':
+    """
+    Export the directory tree listing to a ``pyarrow.Table``.
+    """
+    _require(pa, "pyarrow")
+    return pa.Table.from_batches(
+        iter_record_batches(fpath, batch_size=batch_size, recursive=recursive),
+        schema=_arrow_schema(),
+    )
+
+
+def to_parquet(
+    fpath: 'FsxPath',
+    path: Union[str, 'Path'],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    recursive: bool = True,
+    compression: str = "zstd",
+) -> int:
+    """
+    Export the directory tree listing to a local Parquet file. Each batch is
+    written as soon as it is listed, so the memory usage doesn't grow with
+    the number of files.
+
+    :return: number of rows written.
+    """
+    _require(pq, "pyarrow")
+    n = 0
+    with pq.ParquetWriter(
+        os.fspath(path),
+        schema=_arrow_schema(),
+        compression=compression,
+    ) as writer:
+        for record_batch in iter_record_batches(
+            fpath, batch_size=batch_size, recursive=recursive,
+        ):
+            writer.write_batch(record_batch)
+            n += record_batch.num_rows
+    return n
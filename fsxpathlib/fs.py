@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+
+"""
+`fsspec <https://filesystem-spec.readthedocs.io/>`_ compatible file system
+for AWS FSx, so pandas, pyarrow, dask etc. can read and write FSx files
+directly::
+
+    >>> import pandas as pd
+    >>> from fsxpathlib.fs import FsxFileSystem
+    >>> fs = FsxFileSystem(fsx_client=fsx_client)
+    >>> with fs.open(f"{fsx_client.server}/share/data.parquet") as f:
+    ...     df = pd.read_parquet(f, columns=["id"])
+
+Files opened for reading keep an LRU cache of fixed size blocks, see
+:class:`LRUBlockCache`, so the many small seek-and-read of a columnar
+reader don't turn into many network round trips.
+
+``fsspec`` is an optional dependency, install it with
+``pip install fsxpathlib[fsspec]``. The ``fsx://`` protocol is registered
+with fsspec, so ``pd.read_parquet("fsx://${server}/share/data.parquet")``
+also works.
+
+.. versionadded:: 0.0.2
+"""
+
+import stat
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Dict, Tuple, Callable
+
+import smbclient
+from fsspec import AbstractFileSystem
+from fsspec.caching import BaseCache, register_cache
+from fsspec.spec import AbstractBufferedFile
+
+from .path import FsxPath, SERVER
+from .stream import (
+    read_pipelined, DEFAULT_READ_AHEAD_DEPTH, DEFAULT_WRITE_BEHIND_DEPTH,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .client import FSxClient
+
+DEFAULT_CACHE_BLOCK_SIZE = 1 << 20  # 1 MB per cached block
+DEFAULT_CACHE_BLOCKS = 64  # keep at most 64 MB per opened file
+DEFAULT_CACHE_READ_AHEAD = 4  # blocks fetched after the requested ones
+
+
+class LRUBlockCache(BaseCache):
+    """
+    Keep at most ``max_blocks`` fixed size blocks of the file, the least
+    recently used block is evicted first. On a cache miss, the missing blocks
+    and the next ``read_ahead`` blocks are fetched together, contiguous
+    missing blocks are fetched with a single call of the fetcher.
+
+    .. versionadded:: 0.0.2
+    """
+
+    name = "fsx_lru"
+
+    def __init__(
+        self,
+        blocksize: int,
+        fetcher,
+        size: int,
+        max_blocks: int = DEFAULT_CACHE_BLOCKS,
+        read_ahead: int = DEFAULT_CACHE_READ_AHEAD,
+    ):
+        super(LRUBlockCache, self).__init__(blocksize, fetcher, size)
+        if blocksize < 1:
+            raise ValueError("blocksize cannot smaller than 1")
+        if max_blocks < 1:
+            raise ValueError("max_blocks cannot smaller than 1")
+        if read_ahead < 0:
+            raise ValueError("read_ahead cannot smaller than 0")
+        self.max_blocks = max_blocks
+        self.read_ahead = read_ahead
+        self.nblocks = (size + blocksize - 1) // blocksize
+        self.hit_count = 0
+        self.miss_count = 0
+        self._blocks: Dict[int, bytes] = OrderedDict()
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(blocksize={self.blocksize}, "
+            f"size={self.size}, cached_blocks={len(self._blocks)}, "
+            f"hits={self.hit_count}, misses={self.miss_count})"
+        )
+
+    def _fetch_blocks(self, indices: List[int]) -> Dict[int, bytes]:
+        """
+        Fetch the blocks, contiguous blocks are fetched with one call.
+        """
+        fetched = dict()
+        ind = 0
+        while ind < len(indices):
+            first = last = indices[ind]
+            while (ind + 1 < len(indices)) and (indices[ind + 1] == last + 1):
+                ind += 1
+                last = indices[ind]
+            start = first * self.blocksize
+            data = self.fetcher(start, min((last + 1) * self.blocksize, self.size))
+            for block_number in range(first, last + 1):
+                offset = (block_number - first) * self.blocksize
+                fetched[block_number] = data[offset:offset + self.blocksize]
+            ind += 1
+        return fetched
+
+    def _fetch(self, start, stop) -> bytes:
+        if start is None:
+            start = 0
+        if stop is None:
+            stop = self.size
+        stop = min(stop, self.size)
+        if start >= stop:
+            return b""
+
+        first = start // self.blocksize
+        last = (stop - 1) // self.blocksize
+        wanted = range(first, last + 1)
+        missing = [i for i in wanted if i not in self._blocks]
+        if missing:
+            self.miss_count += 1
+            last_ahead = min(last + self.read_ahead, self.nblocks - 1)
+            missing.extend(
+                i
+                for i in range(last + 1, last_ahead + 1)
+                if i not in self._blocks
+            )
+            fetched = self._fetch_blocks(missing)
+        else:
+            self.hit_count += 1
+            fetched = dict()
+
+        parts = list()
+        for i in wanted:  # the requested blocks become the most recently used
+            block = fetched.pop(i, None)
+            if block is None:
+                block = self._blocks.pop(i)
+            self._blocks[i] = block
+            parts.append(block)
+        self._blocks.update(fetched)  # read ahead blocks
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+
+        offset = first * self.blocksize
+        return b"".join(parts)[start - offset:stop - offset]
+
+
+register_cache(LRUBlockCache, clobber=True)
+
+
+def _resolve_range(
+    start: int,
+    end: int,
+    get_size: Callable[[], int],
+) -> Tuple[int, int]:
+    """
+    Convert the fsspec style ``start`` / ``end``, which can be None or
+    negative, to ``(offset, length)``. The file size is only looked up
+    when it is needed.
+    """
+    start = 0 if start is None else start
+    if (start < 0) or (end is None) or (end < 0):
+        size = get_size()
+        if start < 0:
+            start = max(0, size + start)
+        if end is None:
+            end = size
+        elif end < 0:
+            end = size + end
+    return start, max(0, end - start)
+
+
+class FsxFile(AbstractBufferedFile):
+    """
+    Read only file of :class:`FsxFileSystem`. One SMB file handle is opened
+    on the first read and reused by every fetch, each fetch sends pipelined
+    READ requests, see :func:`~fsxpathlib.stream.read_pipelined`.
+
+    .. versionadded:: 0.0.2
+    """
+
+    DEFAULT_BLOCK_SIZE = DEFAULT_CACHE_BLOCK_SIZE
+
+    def __init__(
+        self,
+        fs: 'FsxFileSystem',
+        path: str,
+        mode: str = "rb",
+        block_size=None,
+        cache_type: str = LRUBlockCache.name,
+        cache_options: dict = None,
+        size: int = None,
+        **kwargs
+    ):
+        if mode != "rb":
+            raise ValueError(f"{self.__class__.__name__} only supports 'rb' mode")
+        self._raw = None
+        super(FsxFile, self).__init__(
+            fs,
+            path,
+            mode=mode,
+            block_size=block_size,
+            cache_type=cache_type,
+            cache_options=cache_options,
+            size=size,
+            **kwargs
+        )
+
+    def _fetch_range(self, start: int, end: int) -> bytes:
+        if self._raw is None:
+            # other readers, for example the other threads of pyarrow,
+            # may open the same file at the same time
+            self._raw = smbclient.open_file(
+                self.fs._to_fsxpath(self.path).abspath,
+                mode="rb",
+                buffering=0,
+                share_access="r",
+            )
+        return read_pipelined(
+            self._raw.fd,
+            [(start, end - start)],
+            depth=DEFAULT_READ_AHEAD_DEPTH,
+        )[0]
+
+    def close(self):
+        try:
+            super(FsxFile, self).close()
+        finally:
+            if self._raw is not None:
+                self._raw.close()
+                self._raw = None
+
+
+class FsxFileSystem(AbstractFileSystem):
+    """
+    fsspec file system for AWS FSx. Path looks like
+    ``fsx://${server}/${share}/${key}``, the protocol prefix is optional.
+
+    :param fsx_client: if given, register the SMB session of this client,
+        otherwise the session has to be registered beforehand.
+    :param block_size: size of each cached block of the opened file.
+    :param cache_blocks: maximum number of blocks cached per opened file.
+    :param read_ahead: number of blocks fetched after the requested blocks
+        on a cache miss.
+
+    .. versionadded:: 0.0.2
+    """
+
+    protocol = "fsx"
+    root_marker = ""
+
+    def __init__(
+        self,
+        fsx_client: 'FSxClient' = None,
+        block_size: int = DEFAULT_CACHE_BLOCK_SIZE,
+        cache_blocks: int = DEFAULT_CACHE_BLOCKS,
+        read_ahead: int = DEFAULT_CACHE_READ_AHEAD,
+        **kwargs
+    ):
+        super(FsxFileSystem, self).__init__(**kwargs)
+        self.fsx_client = fsx_client
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+        self.read_ahead = read_ahead
+        if fsx_client is not None:
+            fsx_client.create_session()
+
+    @classmethod
+    def _strip_protocol(cls, path) -> str:
+        if isinstance(path, FsxPath):
+            path = path.abspath
+        path = super(FsxFileSystem, cls)._strip_protocol(path)
+        return path.replace("\\", "/").strip("/")
+
+    def _to_fsxpath(self, path: str) -> FsxPath:
+        parts = [part for part in self._strip_protocol(path).split("/") if part]
+        return FsxPath(*parts)
+
+    def _to_path(self, fpath: FsxPath) -> str:
+        return "/".join(fpath.parts)
+
+    def _info(self, fpath: FsxPath) -> dict:
+        st = fpath._stat()
+        is_dir = stat.S_ISDIR(st.st_mode)
+        return dict(
+            name=self._to_path(fpath),
+            size=0 if is_dir else st.st_size,
+            type="directory" if is_dir else "file",
+            created=st.st_ctime,
+            mtime=st.st_mtime,
+        )
+
+    def ls(self, path, detail=True, **kwargs):
+        fpath = self._to_fsxpath(path)
+        if not stat.S_ISDIR(fpath._stat().st_mode):
+            infos = [self._info(fpath)]
+        else:
+            dirs, files = fpath._scandir()
+            infos = [self._info(p) for p in dirs + files]
+        if detail:
+            return infos
+        return [info["name"] for info in infos]
+
+    def info(self, path, **kwargs) -> dict:
+        fpath = self._to_fsxpath(path)
+        try:
+            return self._info(fpath)
+        except (OSError, ValueError):
+            raise FileNotFoundError(path)
+
+    def created(self, path):
+        return self._to_fsxpath(path).ctime
+
+    def modified(self, path):
+        return self._to_fsxpath(path).mtime
+
+    def mkdir(self, path, create_parents=True, **kwargs):
+        self._to_fsxpath(path).mkdir(parents=create_parents)
+
+    def makedirs(self, path, exist_ok=False):
+        self._to_fsxpath(path).mkdir(parents=True, exist_ok=exist_ok)
+
+    def rmdir(self, path):
+        self._to_fsxpath(path).rmdir()
+
+    def _rm(self, path):
+        fpath = self._to_fsxpath(path)
+        if fpath.is_dir():
+            fpath.rmdir()
+        else:
+            fpath.remove()
+
+    def cp_file(self, path1, path2, **kwargs):
+        # server side copy, the data doesn't go through the client. Without
+        # the leading ``\\``, smbclient treats both paths as local files
+        smbclient.copyfile(
+            src=SERVER + self._to_fsxpath(path1).abspath,
+            dst=SERVER + self._to_fsxpath(path2).abspath,
+        )
+
+    def cat_file(self, path, start=None, end=None, **kwargs) -> bytes:
+        fpath = self._to_fsxpath(path)
+        if (start is None) and (end is None):
+            return fpath.read_bytes(read_ahead=DEFAULT_READ_AHEAD_DEPTH)
+        offset, length = _resolve_range(start, end, lambda: fpath.size)
+        return fpath.read_range(offset, length)
+
+    def cat_ranges(
+        self,
+        paths,
+        starts,
+        ends,
+        max_gap=None,
+        on_error="return",
+        **kwargs
+    ) -> list:
+        """
+        Read ranges of many files, ranges of the same file are read with one
+        file handle by :meth:`~fsxpathlib.path.FsxPath.read_ranges`.
+        """
+        if not isinstance(paths, list):
+            raise TypeError("paths must be a list")
+        if isinstance(starts, int):
+            starts = [starts] * len(paths)
+        if isinstance(ends, int):
+            ends = [ends] * len(paths)
+        if not (len(paths) == len(starts) == len(ends)):
+            raise ValueError("paths, starts and ends must have the same length")
+
+        by_path = OrderedDict()
+        for ind, path in enumerate(paths):
+            by_path.setdefault(path, list()).append(ind)
+
+        results = [None] * len(paths)
+        for path, indices in by_path.items():
+            try:
+                fpath = self._to_fsxpath(path)
+                ranges = [
+                    _resolve_range(starts[ind], ends[ind], lambda: fpath.size)
+                    for ind in indices
+                ]
+                kw = dict() if max_gap is None else dict(gap=max_gap)
+                datas = fpath.read_ranges(ranges, **kw)
+                for ind, data in zip(indices, datas):
+                    results[ind] = data
+            except Exception as e:
+                if on_error == "raise":
+                    raise
+                for ind in indices:
+                    results[ind] = e
+        return results
+
+    def _open(
+        self,
+        path,
+        mode="rb",
+        block_size=None,
+        autocommit=True,
+        cache_options=None,
+        **kwargs
+    ):
+        if mode == "rb":
+            options = dict(max_blocks=self.cache_blocks, read_ahead=self.read_ahead)
+            if cache_options:
+                options.update(cache_options)
+            return FsxFile(
+                self,
+                path,
+                mode=mode,
+                block_size=block_size or self.block_size,
+                cache_options=options,
+                size=kwargs.pop("size", None),
+            )
+        return self._to_fsxpath(path).open(mode, write_behind=DEFAULT_WRITE_BEHIND_DEPTH)
@@ -2,8 +2,13 @@
 
 
 import hashlib
+from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 DEFAULT_CHUNK_SIZE = 1 << 13
+DEFAULT_BLOCK_SIZE = 1 << 26  # 64 MB per merkle leaf
+DEFAULT_READ_SIZE = 1 << 20
+DEFAULT_WORKERS = 8
 
 
 def get_hash(
@@ -44,3 +49,173 @@ def get_hash(
                 m.update(data)
 
     return m.hexdigest()
+
+
+class MerkleHash:
+    """
+    The result of :func:`get_merkle_hash`. Keeps the hash of every fixed size
+    block of the file, so two versions of a big file can be compared block
+    by block with :meth:`diff` without reading the file again.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(
+        self,
+        root: str,
+        block_hashes: List[str],
+        block_size: int,
+        size: int,
+        hash_name: str,
+    ):
+        self.root = root
+        self.block_hashes = block_hashes
+        self.block_size = block_size
+        self.size = size
+        self.hash_name = hash_name
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(root={self.root!r}, "
+            f"n_blocks={len(self.block_hashes)}, block_size={self.block_size})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MerkleHash):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def block_range(self, index: int) -> Tuple[int, int]:
+        """
+        Return the ``(offset, length)`` of the n-th block in the file.
+        """
+        offset = index * self.block_size
+        return offset, min(self.block_size, self.size - offset)
+
+    def diff(self, other: 'MerkleHash') -> List[int]:
+        """
+        Return the index of blocks that are different from the other
+        merkle hash. Blocks that only exist in one side are also included.
+        """
+        if (self.block_size != other.block_size) or (self.hash_name != other.hash_name):
+            raise ValueError(
+                "cannot compare merkle hash built with different "
+                "block_size or hash method!"
+            )
+        n = max(len(self.block_hashes), len(other.block_hashes))
+        return [
+            ind
+            for ind in range(n)
+            if ind >= len(self.block_hashes)
+               or ind >= len(other.block_hashes)
+               or self.block_hashes[ind] != other.block_hashes[ind]
+        ]
+
+    def to_dict(self) -> dict:
+        return dict(
+            root=self.root,
+            block_hashes=list(self.block_hashes),
+            block_size=self.block_size,
+            size=self.size,
+            hash_name=self.hash_name,
+        )
+
+    @classmethod
+    def from_dict(cls, dct: dict) -> 'MerkleHash':
+        return cls(**dct)
+
+
+def _get_size(file_obj, open_kwargs: dict) -> int:
+    with file_obj.open("rb", **open_kwargs) as f:
+        return f.seek(0, 2)
+
+
+def _hash_range(
+    file_obj,
+    open_kwargs: dict,
+    hash_meth,
+    offset: int,
+    length: int,
+    chunk_size: int,
+) -> bytes:
+    m = hash_meth()
+    with file_obj.open("rb", **open_kwargs) as f:
+        f.seek(offset)
+        remaining = length
+        while remaining:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            m.update(data)
+            remaining -= len(data)
+    return m.digest()
+
+
+def _merkle_root(digests: List[bytes], hash_meth) -> bytes:
+    if len(digests) == 0:
+        return hash_meth().digest()
+    level = digests
+    while len(level) > 1:
+        next_level = list()
+        for ind in range(0, len(level), 2):
+            if ind + 1 < len(level):
+                next_level.append(hash_meth(level[ind] + level[ind + 1]).digest())
+            else:  # odd node is promoted to the next level as it is
+                next_level.append(level[ind])
+        level = next_level
+    return level[0]
+
+
+def get_merkle_hash(
+    file_obj,
+    open_kwargs: dict = None,
+    hash_meth=hashlib.md5,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    chunk_size: int = DEFAULT_READ_SIZE,
+    workers: int = DEFAULT_WORKERS,
+) -> MerkleHash:
+    """
+    Split the file into ``block_size`` ranges, hash the ranges concurrently
+    with ``workers`` threads (each thread opens its own file handle), then
+    combine the block hashes pairwise into a root hash.
+
+    If the file is not larger than ``block_size``, the root hash is the same
+    as :func:`get_hash`.
+
+    .. versionadded:: 0.0.2
+    """
+    if open_kwargs is None:
+        open_kwargs = dict()
+    if block_size < 1:
+        raise ValueError("block_size cannot smaller than 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size cannot smaller than 1")
+    if workers < 1:
+        raise ValueError("workers cannot smaller than 1")
+
+    size = _get_size(file_obj, open_kwargs)
+    offsets = list(range(0, size, block_size))
+
+    def hash_block(offset: int) -> bytes:
+        return _hash_range(
+            file_obj,
+            open_kwargs,
+            hash_meth,
+            offset,
+            min(block_size, size - offset),
+            chunk_size,
+        )
+
+    if workers == 1 or len(offsets) <= 1:
+        digests = [hash_block(offset) for offset in offsets]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            digests = list(executor.map(hash_block, offsets))
+
+    return MerkleHash(
+        root=_merkle_root(digests, hash_meth).hex(),
+        block_hashes=[digest.hex() for digest in digests],
+        block_size=block_size,
+        size=size,
+        hash_name=hash_meth().name,
+    )
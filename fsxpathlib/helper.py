@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from datetime import datetime, timedelta, timezone
+from typing import Union, Optional
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
 MAGNITUDE_OF_DATA = {
     i: v
     for i, v in enumerate(["B", "KB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB"])
@@ -92,3 +97,32 @@ def parse_data_size(s):  # pragma: no cover
 
     unit = 1024 ** unit_ind
     return int(digit * unit)
+
+
+def datetime_to_ns(dt: datetime) -> int:
+    """
+    Convert a datetime to nanoseconds since epoch without losing precision
+    in float. Naive datetime is considered as UTC.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000000 + delta.microseconds * 1000
+
+
+def get_cutoff(
+    value: Union[timedelta, datetime, None],
+    name: str = "older_than",
+) -> Optional[float]:
+    """
+    Convert an age rule to a timestamp, a ``timedelta`` means this long ago,
+    a ``datetime`` is used as is. ``name`` is the parameter name in the
+    error message.
+    """
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        return (datetime.now() - value).timestamp()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    raise TypeError(f"{name} has to be timedelta or datetime, got {value!r}")
@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local SQLite index of the metadata of an FSx directory tree.
+
+:class:`MetadataIndex` snapshots the stat of every entry under a directory
+into a local SQLite database, queries by extension, size, modification time
+and prefix then run locally without sending any SMB request::
+
+    >>> from fsxpathlib.index import MetadataIndex
+    >>> index = MetadataIndex(fpath_root, "/tmp/share.sqlite")
+    >>> index.refresh()
+    >>> for p in index.query(exts=[".csv"], min_size=1 << 30):
+    ...     print(p, p.size)
+
+:meth:`MetadataIndex.refresh` is incremental: every indexed directory is
+stat-ed, only the directories whose modification time changed since they
+were last listed are listed again. Creating, deleting or renaming an entry
+updates the modification time of its parent directory, but modifying a file
+in place doesn't, so the size and modification time of an existing file are
+only updated when its directory changes, or with ``refresh(full=True)``.
+
+.. versionadded:: 0.0.2
+"""
+
+import stat
+import ntpath
+import sqlite3
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Iterable, Optional, Union
+
+import smbclient
+
+from .hashes import DEFAULT_WORKERS
+from .helper import get_cutoff
+from .logger import logger, TAB1
+from .path import FsxPath, FsxPathIterProxy
+
+SEP = "\\"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY COLLATE NOCASE,
+    parent TEXT NOT NULL COLLATE NOCASE,
+    ext TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    st_mode INTEGER NOT NULL,
+    st_ino INTEGER NOT NULL,
+    st_size INTEGER NOT NULL,
+    st_atime_ns INTEGER NOT NULL,
+    st_mtime_ns INTEGER NOT NULL,
+    st_ctime_ns INTEGER NOT NULL,
+    st_chgtime_ns INTEGER NOT NULL,
+    st_file_attributes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY COLLATE NOCASE,
+    listed_mtime_ns INTEGER NOT NULL
+);
+"""
+
+_STAT_COLUMNS = (
+    "st_mode", "st_ino", "st_size", "st_atime_ns", "st_mtime_ns",
+    "st_ctime_ns", "st_chgtime_ns", "st_file_attributes",
+)
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}{SEP}{name}" if parent else name
+
+
+def _subtree_condition(relpath: str) -> Tuple[str, tuple]:
+    """
+    SQL condition matching ``relpath`` and everything under it. ``]`` is the
+    character right after the separator ``\\``, the range scan can use the
+    primary key index.
+    """
+    return (
+        "(path = ? OR (path >= ? AND path < ?))",
+        (relpath, relpath + SEP, relpath + "]"),
+    )
+
+
+def _stat_to_row(st: smbclient.SMBStatResult) -> tuple:
+    return tuple(getattr(st, column) for column in _STAT_COLUMNS)
+
+
+def _row_to_stat(row: tuple) -> smbclient.SMBStatResult:
+    (
+        st_mode, st_ino, st_size, st_atime_ns, st_mtime_ns,
+        st_ctime_ns, st_chgtime_ns, st_file_attributes,
+    ) = row
+    return smbclient.SMBStatResult(
+        st_mode=st_mode,
+        st_ino=st_ino,
+        st_dev=0,
+        st_nlink=1,
+        st_uid=0,
+        st_gid=0,
+        st_size=st_size,
+        st_atime=st_atime_ns / 1000000000,
+        st_mtime=st_mtime_ns / 1000000000,
+        st_ctime=st_ctime_ns / 1000000000,
+        st_chgtime=st_chgtime_ns / 1000000000,
+        st_atime_ns=st_atime_ns,
+        st_mtime_ns=st_mtime_ns,
+        st_ctime_ns=st_ctime_ns,
+        st_chgtime_ns=st_chgtime_ns,
+        st_file_attributes=st_file_attributes,
+        st_reparse_tag=0,
+    )
+
+
+class RefreshResult:
+    """
+    Summary of a :meth:`MetadataIndex.refresh`.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(self):
+        self.n_dirs_listed = 0
+        self.n_dirs_unchanged = 0
+        self.n_dirs_failed = 0
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(n_dirs_listed={self.n_dirs_listed}, "
+            f"n_dirs_unchanged={self.n_dirs_unchanged}, "
+            f"n_dirs_failed={self.n_dirs_failed})"
+        )
+
+
+class MetadataIndex:
+    """
+    SQLite snapshot of the metadata of the entries under the directory
+    ``root``. Paths are stored relative to ``root`` and compared case
+    insensitively. The database is only accessed from the calling thread,
+    the SMB requests of :meth:`refresh` are sent by ``workers`` threads.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(
+        self,
+        root: FsxPath,
+        db_path: str,
+        workers: int = DEFAULT_WORKERS,
+    ):
+        if workers < 1:
+            raise ValueError("workers cannot smaller than 1")
+        self.root = root
+        self.db_path = str(db_path)
+        self.workers = workers
+        self._conn = sqlite3.connect(self.db_path)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'root'"
+            ).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('root', ?)",
+                    (root.abspath,),
+                )
+            elif row[0].lower() != root.abspath.lower():
+                raise ValueError(
+                    f"{self.db_path} is the index of {row[0]}, not {root.abspath}"
+                )
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(root={self.root.abspath!r}, "
+            f"db_path={self.db_path!r})"
+        )
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # --------------------------------------------------------------------------
+    # refresh
+    # --------------------------------------------------------------------------
+    def _fpath(self, relpath: str) -> FsxPath:
+        if relpath:
+            return self.root._make_descendant(*relpath.split(SEP))
+        return self.root
+
+    def _check_dir(
+        self,
+        relpath: str,
+        mtime_ns: Optional[int],
+        listed_mtime_ns: Optional[int],
+    ) -> Tuple[int, Optional[List[Tuple[str, smbclient.SMBStatResult]]]]:
+        """
+        Runs in worker thread. Get the current modification time of the
+        directory if unknown, list it if it changed since last listed.
+        The time is taken before listing, so a change during the listing
+        is picked up by the next refresh.
+        """
+        fpath = self._fpath(relpath)
+        if mtime_ns is None:
+            mtime_ns = smbclient.stat(fpath.abspath).st_mtime_ns
+        if mtime_ns == listed_mtime_ns:
+            return mtime_ns, None
+        children = [
+            (p.basename, p._stat())
+            for p, _ in fpath._iter_scandir()
+        ]
+        return mtime_ns, children
+
+    def _get_listed_mtime(self, relpath: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT listed_mtime_ns FROM dirs WHERE path = ?", (relpath,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _delete_subtree(self, relpath: str):
+        condition, params = _subtree_condition(relpath)
+        self._conn.execute(f"DELETE FROM entries WHERE {condition}", params)
+        self._conn.execute(f"DELETE FROM dirs WHERE {condition}", params)
+
+    def _apply_listing(
+        self,
+        relpath: str,
+        mtime_ns: int,
+        children: List[Tuple[str, smbclient.SMBStatResult]],
+    ) -> List[Tuple[str, int]]:
+        """
+        Replace the children of the directory with the new listing, return
+        ``(relpath, mtime_ns)`` of the sub directories.
+        """
+        new_is_dir = {
+            name.lower(): stat.S_ISDIR(st.st_mode)
+            for name, st in children
+        }
+        for child, is_dir in self._conn.execute(
+            "SELECT path, is_dir FROM entries WHERE parent = ?", (relpath,)
+        ).fetchall():
+            name = child.rsplit(SEP, 1)[-1].lower()
+            if new_is_dir.get(name) is None:
+                self._delete_subtree(child)
+            elif is_dir and (not new_is_dir[name]):
+                self._delete_subtree(child)
+
+        sub_dirs = list()
+        rows = list()
+        for name, st in children:
+            child = _join(relpath, name)
+            is_dir = stat.S_ISDIR(st.st_mode)
+            if is_dir:
+                sub_dirs.append((child, st.st_mtime_ns))
+            rows.append(
+                (child, relpath, ntpath.splitext(name)[1].lower(), int(is_dir))
+                + _stat_to_row(st)
+            )
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO entries "
+            f"(path, parent, ext, is_dir, {', '.join(_STAT_COLUMNS)}) "
+            f"VALUES ({', '.join(['?'] * (4 + len(_STAT_COLUMNS)))})",
+            rows,
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dirs (path, listed_mtime_ns) VALUES (?, ?)",
+            (relpath, mtime_ns),
+        )
+        return sub_dirs
+
+    def refresh(self, full: bool = False) -> RefreshResult:
+        """
+        Bring the index up to date, level by level from the root. Each
+        directory costs one ``stat`` request if unchanged, and a listing if
+        changed or new. Sub directories that cannot be accessed keep their
+        old entries.
+
+        :param full: list every directory again, also picks up the files
+            modified in place.
+        """
+        result = RefreshResult()
+        level: List[Tuple[str, Optional[int]]] = [("", None)]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while level:
+                args = [
+                    (relpath, mtime_ns, None if full else self._get_listed_mtime(relpath))
+                    for relpath, mtime_ns in level
+                ]
+                futures = [
+                    executor.submit(self._check_dir, *arg)
+                    for arg in args
+                ]
+                next_level = list()
+                with self._conn:
+                    for (relpath, _, _), future in zip(args, futures):
+                        try:
+                            mtime_ns, children = future.result()
+                        except FileNotFoundError:
+                            if relpath == "":
+                                raise
+                            self._delete_subtree(relpath)
+                            result.n_dirs_failed += 1
+                            continue
+                        except OSError as e:
+                            if relpath == "":
+                                raise
+                            logger.info(f"{TAB1}cannot list {self._fpath(relpath)}: {e!r}")
+                            result.n_dirs_failed += 1
+                            continue
+                        if children is None:
+                            result.n_dirs_unchanged += 1
+                            next_level.extend(
+                                (child, None)
+                                for (child,) in self._conn.execute(
+                                    "SELECT path FROM entries "
+                                    "WHERE parent = ? AND is_dir = 1",
+                                    (relpath,),
+                                )
+                            )
+                        else:
+                            result.n_dirs_listed += 1
+                            next_level.extend(
+                                self._apply_listing(relpath, mtime_ns, children)
+                            )
+                level = next_level
+        return result
+
+    # --------------------------------------------------------------------------
+    # query
+    # --------------------------------------------------------------------------
+    def _to_fsxpath(self, relpath: str, stat_row: tuple) -> FsxPath:
+        p = self.root._make_descendant(*relpath.split(SEP))
+        p._stat_cache = _row_to_stat(stat_row)
+        return p
+
+    def _query(
+        self,
+        include_dirs: bool,
+        include_files: bool,
+        exts: Optional[List[str]],
+        min_size: Optional[int],
+        max_size: Optional[int],
+        older_than: Union[timedelta, datetime, None],
+        newer_than: Union[timedelta, datetime, None],
+        prefix: Optional[str],
+        recursive: bool,
+    ) -> Iterable[FsxPath]:
+        conditions = list()
+        params = list()
+        if not include_dirs:
+            conditions.append("is_dir = 0")
+        if not include_files:
+            conditions.append("is_dir = 1")
+        if exts:
+            conditions.append(f"ext IN ({', '.join(['?'] * len(exts))})")
+            params.extend(ext.lower() for ext in exts)
+        if min_size is not None:
+            conditions.append("st_size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            conditions.append("st_size <= ?")
+            params.append(max_size)
+        max_mtime = get_cutoff(older_than)
+        if max_mtime is not None:
+            conditions.append("st_mtime_ns < ?")
+            params.append(int(max_mtime * 1000000000))
+        min_mtime = get_cutoff(newer_than, name="newer_than")
+        if min_mtime is not None:
+            conditions.append("st_mtime_ns > ?")
+            params.append(int(min_mtime * 1000000000))
+        prefix = (prefix or "").strip(SEP)
+        if not recursive:
+            conditions.append("parent = ?")
+            params.append(prefix)
+        elif prefix:
+            conditions.append("path >= ? AND path < ?")
+            params.extend([prefix + SEP, prefix + "]"])
+        sql = f"SELECT path, {', '.join(_STAT_COLUMNS)} FROM entries"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY path"
+        for row in self._conn.execute(sql, params):
+            yield self._to_fsxpath(row[0], row[1:])
+
+    def query(
+        self,
+        include_dirs: bool = True,
+        include_files: bool = True,
+        exts: List[str] = None,
+        min_size: int = None,
+        max_size: int = None,
+        older_than: Union[timedelta, datetime] = None,
+        newer_than: Union[timedelta, datetime] = None,
+        prefix: str = None,
+        recursive: bool = True,
+    ) -> FsxPathIterProxy:
+        """
+        Query the snapshot, similar to :meth:`~fsxpathlib.path.FsxPath.select`.
+        The returned paths carry the stat from the snapshot.
+
+        :param exts: file extensions, case insensitive, e.g. ``[".csv"]``.
+        :param older_than: modified before this time, or this long ago.
+        :param newer_than: modified after this time, or within this long.
+        :param prefix: only entries under this sub directory, relative to
+            ``root``, e.g. ``"logs\\2023"``.
+        :param recursive: if False, only the direct children of ``prefix``.
+        """
+        return FsxPathIterProxy(
+            iterable=self._query(
+                include_dirs=include_dirs,
+                include_files=include_files,
+                exts=exts,
+                min_size=min_size,
+                max_size=max_size,
+                older_than=older_than,
+                newer_than=newer_than,
+                prefix=prefix,
+                recursive=recursive,
+            )
+        )
+
+    def query_file(self, **kwargs) -> FsxPathIterProxy:
+        return self.query(include_dirs=False, **kwargs)
+
+    def query_dir(self, **kwargs) -> FsxPathIterProxy:
+        return self.query(include_files=False, **kwargs)
+
+    def count(self) -> int:
+        """
+        Number of indexed entries.
+        """
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def total_size(self, prefix: str = None) -> int:
+        """
+        Total size of the indexed files, optionally under ``prefix``.
+        """
+        sql = "SELECT COALESCE(SUM(st_size), 0) FROM entries WHERE is_dir = 0"
+        params = list()
+        prefix = (prefix or "").strip(SEP)
+        if prefix:
+            sql += " AND path >= ? AND path < ?"
+            params.extend([prefix + SEP, prefix + "]"])
+        return self._conn.execute(sql, params).fetchone()[0]
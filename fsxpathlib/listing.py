@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compact, array backed result of a recursive directory listing.
+
+A :class:`~fsxpathlib.path.FsxPath` with its cached stat takes about one
+kilobyte of memory, listing a share with ten million entries into a list
+of paths takes gigabytes. :class:`Listing` keeps the names of all entries in
+one UTF-8 blob, and the parent index, size, modification time and file
+attributes in packed arrays, a few dozen bytes per entry. The
+:class:`~fsxpathlib.path.FsxPath` objects are not kept, they are created
+again when you index into or iterate over the listing. Example::
+
+    >>> listing = fpath.listing()
+    >>> big = listing.filter(include_dirs=False, min_size=1 << 30)
+    >>> for p in big.sort_by("size", reverse=True)[:10]:
+    ...     print(p)
+
+:meth:`Listing.filter` and :meth:`Listing.sort_by` return a view that shares
+the arrays with the original listing.
+"""
+
+import stat
+import fnmatch
+from array import array
+from collections import deque
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, List, Tuple, Iterable, Callable, Union
+
+from .helper import repr_data_size, get_cutoff
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .path import FsxPath
+
+KIND_FILE = 0
+KIND_DIR = 1
+KIND_SYMLINK = 2
+
+SORT_KEYS = ("name", "path", "size", "mtime")
+
+
+class _Table:
+    """
+    The column storage shared by a listing and all its views. Row ``i`` is
+    the ``i`` th entry in the order of listing, parent directories always
+    come before their children.
+    """
+
+    __slots__ = (
+        "names", "offsets", "parents", "kinds", "sizes", "mtimes", "attrs",
+        "_path_ranks",
+    )
+
+    def __init__(self):
+        self.names = bytearray()
+        self.offsets = array("Q", [0])
+        self.parents = array("q")
+        self.kinds = array("B")
+        self.sizes = array("q")
+        self.mtimes = array("q")
+        self.attrs = array("L")
+        self._path_ranks = None
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def append(
+        self,
+        parent: int,
+        name: str,
+        kind: int,
+        size: int,
+        mtime_ns: int,
+        attrs: int,
+    ) -> int:
+        self.names += name.encode("utf-8")
+        self.offsets.append(len(self.names))
+        self.parents.append(parent)
+        self.kinds.append(kind)
+        self.sizes.append(size)
+        self.mtimes.append(mtime_ns)
+        self.attrs.append(attrs)
+        self._path_ranks = None
+        return len(self.parents) - 1
+
+    def name(self, row: int) -> str:
+        return self.names[self.offsets[row]:self.offsets[row + 1]].decode("utf-8")
+
+    def parts(self, row: int) -> List[str]:
+        parts = list()
+        while row != -1:
+            parts.append(self.name(row))
+            row = self.parents[row]
+        parts.reverse()
+        return parts
+
+    def path_ranks(self) -> array:
+        """
+        Position of every row in path order: depth first, the children of a
+        directory sorted by lower case name. Computed once, the sort keys
+        of the parent grouping and the walk are plain integers.
+        """
+        if self._path_ranks is None:
+            n = len(self)
+            by_name = sorted(range(n), key=lambda row: self.name(row).lower())
+            # stable sort, the children of each parent stay in name order
+            grouped = array("q", sorted(by_name, key=self.parents.__getitem__))
+            del by_name
+            # the children of row ``p`` are grouped[starts[p + 1]:starts[p + 2]]
+            starts = array("q", [0]) * (n + 2)
+            for parent in self.parents:
+                starts[parent + 2] += 1
+            for k in range(2, n + 2):
+                starts[k] += starts[k - 1]
+            ranks = array("q", [0]) * n
+            stack = list(reversed(grouped[starts[0]:starts[1]]))
+            rank = 0
+            while stack:
+                row = stack.pop()
+                ranks[row] = rank
+                rank += 1
+                stack.extend(reversed(grouped[starts[row + 1]:starts[row + 2]]))
+            self._path_ranks = ranks
+        return self._path_ranks
+
+    def nbytes(self) -> int:
+        return len(self.names) + sum(
+            a.itemsize * len(a)
+            for a in (
+                self.offsets, self.parents, self.kinds,
+                self.sizes, self.mtimes, self.attrs,
+            )
+        )
+
+
+def iter_entries(
+    fpath: 'FsxPath',
+    recursive: bool = True,
+) -> Iterable[Tuple[int, 'FsxPath', bool]]:
+    """
+    List ``fpath`` breadth first with
+    :meth:`~fsxpathlib.path.FsxPath._iter_scandir`, yield
+    ``(parent, path, is_dir)``, ``parent`` is the position of the parent
+    directory in the yielded sequence, -1 for the direct children of
+    ``fpath``. The stat of ``path`` is cached from the listing. Sub
+    directories that cannot be listed are skipped, symlinks to directories
+    are not followed, same as :meth:`~fsxpathlib.path.FsxPath.select`.
+
+    .. versionadded:: 0.0.2
+    """
+    queue = deque([(-1, fpath)])
+    i = 0
+    while queue:
+        parent, p_dir = queue.popleft()
+        try:
+            for p, is_dir in p_dir._iter_scandir():
+                if recursive and is_dir and (not stat.S_ISLNK(p._stat().st_mode)):
+                    queue.append((i, p))
+                yield parent, p, is_dir
+                i += 1
+        except OSError:
+            if parent == -1:
+                raise
+
+
+def _scan(fpath: 'FsxPath', table: _Table, recursive: bool):
+    for parent, p, is_dir in iter_entries(fpath, recursive=recursive):
+        st = p._stat()
+        if stat.S_ISLNK(st.st_mode):
+            kind = KIND_SYMLINK
+        elif is_dir:
+            kind = KIND_DIR
+        else:
+            kind = KIND_FILE
+        table.append(
+            parent=parent,
+            name=p.basename,
+            kind=kind,
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            attrs=st.st_file_attributes,
+        )
+
+
+class Listing:
+    """
+    Packed listing of the entries under :attr:`root`. Use
+    :meth:`~fsxpathlib.path.FsxPath.listing` to create one.
+
+    Indexing with an integer returns a :class:`~fsxpathlib.path.FsxPath`,
+    indexing with a slice returns a view. The metadata accessors
+    :meth:`size`, :meth:`mtime` etc. read the arrays directly without
+    creating the path.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(
+        self,
+        root: 'FsxPath',
+        table: _Table = None,
+        rows: Union[array, range] = None,
+    ):
+        self.root = root
+        self._table = _Table() if table is None else table
+        self._rows = rows
+
+    @classmethod
+    def scan(
+        cls,
+        fpath: 'FsxPath',
+        recursive: bool = True,
+    ) -> 'Listing':
+        """
+        List the entries under the directory ``fpath``.
+        """
+        fpath.assert_is_dir_and_exists()
+        listing = cls(root=fpath)
+        _scan(fpath, listing._table, recursive=recursive)
+        return listing
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(root={self.root.abspath!r}, "
+            f"n_entries={len(self)})"
+        )
+
+    def __len__(self) -> int:
+        if self._rows is None:
+            return len(self._table)
+        return len(self._rows)
+
+    def _row(self, i: int) -> int:
+        if self._rows is None:
+            n = len(self._table)
+            if i < 0:
+                i += n
+            if not (0 <= i < n):
+                raise IndexError("listing index out of range")
+            return i
+        return self._rows[i]
+
+    def _iter_rows(self) -> Iterable[int]:
+        if self._rows is None:
+            return range(len(self._table))
+        return self._rows
+
+    def _view(self, rows: Union[Iterable[int], range]) -> 'Listing':
+        # a range or an array slice is already compact, keep it as is
+        if not isinstance(rows, (range, array)):
+            rows = array("q", rows)
+        return self.__class__(
+            root=self.root,
+            table=self._table,
+            rows=rows,
+        )
+
+    def __getitem__(self, i: Union[int, slice]) -> Union['FsxPath', 'Listing']:
+        if isinstance(i, slice):
+            # slicing a range or an array doesn't copy the rows one by one
+            if self._rows is None:
+                return self._view(range(len(self._table))[i])
+            return self._view(self._rows[i])
+        return self.root._make_descendant(*self._table.parts(self._row(i)))
+
+    def __iter__(self) -> Iterable['FsxPath']:
+        for row in self._iter_rows():
+            yield self.root._make_descendant(*self._table.parts(row))
+
+    def name(self, i: int) -> str:
+        return self._table.name(self._row(i))
+
+    def relpath(self, i: int) -> str:
+        """
+        Path of the entry relative to :attr:`root`.
+        """
+        return "\\".join(self._table.parts(self._row(i)))
+
+    def abspath(self, i: int) -> str:
+        return self.root.abspath + "\\" + self.relpath(i)
+
+    def is_dir(self, i: int) -> bool:
+        return self._table.kinds[self._row(i)] == KIND_DIR
+
+    def is_file(self, i: int) -> bool:
+        return self._table.kinds[self._row(i)] == KIND_FILE
+
+    def is_symlink(self, i: int) -> bool:
+        return self._table.kinds[self._row(i)] == KIND_SYMLINK
+
+    def size(self, i: int) -> int:
+        return self._table.sizes[self._row(i)]
+
+    def mtime(self, i: int) -> float:
+        return self._table.mtimes[self._row(i)] / 1000000000
+
+    def mtime_ns(self, i: int) -> int:
+        return self._table.mtimes[self._row(i)]
+
+    def file_attributes(self, i: int) -> int:
+        return self._table.attrs[self._row(i)]
+
+    def filter(
+        self,
+        func: Callable[['Listing', int], bool] = None,
+        include_dirs: bool = True,
+        include_files: bool = True,
+        min_size: int = None,
+        max_size: int = None,
+        older_than: Union[timedelta, datetime] = None,
+        newer_than: Union[timedelta, datetime] = None,
+        pattern: str = None,
+    ) -> 'Listing':
+        """
+        Return a view of the entries matching all the given rules. The rules
+        are evaluated on the arrays, no path object is created.
+
+        :param func: custom rule, called with ``(listing, i)``, ``i`` is the
+            position in this listing.
+        :param older_than: modified before this time, or this long ago.
+        :param newer_than: modified after this time, or within this long.
+        :param pattern: the name matches this glob pattern, case insensitive.
+        """
+        t = self._table
+        max_mtime = get_cutoff(older_than)
+        min_mtime = get_cutoff(newer_than, name="newer_than")
+        if max_mtime is not None:
+            max_mtime = int(max_mtime * 1000000000)
+        if min_mtime is not None:
+            min_mtime = int(min_mtime * 1000000000)
+        if pattern is not None:
+            pattern = pattern.lower()
+
+        rows = list()
+        for i, row in enumerate(self._iter_rows()):
+            if t.kinds[row] == KIND_FILE:
+                if not include_files:
+                    continue
+            elif not include_dirs:
+                continue
+            if (min_size is not None) and (t.sizes[row] < min_size):
+                continue
+            if (max_size is not None) and (t.sizes[row] > max_size):
+                continue
+            if (max_mtime is not None) and (t.mtimes[row] >= max_mtime):
+                continue
+            if (min_mtime is not None) and (t.mtimes[row] <= min_mtime):
+                continue
+            if (pattern is not None) and (
+                not fnmatch.fnmatchcase(t.name(row).lower(), pattern)
+            ):
+                continue
+            if (func is not None) and (not func(self, i)):
+                continue
+            rows.append(row)
+        return self._view(rows)
+
+    def files(self) -> 'Listing':
+        return self.filter(include_dirs=False)
+
+    def dirs(self) -> 'Listing':
+        return self.filter(include_files=False)
+
+    def sort_by(
+        self,
+        key: str = "path",
+        reverse: bool = False,
+    ) -> 'Listing':
+        """
+        Return a sorted view.
+
+        :param key: one of ``"name"``, ``"path"``, ``"size"``, ``"mtime"``.
+            Names are compared case insensitively, ``"path"`` sorts a
+            directory right before its children.
+        """
+        t = self._table
+        if key == "size":
+            func = t.sizes.__getitem__
+        elif key == "mtime":
+            func = t.mtimes.__getitem__
+        elif key == "name":
+            def func(row: int) -> str:
+                return t.name(row).lower()
+        elif key == "path":
+            func = t.path_ranks().__getitem__
+        else:
+            raise ValueError(f"key has to be one of {SORT_KEYS}, got {key!r}")
+        return self._view(sorted(self._iter_rows(), key=func, reverse=reverse))
+
+    def total_size(self) -> int:
+        """
+        Total size of the files in the listing.
+        """
+        t = self._table
+        return sum(
+            t.sizes[row]
+            for row in self._iter_rows()
+            if t.kinds[row] == KIND_FILE
+        )
+
+    def nbytes(self) -> int:
+        """
+        Memory used by the arrays, including the rows of this view.
+        """
+        n = self._table.nbytes()
+        if isinstance(self._rows, array):
+            n += self._rows.itemsize * len(self._rows)
+        return n
+
+    def nbytes_for_human(self) -> str:
+        return repr_data_size(self.nbytes())
@@ -2,26 +2,53 @@
 
 from typing import (
     TYPE_CHECKING,
-    List, Set, Union, Iterable,
+    List, Set, Dict, Tuple, Union, Iterable, Callable, Optional, Any,
 )
+import sys
+import stat
+import time
+import shutil
 import hashlib
+from datetime import datetime, timedelta
 
 import smbclient
 import smbclient.shutil
+from smbprotocol.file_info import FileAttributes
 
 from pathlib import PureWindowsPath
 
 from pathlib_mate import Path
 from s3pathlib import S3Path
 
-from .helper import repr_data_size
-from .hashes import get_hash
+from . import exc
+from . import bulk
+from .bulk import BulkResult, PurgeResult
+from .helper import repr_data_size, datetime_to_ns
+from .hashes import (
+    get_hash, get_merkle_hash, MerkleHash,
+    DEFAULT_BLOCK_SIZE, DEFAULT_WORKERS,
+)
 from .logger import logger, TAB1, TAB2, TAB3
-from .vendors.iterproxy import IterProxy
+from .dedup import find_duplicates, DuplicateGroup, DEFAULT_NBYTES
+from .listing import Listing
+from .usage import DirUsage, disk_usage
+from .s3sync import TransferPlan, plan_s3_upload, DEFAULT_MD5_METADATA_KEY
+from .diff import (
+    DiffEntry, iter_fsx_tree, iter_local_tree, diff_trees, DEFAULT_MTIME_TOLERANCE,
+)
+from .transfer import download_ranged, upload_mmap, DEFAULT_RANGE_SIZE
+from .stream import (
+    readinto_full, read_range, read_ranges, iter_records, LineDecoder,
+    DEFAULT_COALESCE_GAP,
+    open_read_ahead, DEFAULT_READ_AHEAD_CHUNK_SIZE, DEFAULT_READ_AHEAD_DEPTH,
+    open_write_behind, DEFAULT_WRITE_BEHIND_CHUNK_SIZE, DEFAULT_WRITE_BEHIND_DEPTH,
+)
+from .vendors.iterproxy import IterProxy, Aggregate, Key
 
 if TYPE_CHECKING:  # pragma: no cover
     from pathlib_mate import Path
     from s3pathlib import S3Path
+    from .cache import DiskCache
 
 
 class FsxPathIterProxy(IterProxy):  # pragma: no cover
@@ -49,6 +76,46 @@ class FsxPathIterProxy(IterProxy):  # pragma: no cover
     def all(self) -> List['FsxPath']:
         return super(FsxPathIterProxy, self).all()
 
+    def top_k(self, key: Key, k: int) -> List['FsxPath']:
+        """
+        Return the k largest paths by ``key``, for example ``"size"`` or
+        ``"mtime"``, read from the stat cached by
+        :meth:`FsxPath.select`, with O(k) memory.
+
+        .. versionadded:: 0.0.2
+        """
+        return super(FsxPathIterProxy, self).top_k(key, k)
+
+    def bottom_k(self, key: Key, k: int) -> List['FsxPath']:
+        """
+        Return the k smallest paths by ``key``, with O(k) memory.
+
+        .. versionadded:: 0.0.2
+        """
+        return super(FsxPathIterProxy, self).bottom_k(key, k)
+
+    def sort_by(self, key: Key, limit: int = None, reverse: bool = False) -> List['FsxPath']:
+        """
+        Return the paths sorted by ``key``. With ``limit``, only the first
+        ``limit`` paths are kept in memory, see :meth:`top_k` and
+        :meth:`bottom_k`.
+
+        .. versionadded:: 0.0.2
+        """
+        return super(FsxPathIterProxy, self).sort_by(key, limit=limit, reverse=reverse)
+
+    def group_by(self, key: Key, value: Key = None) -> Dict[Any, Aggregate]:
+        """
+        Return the :class:`~fsxpathlib.vendors.iterproxy.Aggregate` of
+        ``value`` per ``key``, for example the number of files and total
+        size per extension::
+
+            >>> fpath.select_file().group_by(lambda p: p.ext.lower(), "size")
+
+        .. versionadded:: 0.0.2
+        """
+        return super(FsxPathIterProxy, self).group_by(key, value=value)
+
     def filter_by_ext(self, *exts: str) -> 'FsxPathIterProxy':
         n = len(exts)
         if n == 0:
@@ -68,9 +135,94 @@ class FsxPathIterProxy(IterProxy):  # pragma: no cover
 
             return self.filter(f)
 
+    def remove_all(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        on_progress: Callable[[BulkResult], None] = None,
+    ) -> BulkResult:
+        """
+        Remove the remaining paths in parallel, directories are removed with
+        everything inside, see :func:`~fsxpathlib.bulk.remove_many`::
+
+            >>> fpath_root.select_by_ext([".tmp"]).remove_all(workers=16)
+
+        .. versionadded:: 0.0.2
+        """
+        return bulk.remove_many(self, workers=workers, on_progress=on_progress)
+
+    def move_all_to(
+        self,
+        fpath_dir: Union[str, 'FsxPath'],
+        overwrite: bool = False,
+        workers: int = DEFAULT_WORKERS,
+        on_progress: Callable[[BulkResult], None] = None,
+    ) -> BulkResult:
+        """
+        Move the remaining paths into the existing directory ``fpath_dir``
+        in parallel, the base names are kept, see
+        :func:`~fsxpathlib.bulk.move_many`.
+
+        .. versionadded:: 0.0.2
+        """
+        fpath_dir = FsxPath(fpath_dir)
+        return bulk.move_many(
+            ((p, fpath_dir._make_descendant(p.basename)) for p in self),
+            overwrite=overwrite,
+            workers=workers,
+            on_progress=on_progress,
+        )
+
 
 SERVER = r"\\"
 
+# ``_from_parsed_parts(drv, root, parts)`` and ``_parts`` are pathlib internals
+# that are changed in Python 3.12, use the public constructor there
+_FAST_MAKE_CHILD = sys.version_info < (3, 12)
+
+
+def stat_from_dir_entry(entry: smbclient.SMBDirEntry) -> smbclient.SMBStatResult:
+    """
+    Build a stat result from the metadata returned by the directory query,
+    so we don't have to send another SMB request per entry. ``st_dev`` is not
+    part of the directory listing and is always 0.
+    """
+    info = entry.smb_info
+    if info.file_attributes & FileAttributes.FILE_ATTRIBUTE_DIRECTORY:
+        st_mode = stat.S_IFDIR | 0o111
+    else:
+        st_mode = stat.S_IFREG
+    if info.file_attributes & FileAttributes.FILE_ATTRIBUTE_READONLY:
+        st_mode |= 0o444
+    else:
+        st_mode |= 0o666
+    if entry.is_symlink():
+        st_mode ^= stat.S_IFMT(st_mode)
+        st_mode |= stat.S_IFLNK
+
+    atime_ns = datetime_to_ns(info.last_access_time)
+    mtime_ns = datetime_to_ns(info.last_write_time)
+    ctime_ns = datetime_to_ns(info.creation_time)
+    chgtime_ns = datetime_to_ns(info.change_time)
+    return smbclient.SMBStatResult(
+        st_mode=st_mode,
+        st_ino=info.file_id,
+        st_dev=0,
+        st_nlink=1,
+        st_uid=0,
+        st_gid=0,
+        st_size=info.end_of_file,
+        st_atime=atime_ns / 1000000000,
+        st_mtime=mtime_ns / 1000000000,
+        st_ctime=ctime_ns / 1000000000,
+        st_chgtime=chgtime_ns / 1000000000,
+        st_atime_ns=atime_ns,
+        st_mtime_ns=mtime_ns,
+        st_ctime_ns=ctime_ns,
+        st_chgtime_ns=chgtime_ns,
+        st_file_attributes=info.file_attributes,
+        st_reparse_tag=0,
+    )
+
 
 class FsxPath(PureWindowsPath):
     """
@@ -85,10 +237,40 @@ class FsxPath(PureWindowsPath):
         self._stat_cache = None
         self._is_relpath = False
 
+    def _make_descendant(self, *names: str) -> 'FsxPath':
+        """
+        Build a descendant path from this already parsed path and names from
+        the directory listing. It skips the parsing of the full path string,
+        which dominates the cost of ``FsxPath(parent, name)`` in a large walk.
+        The string representation is also derived from the parent's.
+
+        .. versionadded:: 0.0.2
+        """
+        for name in names:
+            if (not name) or ("\\" in name) or ("/" in name) or (name in (".", "..")):
+                raise ValueError(f"invalid name {name!r}")
+        if _FAST_MAKE_CHILD:
+            child = self._from_parsed_parts(self._drv, self._root, self._parts + list(names))
+            if not self._parts:  # empty relative path, str is "."
+                child._str = "\\".join(names)
+            else:
+                parent_str = self.__str__()
+                # a root or a drive without root, like "C:", needs no separator
+                if parent_str.endswith("\\") or (self._drv and not self._root):
+                    child._str = parent_str + "\\".join(names)
+                else:
+                    child._str = parent_str + "\\" + "\\".join(names)
+        else:
+            child = self.__class__(self, *names)
+        # Python 3.10+ doesn't call ``_init()``, set the slots explicitly
+        child._stat_cache = None
+        child._is_relpath = getattr(self, "_is_relpath", False)
+        return child
+
     def is_absolute(self) -> bool:
         """
         """
-        return not self._is_relpath
+        return not getattr(self, "_is_relpath", False)
 
     def absolute(self) -> 'FsxPath':
         """
@@ -218,7 +400,7 @@ class FsxPath(PureWindowsPath):
     __CONCRETE_PATH_ATTR_START_HERE = None  # Just for visual divider and navigator
 
     def _stat(self) -> smbclient.SMBStatResult:
-        if self._stat_cache is None:
+        if getattr(self, "_stat_cache", None) is None:
             self._stat_cache = smbclient.stat(self.abspath)
         return self._stat_cache
 
@@ -306,6 +488,25 @@ class FsxPath(PureWindowsPath):
         """
         return get_hash(file_obj=self, hash_meth=hashlib.sha512)
 
+    def merkle_hash(
+        self,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        workers: int = DEFAULT_WORKERS,
+        hash_meth=hashlib.md5,
+    ) -> MerkleHash:
+        """
+        Hash a large file block by block in parallel, see
+        :func:`~fsxpathlib.hashes.get_merkle_hash`.
+
+        .. versionadded:: 0.0.2
+        """
+        return get_merkle_hash(
+            file_obj=self,
+            hash_meth=hash_meth,
+            block_size=block_size,
+            workers=workers,
+        )
+
     __CONCRETE_PATH_METH_START_HERE = None  # Just for visual divider and navigator
 
     def open(
@@ -319,11 +520,88 @@ class FsxPath(PureWindowsPath):
         desired_access=None,
         file_attributes=None,
         file_type="file",
+        read_ahead: int = 0,
+        read_ahead_chunk_size: int = DEFAULT_READ_AHEAD_CHUNK_SIZE,
+        write_behind: int = 0,
+        write_behind_chunk_size: int = DEFAULT_WRITE_BEHIND_CHUNK_SIZE,
+        preallocate: int = None,
+        cache: 'DiskCache' = None,
         **kwargs
     ):
         """
         File object liked protocol.
-        """
+
+        :param read_ahead: only for read mode. If greater than 0, keep this
+            many READ requests of ``read_ahead_chunk_size`` bytes in flight
+            ahead of the current position, see
+            :class:`~fsxpathlib.stream.ReadAheadReader`. It makes
+            sequential read of large file much faster on high latency
+            network.
+        :param write_behind: only for write mode. If greater than 0, keep
+            this many WRITE requests of ``write_behind_chunk_size`` bytes in
+            flight, see :class:`~fsxpathlib.stream.WriteBehindWriter`. Errors
+            are raised on the next write, ``flush()`` or ``close()``.
+        :param preallocate: only works with ``write_behind``, the number of
+            bytes that will be written, the file is extended up front. In
+            append mode the space is allocated after the existing content.
+
+        ``read_ahead`` and ``write_behind`` only work with ``file_type="file"``,
+        ``share_access``, ``desired_access`` and ``file_attributes`` are
+        passed through.
+        :param cache: only for read mode. Read from the local copy kept in
+            this :class:`~fsxpathlib.cache.DiskCache`, the file is only
+            transferred if the local copy is missing or out of date.
+
+        .. versionchanged:: 0.0.2
+
+            add ``read_ahead``, ``read_ahead_chunk_size``, ``write_behind``,
+            ``write_behind_chunk_size``, ``preallocate`` and ``cache`` parameters.
+        """
+        if cache is not None:
+            return cache.open(
+                self,
+                mode=mode,
+                buffering=buffering,
+                encoding=encoding,
+                errors=errors,
+                newline=newline,
+            )
+        if (read_ahead or write_behind) and (file_type != "file"):
+            raise ValueError(
+                f"read_ahead and write_behind only work with file_type 'file', "
+                f"got {file_type!r}"
+            )
+        if read_ahead:
+            return open_read_ahead(
+                path=self.abspath,
+                mode=mode,
+                chunk_size=read_ahead_chunk_size,
+                depth=read_ahead,
+                buffering=buffering,
+                encoding=encoding,
+                errors=errors,
+                newline=newline,
+                share_access=share_access,
+                desired_access=desired_access,
+                file_attributes=file_attributes,
+                **kwargs
+            )
+        if write_behind:
+            return open_write_behind(
+                path=self.abspath,
+                mode=mode,
+                chunk_size=write_behind_chunk_size,
+                depth=write_behind,
+                preallocate=preallocate,
+                buffering=buffering,
+                encoding=encoding,
+                errors=errors,
+                newline=newline,
+                share_access=share_access,
+                desired_access=desired_access,
+                file_attributes=file_attributes,
+                **kwargs
+            )
         return smbclient.open_file(
             path=self.abspath,
             mode=mode,
@@ -338,18 +616,321 @@ class FsxPath(PureWindowsPath):
             **kwargs
         )
 
-    def write_bytes(self, data: bytes):
+    def write_bytes(
+        self,
+        data: bytes,
+        write_behind: int = 0,
+    ):
         """
+        :param write_behind: number of WRITE requests in flight, see :meth:`open`.
+
+        .. versionchanged:: 0.0.2
+
+            add ``write_behind`` parameter.
         """
-        with self.open(mode="wb") as f:
+        with self.open(
+            mode="wb",
+            write_behind=write_behind,
+            preallocate=len(data) if write_behind else None,
+        ) as f:
             return f.write(data)
 
-    def read_bytes(self) -> bytes:
+    def read_bytes(
+        self,
+        read_ahead: int = 0,
+        cache: 'DiskCache' = None,
+    ) -> bytes:
         """
+        :param read_ahead: number of READ requests in flight, see :meth:`open`.
+        :param cache: read from the local disk cache, see :meth:`open`.
+
+        .. versionchanged:: 0.0.2
+
+            add ``read_ahead`` and ``cache`` parameters.
         """
-        with self.open(mode="rb") as f:
+        with self.open(mode="rb", read_ahead=read_ahead, cache=cache) as f:
             return f.read()
 
+    def read_into(
+        self,
+        buffer,
+        offset: int = 0,
+        read_ahead: int = 0,
+    ) -> int:
+        """
+        Read the file content starting from ``offset`` directly into a
+        pre-allocated writable buffer, for example ``bytearray``,
+        ``memoryview`` or a C-contiguous ``numpy.ndarray``, without creating
+        the intermediate ``bytes`` object of the entire file.
+
+        :return: number of bytes read, less than the buffer size only if the
+            end of the file is reached.
+
+        .. versionadded:: 0.0.2
+        """
+        view = memoryview(buffer).cast("B")
+        with self.open(mode="rb", buffering=0, read_ahead=read_ahead) as f:
+            f.seek(offset)
+            return readinto_full(f, view)
+
+    def iter_read_into(
+        self,
+        buffer,
+        offset: int = 0,
+        read_ahead: int = 0,
+    ) -> Iterable[memoryview]:
+        """
+        Read the file chunk by chunk into the same caller supplied buffer.
+        Every iteration fills the buffer and yields a ``memoryview`` of the
+        filled part, the content is overwritten by the next iteration.
+
+        Example::
+
+            >>> buffer = bytearray(1024 * 1024)
+            >>> for view in fpath.iter_read_into(buffer):
+            ...     process(view)
+
+        .. versionadded:: 0.0.2
+        """
+        view = memoryview(buffer).cast("B")
+        if len(view) == 0:
+            raise ValueError("buffer cannot be empty")
+        with self.open(mode="rb", buffering=0, read_ahead=read_ahead) as f:
+            f.seek(offset)
+            while True:
+                n = readinto_full(f, view)
+                if n:
+                    yield view[:n]
+                if n < len(view):
+                    break
+
+    def read_range(
+        self,
+        offset: int,
+        length: int,
+    ) -> bytes:
+        """
+        Read ``length`` bytes starting from ``offset``. A negative ``offset``
+        counts from the end of the file. Small ranges cost only one round trip,
+        see :func:`~fsxpathlib.stream.read_range`.
+
+        Example::
+
+            >>> footer = fpath.read_range(-8, 8)  # last 8 bytes
+
+        .. versionadded:: 0.0.2
+        """
+        if offset < 0:
+            offset = max(0, self.size + offset)
+        return read_range(self.abspath, offset, length)
+
+    def read_ranges(
+        self,
+        ranges: List[Tuple[int, int]],
+        gap: int = DEFAULT_COALESCE_GAP,
+        read_ahead: int = DEFAULT_READ_AHEAD_DEPTH,
+    ) -> List[bytes]:
+        """
+        Read multiple ``(offset, length)`` ranges, for example the column
+        chunks of a parquet file. Ranges closer than ``gap`` bytes are merged,
+        up to ``read_ahead`` READ requests are in flight.
+
+        :return: the data of each range, in the same order as ``ranges``.
+
+        .. versionadded:: 0.0.2
+        """
+        return read_ranges(self.abspath, ranges, gap=gap, depth=read_ahead)
+
+    def iter_chunks(
+        self,
+        chunk_size: int = DEFAULT_READ_AHEAD_CHUNK_SIZE,
+        read_ahead: int = DEFAULT_READ_AHEAD_DEPTH,
+    ) -> Iterable[bytes]:
+        """
+        Iterate the file content in ``chunk_size`` bytes, the next
+        ``read_ahead`` chunks are requested while the current one is processed.
+
+        .. versionadded:: 0.0.2
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size cannot smaller than 1")
+        with self.open(
+            mode="rb",
+            buffering=0,
+            read_ahead=read_ahead,
+            read_ahead_chunk_size=chunk_size,
+        ) as f:
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    break
+                yield data
+
+    def iter_lines(
+        self,
+        encoding: str = "utf-8",
+        errors=None,
+        newline=None,
+        chunk_size: int = DEFAULT_READ_AHEAD_CHUNK_SIZE,
+        read_ahead: int = 0,
+    ) -> Iterable[str]:
+        """
+        Iterate the lines of a text file, the same as iterating the file
+        object returned by ``open("r")``, the line ending is kept. The file
+        is read and decoded ``chunk_size`` bytes at a time, the memory usage
+        doesn't depend on the file size.
+
+        .. versionadded:: 0.0.2
+        """
+        with self.open(
+            mode="r",
+            buffering=chunk_size,
+            encoding=encoding,
+            errors=errors,
+            newline=newline,
+            read_ahead=read_ahead,
+            read_ahead_chunk_size=chunk_size,
+        ) as f:
+            yield from f
+
+    def iter_records(
+        self,
+        delimiter: Union[str, bytes] = b"\n",
+        encoding: str = None,
+        errors=None,
+        chunk_size: int = DEFAULT_READ_AHEAD_CHUNK_SIZE,
+        read_ahead: int = 0,
+    ) -> Iterable[Union[str, bytes]]:
+        """
+        Split the file content by ``delimiter``, the delimiter is not
+        included in the records. If ``delimiter`` is ``bytes``, yields
+        ``bytes``; if it is ``str``, the content is decoded incrementally with
+        ``encoding`` (default ``utf-8``) and yields ``str``.
+
+        Example::
+
+            >>> for record in fpath.iter_records(b"|"):
+            ...     process(record)
+
+        .. versionadded:: 0.0.2
+        """
+        if isinstance(delimiter, bytes):
+            if encoding is not None:
+                raise ValueError("encoding is only for str delimiter")
+            f = self.open(
+                mode="rb",
+                buffering=0,
+                read_ahead=read_ahead,
+                read_ahead_chunk_size=chunk_size,
+            )
+        else:
+            f = self.open(
+                mode="r",
+                buffering=chunk_size,
+                encoding="utf-8" if encoding is None else encoding,
+                errors=errors,
+                newline="",  # don't translate the line ending
+                read_ahead=read_ahead,
+                read_ahead_chunk_size=chunk_size,
+            )
+        with f:
+            yield from iter_records(f, delimiter, chunk_size=chunk_size)
+
+    def tail(
+        self,
+        n: int = 10,
+        encoding: str = "utf-8",
+        errors=None,
+        chunk_size: int = 1 << 16,
+    ) -> List[str]:
+        """
+        Return the last ``n`` lines of a text file without the line ending.
+        The file is read backward from the end ``chunk_size`` bytes at a
+        time until enough lines are found, the cost doesn't depend on the
+        file size. ``encoding`` has to be ASCII compatible, for example
+        ``utf-8``.
+
+        .. versionadded:: 0.0.2
+        """
+        if n < 0:
+            raise ValueError("n cannot smaller than 0")
+        if chunk_size < 1:
+            raise ValueError("chunk_size cannot smaller than 1")
+        if n == 0:
+            return list()
+        chunks = list()
+        n_newline = 0
+        with self.open(mode="rb", buffering=0) as f:
+            offset = f.seek(0, 2)
+            # n + 1 newlines make sure the last n lines are complete
+            while (offset > 0) and (n_newline <= n):
+                length = min(chunk_size, offset)
+                offset -= length
+                f.seek(offset)
+                chunk = bytearray(length)
+                readinto_full(f, memoryview(chunk))
+                chunks.append(chunk)
+                n_newline += chunk.count(b"\n")
+        data = b"".join(reversed(chunks))
+        if offset > 0:  # drop the incomplete first line
+            data = data[data.index(b"\n") + 1:]
+        decoder = LineDecoder(encoding, errors)
+        lines = decoder.feed(data) + decoder.flush()
+        return lines[-n:]
+
+    def follow(
+        self,
+        start: int = None,
+        interval: float = 1.0,
+        idle_timeout: float = None,
+        encoding: str = "utf-8",
+        errors=None,
+        chunk_size: int = DEFAULT_READ_AHEAD_CHUNK_SIZE,
+    ) -> Iterable[str]:
+        """
+        Similar to ``tail -f``, yield the lines appended to the file, without
+        the line ending. Every ``interval`` seconds the size is checked with
+        one stat request, only the new bytes after the last offset are read.
+        If the file is truncated or replaced, for example by log rotation,
+        it is read again from the beginning.
+
+        :param start: the offset to start from, by default the current end
+            of the file.
+        :param idle_timeout: stop if the file doesn't grow for this many
+            seconds, the incomplete last line is also yielded. By default
+            follow the file forever.
+
+        .. versionadded:: 0.0.2
+        """
+        if interval <= 0:
+            raise ValueError("interval has to be greater than 0")
+        decoder = LineDecoder(encoding, errors)
+        self._stat_cache = None
+        st = self._stat()
+        offset = st.st_size if start is None else start
+        file_id = st.st_ino
+        last_change = time.monotonic()
+        while True:
+            self._stat_cache = None
+            st = self._stat()
+            if (st.st_size < offset) or (st.st_ino != file_id):
+                offset = 0
+                file_id = st.st_ino
+                decoder.reset()
+            if st.st_size > offset:
+                while offset < st.st_size:
+                    data = self.read_range(offset, min(chunk_size, st.st_size - offset))
+                    if not data:  # truncated after the stat
+                        break
+                    offset += len(data)
+                    yield from decoder.feed(data)
+                last_change = time.monotonic()
+            elif (idle_timeout is not None) and (time.monotonic() - last_change >= idle_timeout):
+                yield from decoder.flush()
+                return
+            else:
+                time.sleep(interval)
+
     def write_text(
         self,
         data: str,
@@ -367,11 +948,17 @@ class FsxPath(PureWindowsPath):
         self,
         encoding: str = "utf-8",
         errors=None,
+        cache: 'DiskCache' = None,
     ) -> str:
         """
+        :param cache: read from the local disk cache, see :meth:`open`.
+
+        .. versionchanged:: 0.0.2
+
+            add ``cache`` parameter.
         """
         with self.open(
-            mode="r", encoding=encoding, errors=errors
+            mode="r", encoding=encoding, errors=errors, cache=cache
         ) as f:
             return f.read()
 
@@ -391,81 +978,334 @@ class FsxPath(PureWindowsPath):
             msg = "'%s' is not a file or doesn't exists!" % self
             raise EnvironmentError(msg)
 
+    def _iter_scandir(self) -> Iterable[Tuple['FsxPath', bool]]:
+        """
+        Yield ``(path, is_dir)`` of the children of this directory as the
+        directory query returns them, with the stat cached from the listing.
+        Closing this generator closes the directory handle, the rest of the
+        listing is not queried. A symlink to a directory is a directory,
+        the link is not followed.
+        """
+        it = smbclient.scandir(self.abspath)
+        try:
+            for entry in it:
+                p = self._make_descendant(entry.name)
+                st = stat_from_dir_entry(entry)
+                p._stat_cache = st
+                if stat.S_ISLNK(st.st_mode):
+                    # ``is_dir()`` follows the link with another SMB request
+                    is_dir = bool(
+                        st.st_file_attributes
+                        & FileAttributes.FILE_ATTRIBUTE_DIRECTORY
+                    )
+                else:
+                    is_dir = entry.is_dir()
+                yield p, is_dir
+        finally:
+            it.close()
+
+    def _scandir(self) -> Tuple[List['FsxPath'], List['FsxPath']]:
+        """
+        List this directory in one directory query, returns the sub
+        directories and the files. The stat of every returned path is taken
+        from the listing, so reading ``size``, ``mtime`` etc. on them doesn't
+        send any extra SMB request.
+        """
+        dirs: List[FsxPath] = list()
+        files: List[FsxPath] = list()
+        for p, is_dir in self._iter_scandir():
+            if is_dir:
+                dirs.append(p)
+            else:
+                files.append(p)
+        return dirs, files
+
+    def _walk(
+        self,
+        max_depth: Optional[int] = None,
+        topdown: bool = True,
+    ) -> Iterable[Tuple['FsxPath', List['FsxPath'], List['FsxPath']]]:
+        """
+        Similar to ``smbclient.walk``, but yields ``(dir, dirs, files)`` of
+        :class:`FsxPath` with the stat cached from the directory listing.
+        The walk is lazy, the next directory is only listed when the caller
+        asks for it, and no directory handle is open between two yields.
+        The error of listing this directory is raised, sub directories that
+        cannot be listed are skipped, symlinks to directories are not
+        followed.
+
+        :param max_depth: number of directory levels to list, 1 for only this
+            directory, None for no limit.
+        :param topdown: yield a directory before its sub directories, then
+            ``dirs`` can be modified in place to prune the walk, like
+            ``os.walk``. Otherwise yield it after its sub directories.
+        """
+
+        def walk(p_dir: FsxPath, dirs: List[FsxPath], files: List[FsxPath], depth: int):
+            if topdown:
+                yield p_dir, dirs, files
+            if (max_depth is None) or (depth < max_depth):
+                for p in dirs:
+                    if stat.S_ISLNK(p._stat().st_mode):
+                        continue
+                    try:
+                        sub_dirs, sub_files = p._scandir()
+                    except OSError:
+                        continue
+                    yield from walk(p, sub_dirs, sub_files, depth + 1)
+            if not topdown:
+                yield p_dir, dirs, files
+
+        dirs, files = self._scandir()
+        yield from walk(self, dirs, files, 1)
+
     def _select(
         self,
         include_dirs: bool = True,
         include_files: bool = True,
-        recursive: bool = True,
+        max_depth: Optional[int] = None,
+        topdown: bool = True,
     ) -> Iterable['FsxPath']:
         self.assert_is_dir_and_exists()
-        if recursive:
-            for cwd, dirs, files in smbclient.walk(self.abspath):
+        for _, dirs, files in self._walk(max_depth=max_depth, topdown=topdown):
+            if topdown:
                 if include_dirs:
-                    for name in dirs:
-                        yield FsxPath(cwd, name)
+                    yield from dirs
                 if include_files:
-                    for name in files:
-                        yield FsxPath(cwd, name)
-        else:
-            for name in smbclient.listdir(self):
-                fpath = FsxPath(self, name)
-                if include_dirs and include_files:
-                    yield fpath
-                else:
-                    if fpath.is_file():
-                        if include_files:
-                            yield fpath
-                    elif fpath.is_dir():
-                        if include_dirs:
-                            yield fpath
-                    else:
-                        raise NotImplementedError
+                    yield from files
+            else:
+                # the sub directories are yielded after the entries in them
+                if include_files:
+                    yield from files
+                if include_dirs:
+                    yield from dirs
 
     def select(
         self,
         include_dirs: bool = True,
         include_files: bool = True,
         recursive: bool = True,
+        max_depth: Optional[int] = None,
+        topdown: bool = True,
     ) -> FsxPathIterProxy:
         """
+        Iterate the paths in this directory tree, the entries of a directory
+        are yielded as soon as it is listed, the stat is cached from the
+        listing. The tree is walked lazily, close the returned proxy or use
+        it in a ``with`` block to stop the walk as soon as you are done, no
+        more directory is listed after that::
+
+            >>> with fpath_root.select_file() as proxy:
+            ...     p = proxy.filter(lambda p: p.size > 1000000).one_or_none()
+
+        :param recursive: False is the same as ``max_depth=1``.
+        :param max_depth: number of directory levels to walk, 1 for the
+            direct children only, None for no limit. Overrides ``recursive``.
+        :param topdown: yield a directory before the entries in it, otherwise
+            after.
+
+        .. versionchanged:: 0.0.2
+
+            add ``max_depth`` and ``topdown`` parameters, the entries are
+            yielded per directory as it is listed.
         """
+        if max_depth is None:
+            if not recursive:
+                max_depth = 1
+        elif max_depth < 1:
+            raise ValueError("max_depth cannot smaller than 1")
         return FsxPathIterProxy(
             iterable=self._select(
                 include_dirs=include_dirs,
                 include_files=include_files,
-                recursive=recursive,
+                max_depth=max_depth,
+                topdown=topdown,
             )
         )
 
     def select_file(
         self,
         recursive: bool = True,
+        max_depth: Optional[int] = None,
     ) -> FsxPathIterProxy:
         """
+        Iterate the files in this directory tree, see :meth:`select`.
         """
-        return self.select(include_dirs=False, recursive=recursive)
+        return self.select(include_dirs=False, recursive=recursive, max_depth=max_depth)
 
     def select_dir(
         self,
         recursive: bool = True,
+        max_depth: Optional[int] = None,
+        topdown: bool = True,
     ) -> FsxPathIterProxy:
         """
+        Iterate the sub directories in this directory tree, see :meth:`select`.
         """
-        return self.select(include_files=False, recursive=recursive)
+        return self.select(
+            include_files=False,
+            recursive=recursive,
+            max_depth=max_depth,
+            topdown=topdown,
+        )
 
     def select_by_ext(
         self,
         exts: List[str],
         recursive=True,
+        max_depth: Optional[int] = None,
     ) -> FsxPathIterProxy:
         """
         """
         return self.select_file(
             recursive=recursive,
+            max_depth=max_depth,
         ).filter_by_ext(*exts)
 
+    def listing(
+        self,
+        recursive: bool = True,
+    ) -> Listing:
+        """
+        List this directory into a compact :class:`~fsxpathlib.listing.Listing`,
+        which takes a few dozen bytes per entry instead of a full
+        :class:`FsxPath`. Use it instead of ``select(...).all()`` on large
+        directory trees.
+
+        .. versionadded:: 0.0.2
+        """
+        return Listing.scan(self, recursive=recursive)
+
+    def diff(
+        self,
+        other: Union['FsxPath', Path],
+        use_mtime: bool = True,
+        mtime_tolerance: float = DEFAULT_MTIME_TOLERANCE,
+        include_same: bool = True,
+    ) -> Iterable[DiffEntry]:
+        """
+        Compare this directory tree with another FSx or local directory tree.
+        Yield a :class:`~fsxpathlib.diff.DiffEntry` per relative path in
+        sorted order, entries only in ``other`` are ``"added"``, entries only
+        in this tree are ``"removed"``. Both trees are walked concurrently
+        and merged in streaming fashion with bounded memory, the metadata
+        comes from the directory listings. See :mod:`fsxpathlib.diff`.
+
+        :param use_mtime: files of the same size are changed if their
+            modification time differ more than ``mtime_tolerance`` seconds.
+        :param include_same: also yield the ``"same"`` entries.
+
+        .. versionadded:: 0.0.2
+        """
+        if isinstance(other, FsxPath):
+            right = iter_fsx_tree(other)
+        else:
+            right = iter_local_tree(Path(other))
+        return diff_trees(
+            iter_fsx_tree(self),
+            right,
+            use_mtime=use_mtime,
+            mtime_tolerance=mtime_tolerance,
+            include_same=include_same,
+        )
+
+    def plan_copy_to_s3(
+        self,
+        s3dir: S3Path,
+        use_mtime: bool = True,
+        checksum: bool = False,
+        md5_metadata_key: str = DEFAULT_MD5_METADATA_KEY,
+    ) -> TransferPlan:
+        """
+        Compare this directory tree with the objects under the S3 folder
+        ``s3dir`` with listings only, return the
+        :class:`~fsxpathlib.s3sync.TransferPlan` of the files to upload. Use
+        :meth:`~fsxpathlib.s3sync.TransferPlan.execute` to run it. See
+        :func:`~fsxpathlib.s3sync.plan_s3_upload`.
+
+        .. versionadded:: 0.0.2
+        """
+        return plan_s3_upload(
+            self,
+            s3dir,
+            use_mtime=use_mtime,
+            checksum=checksum,
+            md5_metadata_key=md5_metadata_key,
+        )
+
+    def disk_usage(
+        self,
+        depth: int = 1,
+        workers: int = DEFAULT_WORKERS,
+    ) -> List[DirUsage]:
+        """
+        Compute the total size, number of files and the newest modification
+        time of this directory and its sub directories within ``depth``
+        levels, with one parallel walk using the listing metadata. See
+        :func:`~fsxpathlib.usage.disk_usage`.
+
+        .. versionadded:: 0.0.2
+        """
+        return disk_usage(self, depth=depth, workers=workers)
+
+    def find_duplicates(
+        self,
+        recursive: bool = True,
+        nbytes: int = DEFAULT_NBYTES,
+        workers: int = DEFAULT_WORKERS,
+        hash_meth=hashlib.md5,
+    ) -> List[DuplicateGroup]:
+        """
+        Find files having the same content in this directory. Files are
+        grouped by size from the directory listing first, then by the hash
+        of the first ``nbytes``, only files that still collide are fully
+        hashed. See :func:`~fsxpathlib.dedup.find_duplicates`.
+
+        .. versionadded:: 0.0.2
+        """
+        return find_duplicates(
+            self.select_file(recursive=recursive),
+            nbytes=nbytes,
+            hash_meth=hash_meth,
+            workers=workers,
+        )
+
     __CONCRETE_PATH_BOOL_TEST_METH_START_HERE = None  # Just for visual divider and navigator
 
+    def purge(
+        self,
+        older_than: Union[timedelta, datetime] = None,
+        larger_than: int = None,
+        pattern: str = None,
+        dry_run: bool = True,
+        recursive: bool = True,
+        workers: int = DEFAULT_WORKERS,
+        on_progress: Callable[[BulkResult], None] = None,
+    ) -> PurgeResult:
+        """
+        Delete the files in this directory matching all the given rules,
+        for example the log files not modified in 30 days::
+
+            >>> result = fpath.purge(older_than=timedelta(days=30), pattern="*.log", dry_run=False)
+            >>> result.n_bytes  # bytes reclaimed
+
+        The rules are evaluated on the stat from the directory listing, no
+        extra request is sent per file, the matched files are deleted
+        concurrently. By default it is a dry run. See
+        :func:`~fsxpathlib.bulk.purge` for the rules.
+
+        .. versionadded:: 0.0.2
+        """
+        return bulk.purge(
+            self.select_file(recursive=recursive),
+            older_than=older_than,
+            larger_than=larger_than,
+            pattern=pattern,
+            dry_run=dry_run,
+            workers=workers,
+            on_progress=on_progress,
+        )
+
     def mkdir(
         self,
         parents=False,
@@ -518,10 +1358,105 @@ class FsxPath(PureWindowsPath):
         """
         return smbclient.rmdir(self.abspath)
 
-    def rmtree(self):
+    def rmtree(
+        self,
+        workers: int = 1,
+        on_progress: Callable[[BulkResult], None] = None,
+    ) -> Optional[BulkResult]:
+        """
+        Remove the directory and everything inside.
+
+        :param workers: if greater than 1, list directories and delete
+            entries with this many threads, see :mod:`fsxpathlib.bulk`. All
+            entries that can be deleted are deleted, then an
+            :class:`~fsxpathlib.exc.FsxError` is raised if any failed.
+        :param on_progress: only for parallel mode, called with the
+            :class:`~fsxpathlib.bulk.BulkResult` after every entry.
+
+        .. versionchanged:: 0.0.2
+
+            add ``workers`` and ``on_progress`` parameters.
+        """
+        if workers == 1:
+            return smbclient.shutil.rmtree(self.abspath)
+        if self.is_link() or (not self.is_dir()):
+            raise NotADirectoryError(f"{self.abspath!r} is not a directory")
+        result = bulk.rmtree(self, workers=workers, on_progress=on_progress)
+        if not result.ok:
+            fpath, e = result.errors[0]
+            raise exc.FsxError(
+                f"failed to remove {len(result.errors)} entries under "
+                f"{self.abspath}, the first error is {fpath.abspath}: {e!r}"
+            )
+        return result
+
+    def rename(
+        self,
+        target: Union[str, 'FsxPath'],
+    ) -> 'FsxPath':
         """
+        Rename this file or directory to ``target`` on the server side, no
+        data is transferred. Raise ``OSError`` if the target exists, raise
+        ``ValueError`` if the target is on a different share, see
+        :meth:`move_to` for moving across shares.
+
+        :return: the new path.
+
+        .. versionadded:: 0.0.2
+        """
+        target = FsxPath(target)
+        smbclient.rename(SERVER + self.abspath, SERVER + target.abspath)
+        return target
+
+    def replace(
+        self,
+        target: Union[str, 'FsxPath'],
+    ) -> 'FsxPath':
+        """
+        Similar to :meth:`rename`, but an existing target file is replaced.
+
+        :return: the new path.
+
+        .. versionadded:: 0.0.2
+        """
+        target = FsxPath(target)
+        smbclient.replace(SERVER + self.abspath, SERVER + target.abspath)
+        return target
+
+    def move_to(
+        self,
+        target: Union[str, 'FsxPath'],
+        overwrite: bool = False,
+    ) -> 'FsxPath':
+        """
+        Move this file or directory to ``target``. On the same share it is a
+        server side rename. Across shares, the content is copied then the
+        source is deleted, the copy is done on the server side on the same
+        server, and streamed through the client across servers.
+
+        :param overwrite: replace the existing target file. A directory
+            target is never replaced.
+
+        :return: the new path.
+
+        .. versionadded:: 0.0.2
         """
-        return smbclient.shutil.rmtree(self.abspath)
+        target = FsxPath(target)
+        try:
+            if overwrite:
+                return self.replace(target)
+            else:
+                return self.rename(target)
+        except ValueError:  # different share
+            pass
+        if target.exists() and (self.is_dir() or (not overwrite)):
+            raise FileExistsError(f"{target.abspath!r} already exists")
+        self.copy_to(target)
+        if self.is_dir():
+            self.rmtree()
+        else:
+            self.remove()
+        return target
 
     def remove_if_exists(self):
         """
@@ -536,40 +1471,76 @@ class FsxPath(PureWindowsPath):
 
     __CONCRETE_PATH_WITH_LOCAL_FS = None  # Just for visual divider and navigator
 
-    def _copy_from_fsxpath(
+    def _write_from_stream(
+        self,
+        f_in,
+        size: int = None,
+    ):
+        """
+        Stream the content of a readable file object into this file, the
+        WRITE requests are pipelined and the memory usage is bounded.
+        """
+        with self.open(
+            mode="wb",
+            write_behind=DEFAULT_WRITE_BEHIND_DEPTH,
+            preallocate=size,
+        ) as f_out:
+            shutil.copyfileobj(f_in, f_out, DEFAULT_WRITE_BEHIND_CHUNK_SIZE)
+
+    def _copy_file_to_fsxpath(
         self,
         fpath: 'FsxPath',
     ):
-        logger.info(f"copy from {fpath.abspath} to {self.abspath}")
-        if fpath.is_file():
+        """
+        Copy this file to ``fpath`` on the server side. smbclient can't do
+        server side copy across servers, in that case the content is
+        streamed through the client with read ahead and write behind.
+        """
+        if self.parts[0].lower() == fpath.parts[0].lower():
             smbclient.copyfile(
-                src=SERVER + fpath.abspath,
-                dst=SERVER + self.abspath,
+                src=SERVER + self.abspath,
+                dst=SERVER + fpath.abspath,
             )
-        elif fpath.is_dir():
-            dir_list: List[FsxPath] = list()
-            file_list: List[FsxPath] = list()
-            for cwd, dirs, files in smbclient.walk(fpath.abspath):
-                for name in dirs:
-                    p = FsxPath(cwd, name)
-                    dir_list.append(p)
-                for name in files:
-                    p = FsxPath(cwd, name)
-                    file_list.append(p)
+        else:
+            with self.open(mode="rb", read_ahead=DEFAULT_READ_AHEAD_DEPTH) as f_in:
+                fpath._write_from_stream(f_in, size=self._stat().st_size)
 
-            self.mkdir_if_not_exists()
+    def _copy_tree_to_fsxpath(
+        self,
+        fpath: 'FsxPath',
+    ):
+        """
+        Copy this directory tree to ``fpath`` while walking it, each
+        directory is created and its files are copied as soon as it is
+        listed. If ``fpath`` is inside this directory, the tree is listed
+        up front instead, so the copy doesn't walk into itself.
+        """
+        n = len(self.parts)
+        walk = self._walk()
+        if [part.lower() for part in fpath.parts[:n]] == [part.lower() for part in self.parts]:
+            walk = list(walk)
 
-            for p_dir_src in dir_list:
-                p_dir_dst = self.__class__(self, *p_dir_src.relative_to(fpath).parts)
+        fpath.mkdir_if_not_exists()
+
+        for _, dirs, files in walk:
+            for p_dir_src in dirs:
+                p_dir_dst = fpath._make_descendant(*p_dir_src.parts[n:])
                 p_dir_dst.mkdir_if_not_exists()
 
-            for p_file_src in file_list:
-                p_file_dst = self.__class__(self, *p_file_src.relative_to(fpath).parts)
+            for p_file_src in files:
+                p_file_dst = fpath._make_descendant(*p_file_src.parts[n:])
                 logger.info(f"{TAB1}copy from {p_file_src.abspath} to {p_file_dst.abspath}")
-                smbclient.copyfile(
-                    src=SERVER + p_file_src.abspath,
-                    dst=SERVER + p_file_dst.abspath,
-                )
+                p_file_src._copy_file_to_fsxpath(p_file_dst)
+
+    def _copy_from_fsxpath(
+        self,
+        fpath: 'FsxPath',
+    ):
+        logger.info(f"copy from {fpath.abspath} to {self.abspath}")
+        if fpath.is_file():
+            fpath._copy_file_to_fsxpath(self)
+        elif fpath.is_dir():
+            fpath._copy_tree_to_fsxpath(self)
         else:  # pragma: no cover
             raise NotImplementedError
 
@@ -583,9 +1554,7 @@ class FsxPath(PureWindowsPath):
     ):
         logger.info(f"copy from {path.abspath} to {self.abspath}")
         if path.is_file():
-            with self.open(mode="wb") as f_out:
-                with path.open(mode="rb") as f_in:
-                    f_out.write(f_in.read())
+            upload_mmap(path, self)
         elif path.is_dir():
             dir_list: List[Path] = list()
             file_list: List[Path] = list()
@@ -605,9 +1574,7 @@ class FsxPath(PureWindowsPath):
             for p_file in file_list:
                 fpath = self.__class__(self, *p_file.relative_to(path).parts)
                 logger.info(f"{TAB1}copy from {p_file.abspath} to {fpath.abspath}")
-                with fpath.open(mode="wb") as f_out:
-                    with p_file.open(mode="rb") as f_in:
-                        f_out.write(f_in.read())
+                upload_mmap(p_file, fpath)
 
         else:  # pragma: no cover
             raise NotImplementedError
@@ -622,9 +1589,8 @@ class FsxPath(PureWindowsPath):
     ):
         logger.info(f"copy from {s3path.uri} to {self.abspath}")
         if s3path.is_file():
-            with self.open(mode="wb") as f_out:
-                with s3path.open(mode="rb") as f_in:
-                    f_out.write(f_in.read())
+            with s3path.open(mode="rb") as f_in:
+                self._write_from_stream(f_in, size=s3path.size)
         elif s3path.is_dir():
             dir_set: Set[str] = set()
             file_list: List[S3Path] = list()
@@ -644,9 +1610,8 @@ class FsxPath(PureWindowsPath):
             for p_file in file_list:
                 fpath = self.__class__(self, *p_file.relative_to(s3path).parts)
                 logger.info(f"{TAB1}copy from {p_file.uri} to {fpath.abspath}")
-                with fpath.open(mode="wb") as f_out:
-                    with p_file.open(mode="rb") as f_in:
-                        f_out.write(f_in.read())
+                with p_file.open(mode="rb") as f_in:
+                    fpath._write_from_stream(f_in, size=p_file.size)
 
         else:  # pragma: no cover
             raise NotImplementedError
@@ -693,34 +1658,9 @@ class FsxPath(PureWindowsPath):
     ):
         logger.info(f"copy from {self.abspath} to {fpath.abspath}")
         if self.is_file():
-            smbclient.copyfile(
-                src=SERVER + self.abspath,
-                dst=SERVER + fpath.abspath,
-            )
+            self._copy_file_to_fsxpath(fpath)
         elif self.is_dir():
-            dir_list: List[FsxPath] = list()
-            file_list: List[FsxPath] = list()
-            for cwd, dirs, files in smbclient.walk(self.abspath):
-                for name in dirs:
-                    p = FsxPath(cwd, name)
-                    dir_list.append(p)
-                for name in files:
-                    p = FsxPath(cwd, name)
-                    file_list.append(p)
-
-            fpath.mkdir_if_not_exists()
-
-            for p_dir_src in dir_list:
-                p_dir_dst = fpath.__class__(fpath, *p_dir_src.relative_to(self).parts)
-                p_dir_dst.mkdir_if_not_exists()
-
-            for p_file_src in file_list:
-                p_file_dst = fpath.__class__(fpath, *p_file_src.relative_to(self).parts)
-                logger.info(f"{TAB1}copy from {p_file_src.abspath} to {p_file_dst.abspath}")
-                smbclient.copyfile(
-                    src=SERVER + p_file_src.abspath,
-                    dst=SERVER + p_file_dst.abspath,
-                )
+            self._copy_tree_to_fsxpath(fpath)
         else:  # pragma: no cover
             raise NotImplementedError
 
@@ -728,43 +1668,55 @@ class FsxPath(PureWindowsPath):
 
         return True
 
+    def _download_file(
+        self,
+        path: Path,
+        workers: int = 1,
+        range_size: int = DEFAULT_RANGE_SIZE,
+    ):
+        download_ranged(self, path, range_size=range_size, workers=workers)
+
     def _copy_to_path(
         self,
         path: Path,
+        workers: int = 1,
+        range_size: int = DEFAULT_RANGE_SIZE,
     ):
         logger.info(f"copy from {self.abspath} to {path.abspath}")
         if self.is_file():
-            with self.open(mode="rb") as f_src:
-                with path.open(mode="wb") as f_dst:
-                    f_dst.write(f_src.read())
+            self._stat_cache = None  # we need the up-to-date size
+            self._download_file(path, workers=workers, range_size=range_size)
         elif self.is_dir():
-            dir_list: List[FsxPath] = list()
-            file_list: List[FsxPath] = list()
-            for cwd, dirs, files in smbclient.walk(self.abspath):
-                for name in dirs:
-                    p = FsxPath(cwd, name)
-                    dir_list.append(p)
-                for name in files:
-                    p = FsxPath(cwd, name)
-                    file_list.append(p)
-
+            n = len(self.parts)
             path.mkdir_if_not_exists()
 
-            for p_dir_src in dir_list:
-                p_dir_dst = Path(path, *p_dir_src.relative_to(self).parts)
-                p_dir_dst.mkdir_if_not_exists()
+            # directories are created and files downloaded while walking
+            for _, dirs, files in self._walk():
+                for p_dir_src in dirs:
+                    p_dir_dst = Path(path, *p_dir_src.parts[n:])
+                    p_dir_dst.mkdir_if_not_exists()
 
-            for p_file_src in file_list:
-                p_file_dst = Path(path, *p_file_src.relative_to(self).parts)
-                logger.info(f"{TAB1}copy from {p_file_src.abspath} to {p_file_dst.abspath}")
-                with p_file_src.open(mode="rb") as f_src:
-                    with p_file_dst.open(mode="wb") as f_dst:
-                        f_dst.write(f_src.read())
+                for p_file_src in files:
+                    p_file_dst = Path(path, *p_file_src.parts[n:])
+                    logger.info(f"{TAB1}copy from {p_file_src.abspath} to {p_file_dst.abspath}")
+                    p_file_src._download_file(p_file_dst, workers=workers, range_size=range_size)
         else:  # pragma: no cover
             raise NotImplementedError
 
         return True
 
+    def _write_to_s3path(
+        self,
+        s3path: S3Path,
+    ):
+        """
+        Stream the content of this file to the S3 object, large file is
+        uploaded part by part with bounded memory.
+        """
+        with self.open(mode="rb", read_ahead=DEFAULT_READ_AHEAD_DEPTH) as f_src:
+            with s3path.open(mode="wb") as f_dst:
+                shutil.copyfileobj(f_src, f_dst, DEFAULT_READ_AHEAD_CHUNK_SIZE)
+
     def _copy_to_s3path(
         self,
         s3path: S3Path,
@@ -772,9 +1724,7 @@ class FsxPath(PureWindowsPath):
         logger.info(f"copy from {self.abspath} to {s3path.uri}")
 
         if self.is_file():
-            with self.open(mode="rb") as f_src:
-                with s3path.open(mode="wb") as f_dst:
-                    f_dst.write(f_src.read())
+            self._write_to_s3path(s3path)
         elif self.is_dir():
             for fpath_src in self.select_file():
                 s3path_dst = S3Path(
@@ -782,9 +1732,7 @@ class FsxPath(PureWindowsPath):
                     *fpath_src.relative_to(self).parts
                 )
                 logger.info(f"{TAB1}copy from {fpath_src.abspath} to {s3path_dst.uri}")
-                with fpath_src.open(mode="rb") as f_src:
-                    with s3path_dst.open(mode="wb") as f_dst:
-                        f_dst.write(f_src.read())
+                fpath_src._write_to_s3path(s3path_dst)
         else:  # pragma: no cover
             raise NotImplementedError
 
@@ -795,6 +1743,8 @@ class FsxPath(PureWindowsPath):
     def copy_to(
         self,
         file_obj: Union[str, 'FsxPath', Path, S3Path],
+        workers: int = 1,
+        range_size: int = DEFAULT_RANGE_SIZE,
     ) -> bool:
         """
         Copy an existing Fsx file / directory to target location. Target
@@ -804,8 +1754,17 @@ class FsxPath(PureWindowsPath):
         2. ``pathlib_mate.Path`` that represent an local file.
         3. ``s3pathlib.S3Path`` that represent an S3 object or folder.
 
+        :param workers: only for local target. Every file is split into
+            ``range_size`` ranges and downloaded into the memory mapped local
+            file by ``workers`` threads in parallel, see
+            :func:`~fsxpathlib.transfer.download_ranged`.
+
         .. versionadded:: 0.0.1
 
+        .. versionchanged:: 0.0.2
+
+            add ``workers`` and ``range_size`` parameters.
+
         TODO: add conflict option, allow "ignore", "overwrite", "stop"
         """
         if isinstance(file_obj, str):  # pragma: no cover
@@ -814,11 +1773,13 @@ class FsxPath(PureWindowsPath):
             elif file_obj.startswith(r"\\"):
                 return self._copy_to_fsxpath(FsxPath(file_obj))
             else:
-                return self._copy_to_path(Path(file_obj))
+                return self._copy_to_path(
+                    Path(file_obj), workers=workers, range_size=range_size,
+                )
         elif isinstance(file_obj, FsxPath):
             return self._copy_to_fsxpath(file_obj)
         elif isinstance(file_obj, Path):
-            return self._copy_to_path(file_obj)
+            return self._copy_to_path(file_obj, workers=workers, range_size=range_size)
         elif isinstance(file_obj, S3Path):
             return self._copy_to_s3path(file_obj)
         else:  # pragma: no cover
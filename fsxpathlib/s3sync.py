@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare an FSx directory tree against an S3 prefix with listings only, and
+build the plan of an incremental FSx to S3 backup::
+
+    >>> plan = fpath_root.plan_copy_to_s3(S3Path("bucket", "backup/"))
+    >>> plan
+    TransferPlan(n_uploads=12, n_bytes=1.50 GB, n_deletes=0, n_same=98765)
+    >>> result = plan.execute(workers=16)
+
+S3 ``list_objects_v2`` returns the keys in UTF-8 binary order. The FSx tree
+is walked depth first with the children sorted by name, where a directory
+sorts as its name followed by ``/``, which yields the files in the same
+order as their S3 keys. The two sorted streams are merged page by page, see
+:func:`~fsxpathlib.diff.merge_diff`, a file is uploaded if it is not in S3,
+its size differs, or it is modified after the S3 object.
+"""
+
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Tuple, Iterable, Callable, Optional
+
+from s3pathlib import S3Path
+
+from .bulk import BulkResult, _Progress, DEFAULT_LOG_EVERY
+from .diff import (
+    TreeEntry, diff_trees, ADDED, REMOVED, CHANGED, DEFAULT_PREFETCH,
+)
+from .hashes import DEFAULT_WORKERS
+from .helper import repr_data_size, datetime_to_ns
+from .logger import logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .path import FsxPath
+
+DEFAULT_MD5_METADATA_KEY = "md5"
+
+
+def _walk_s3_order(fpath: 'FsxPath', prefix: str) -> Iterable[TreeEntry]:
+    try:
+        dirs, files = fpath._scandir()
+    except OSError:
+        return
+    children = [
+        (p.basename + "/", p)
+        for p in dirs
+        if not stat.S_ISLNK(p._stat().st_mode)
+    ]
+    children.extend((p.basename, p) for p in files)
+    children.sort(key=lambda child: child[0])
+    for name, p in children:
+        key = prefix + name
+        if name.endswith("/"):
+            yield from _walk_s3_order(p, key)
+        else:
+            st = p._stat()
+            yield TreeEntry(key, key, False, st.st_size, st.st_mtime_ns, p)
+
+
+def iter_fsx_files_s3_order(fpath: 'FsxPath') -> Iterable[TreeEntry]:
+    """
+    Walk the files in the FSx directory tree in the order of their relative
+    S3 keys, ``/`` separated.
+
+    .. versionadded:: 0.0.2
+    """
+    fpath.assert_is_dir_and_exists()
+    return _walk_s3_order(fpath, "")
+
+
+def iter_s3_files(s3dir: S3Path) -> Iterable[TreeEntry]:
+    """
+    List the objects under the S3 prefix, the metadata comes from the
+    listing, no ``head_object`` request is sent.
+
+    .. versionadded:: 0.0.2
+    """
+    if not s3dir.is_dir():
+        raise ValueError(f"{s3dir.uri} is not a S3 folder, it has to end with '/'")
+    n = len(s3dir.key)
+    for s3path in s3dir.iter_objects():
+        key = s3path.key[n:]
+        yield TreeEntry(
+            key,
+            key,
+            False,
+            s3path.size,
+            datetime_to_ns(s3path.last_modified_at),
+            s3path,
+        )
+
+
+def get_s3_md5(
+    s3path: S3Path,
+    md5_metadata_key: str = DEFAULT_MD5_METADATA_KEY,
+) -> Optional[str]:
+    """
+    The md5 of the S3 object content. The ETag of a single part upload is
+    the md5. For multipart upload, look up the md5 stored in the user
+    metadata, this costs one ``head_object`` request.
+
+    .. versionadded:: 0.0.2
+    """
+    etag = s3path.etag
+    if "-" not in etag:
+        return etag
+    return s3path.metadata.get(md5_metadata_key)
+
+
+class TransferPlan:
+    """
+    The files to upload to bring an S3 prefix up to date with an FSx tree.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(self):
+        self.uploads: List[Tuple['FsxPath', S3Path]] = list()
+        self.deletes: List[S3Path] = list()
+        self.n_same = 0
+        self.n_bytes = 0
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(n_uploads={len(self.uploads)}, "
+            f"n_bytes={repr_data_size(self.n_bytes)}, "
+            f"n_deletes={len(self.deletes)}, n_same={self.n_same})"
+        )
+
+    def execute(
+        self,
+        delete: bool = False,
+        workers: int = DEFAULT_WORKERS,
+        on_progress: Callable[[BulkResult], None] = None,
+        log_every: int = DEFAULT_LOG_EVERY,
+    ) -> BulkResult:
+        """
+        Upload the files concurrently, each file is streamed to S3 with
+        bounded memory. Errors are collected in the returned
+        :class:`~fsxpathlib.bulk.BulkResult` instead of raised.
+
+        :param delete: also delete the S3 objects not in the FSx tree.
+        """
+        if workers < 1:
+            raise ValueError("workers cannot smaller than 1")
+        logger.info(
+            f"upload {len(self.uploads)} files ({repr_data_size(self.n_bytes)}) "
+            f"with {workers} workers"
+        )
+        progress = _Progress(BulkResult(), on_progress, log_every)
+
+        def upload(pair: Tuple['FsxPath', S3Path]):
+            fpath, s3path = pair
+            try:
+                fpath.copy_to(s3path)
+            # botocore errors don't share a base class with OSError
+            except Exception as e:
+                progress.report(fpath, error=e)
+            else:
+                progress.report(fpath, size=fpath._stat().st_size)
+
+        def remove(s3path: S3Path):
+            try:
+                s3path.delete_if_exists()
+            except Exception as e:
+                progress.report(s3path, error=e)
+            else:
+                progress.report(s3path)
+
+        tasks: List[Tuple[Callable, object]] = [(upload, pair) for pair in self.uploads]
+        if delete:
+            tasks.extend((remove, s3path) for s3path in self.deletes)
+        if workers == 1 or len(tasks) <= 1:
+            for func, arg in tasks:
+                func(arg)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(lambda task: task[0](task[1]), tasks):
+                    pass
+        progress.log_done("uploaded")
+        return progress.result
+
+
+def plan_s3_upload(
+    fpath: 'FsxPath',
+    s3dir: S3Path,
+    use_mtime: bool = True,
+    checksum: bool = False,
+    md5_metadata_key: str = DEFAULT_MD5_METADATA_KEY,
+    prefetch_size: int = DEFAULT_PREFETCH,
+) -> TransferPlan:
+    """
+    Compare the files under the FSx directory ``fpath`` with the objects
+    under ``s3dir`` by relative key, and plan the uploads. A file is
+    uploaded if it is not in S3, or its size differs.
+
+    :param use_mtime: also upload the file if it is modified after the S3
+        object is uploaded.
+    :param checksum: for the files that look the same, also compare the md5
+        of the FSx file with the md5 of the S3 object, see
+        :func:`get_s3_md5`. This reads every such file, but still doesn't
+        upload anything unchanged. Multipart objects without the md5 in
+        their metadata are not verified.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def is_changed(fsx: TreeEntry, s3: TreeEntry) -> bool:
+        if fsx.size != s3.size:
+            return True
+        if use_mtime and (fsx.mtime_ns > s3.mtime_ns):
+            return True
+        if checksum:
+            s3_md5 = get_s3_md5(s3.path, md5_metadata_key)
+            # a multipart object without the md5 metadata can't be verified,
+            # keep the size and mtime decision instead of uploading it again
+            # on every run
+            if s3_md5 is None:
+                return False
+            return fsx.path.md5 != s3_md5
+        return False
+
+    plan = TransferPlan()
+    for entry in diff_trees(
+        iter_fsx_files_s3_order(fpath),
+        iter_s3_files(s3dir),
+        include_same=True,
+        prefetch_size=prefetch_size,
+        is_changed=is_changed,
+    ):
+        if entry.status in (REMOVED, CHANGED):
+            plan.uploads.append((
+                entry.left.path,
+                S3Path(s3dir, *entry.left.key.split("/")),
+            ))
+            plan.n_bytes += entry.left.size
+        elif entry.status == ADDED:
+            plan.deletes.append(entry.right.path)
+        else:
+            plan.n_same += 1
+    return plan
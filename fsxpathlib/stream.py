@@ -0,0 +1,777 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pipelined SMB file streams.
+
+``smbclient`` sends one READ / WRITE request and waits for the response
+before sending the next one, so the throughput of a single stream is bounded
+by ``request size / round trip time``. The streams in this module keep
+multiple requests in flight on the same file handle, the responses are
+collected by the ``smbprotocol`` connection thread in the background.
+"""
+
+import io
+import codecs
+from bisect import bisect_right
+from collections import deque
+from typing import Deque, List, Tuple, Union, Any, Iterable, AnyStr
+
+import smbclient
+from smbprotocol import MAX_PAYLOAD_SIZE
+from smbprotocol.exceptions import EndOfFile
+from smbprotocol.header import NtStatus
+
+try:  # private smbclient API, only used for the compound request
+    from smbclient._io import SMBFileIO, SMBFileTransaction
+except ImportError:  # pragma: no cover
+    SMBFileIO = SMBFileTransaction = None
+
+DEFAULT_READ_AHEAD_CHUNK_SIZE = 1 << 20  # 1 MB per READ request
+DEFAULT_READ_AHEAD_DEPTH = 8  # number of READ requests in flight
+DEFAULT_WRITE_BEHIND_CHUNK_SIZE = 1 << 20  # 1 MB per WRITE request
+DEFAULT_WRITE_BEHIND_DEPTH = 8  # number of WRITE requests in flight
+DEFAULT_COALESCE_GAP = 1 << 16  # merge ranges closer than 64 KB
+
+
+def _credit_charge(connection, length: int) -> int:
+    if not connection.supports_multi_credit:
+        return 1
+    return (max(0, length - 1) // MAX_PAYLOAD_SIZE) + 1
+
+
+def _available_credits(connection) -> int:
+    return connection.sequence_window["high"] - connection.sequence_window["low"]
+
+
+def _fit_credits(connection, length: int, has_pending: bool) -> int:
+    """
+    Return how many bytes can be requested with the current SMB credits.
+    Returns 0 if we should wait for a pending response to get more credits.
+    """
+    available = _available_credits(connection)
+    if _credit_charge(connection, length) <= available:
+        return length
+    if has_pending:
+        return 0
+    return min(length, max(available, 1) * MAX_PAYLOAD_SIZE)
+
+
+def _send(fd, message, charge: int, target_credits: int):
+    """
+    Send a request prepared with ``send=False``. Asks the server for enough
+    credits to keep ``target_credits`` worth of requests in flight.
+    """
+    connection = fd.connection
+    desired = max(0, target_credits - _available_credits(connection))
+    return connection.send(
+        message,
+        sid=fd.tree_connect.session.session_id,
+        tid=fd.tree_connect.tree_connect_id,
+        credit_request=charge + desired,
+    )
+
+
+def read_pipelined(
+    fd,
+    ranges: List[Tuple[int, int]],
+    chunk_size: int = DEFAULT_READ_AHEAD_CHUNK_SIZE,
+    depth: int = DEFAULT_READ_AHEAD_DEPTH,
+) -> List[bytes]:
+    """
+    Read multiple ``(offset, length)`` ranges from an opened SMB file handle
+    (``smbprotocol.open.Open``). Ranges are split into READ requests of
+    ``chunk_size`` bytes, and up to ``depth`` requests are in flight.
+    Ranges beyond the end of the file return less data.
+
+    .. versionadded:: 0.0.2
+    """
+    connection = fd.connection
+    chunk_size = min(chunk_size, connection.max_read_size)
+    target_credits = _credit_charge(connection, chunk_size) * depth
+    results = [bytearray() for _ in ranges]
+    pending: Deque[Tuple[int, Any, Any]] = deque()
+
+    def receive_one():
+        ind, request, recv = pending.popleft()
+        try:
+            results[ind] += recv(request)
+        except EndOfFile:
+            pass
+
+    try:
+        for ind, (offset, length) in enumerate(ranges):
+            end = offset + length
+            while offset < end:
+                if len(pending) >= depth:
+                    receive_one()
+                n = _fit_credits(
+                    connection,
+                    min(chunk_size, end - offset),
+                    has_pending=bool(pending),
+                )
+                if not n:
+                    receive_one()
+                    continue
+                message, recv = fd.read(offset, n, send=False)
+                request = _send(fd, message, _credit_charge(connection, n), target_credits)
+                pending.append((ind, request, recv))
+                offset += n
+        while pending:
+            receive_one()
+    finally:
+        # make sure every request in flight is received even if one failed
+        while pending:
+            _, request, recv = pending.popleft()
+            try:
+                recv(request)
+            except Exception:  # pragma: no cover
+                pass
+    return [bytes(data) for data in results]
+
+
+def coalesce_ranges(
+    ranges: List[Tuple[int, int]],
+    gap: int = DEFAULT_COALESCE_GAP,
+) -> List[Tuple[int, int]]:
+    """
+    Sort the ``(offset, length)`` ranges and merge the overlapping ones and
+    the ones closer than ``gap`` bytes, reading a few extra bytes is cheaper
+    than another request.
+
+    .. versionadded:: 0.0.2
+    """
+    merged: List[List[int]] = list()
+    for offset, length in sorted(ranges):
+        if offset < 0 or length < 0:
+            raise ValueError(f"invalid range ({offset}, {length})")
+        end = offset + length
+        if merged and (offset - merged[-1][1] <= gap):
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([offset, end])
+    return [(start, end - start) for start, end in merged]
+
+
+def _read_range_compound(
+    path: str,
+    offset: int,
+    length: int,
+    share_access: str = None,
+    **kwargs
+) -> Union[bytes, None]:
+    """
+    Send CREATE, READ and CLOSE as one compound request. Return None without
+    sending anything if the range doesn't fit in one READ request, or the
+    private ``smbclient`` API it relies on is not available.
+    """
+    if SMBFileTransaction is None:
+        return None
+    try:
+        raw = SMBFileIO(path, mode="rb", share_access=share_access, **kwargs)
+        connection = raw.fd.connection
+        if (length > connection.max_read_size) or \
+            (_credit_charge(connection, length) + 2 > _available_credits(connection)):
+            return None
+        transaction = SMBFileTransaction(raw)
+        transaction += raw.fd.read(offset, length, send=False)
+    except (AttributeError, TypeError):  # the private API has changed
+        return None
+    try:
+        transaction.commit()
+    except smbclient.SMBOSError as e:
+        if e.ntstatus == NtStatus.STATUS_END_OF_FILE:
+            return b""
+        raise
+    return transaction.results[0]
+
+
+def read_range(
+    path: str,
+    offset: int,
+    length: int,
+    share_access: str = None,
+    **kwargs
+) -> bytes:
+    """
+    Read ``length`` bytes from ``offset``. If it fits in one READ request,
+    CREATE, READ and CLOSE are sent as one compound request, which costs a
+    single round trip. Otherwise, or if the compound request is not
+    supported by the installed ``smbclient``, the file is opened, read and
+    closed with separate requests.
+
+    .. versionadded:: 0.0.2
+    """
+    if offset < 0 or length < 0:
+        raise ValueError(f"invalid range ({offset}, {length})")
+    if length == 0:
+        return b""
+    data = _read_range_compound(path, offset, length, share_access=share_access, **kwargs)
+    if data is not None:
+        return data
+    with smbclient.open_file(
+        path,
+        mode="rb",
+        buffering=0,
+        share_access=share_access,
+        **kwargs
+    ) as raw:
+        return read_pipelined(raw.fd, [(offset, length)])[0]
+
+
+def read_ranges(
+    path: str,
+    ranges: List[Tuple[int, int]],
+    gap: int = DEFAULT_COALESCE_GAP,
+    depth: int = DEFAULT_READ_AHEAD_DEPTH,
+    share_access: str = None,
+    **kwargs
+) -> List[bytes]:
+    """
+    Read multiple ``(offset, length)`` ranges with one file handle. Nearby
+    ranges are merged by :func:`coalesce_ranges`, the merged ranges are read
+    concurrently by :func:`read_pipelined`.
+
+    :return: the data of each range, in the same order as ``ranges``.
+
+    .. versionadded:: 0.0.2
+    """
+    ranges = list(ranges)
+    if len(ranges) == 0:
+        return list()
+    merged = coalesce_ranges(ranges, gap=gap)
+    with smbclient.open_file(
+        path,
+        mode="rb",
+        buffering=0,
+        share_access=share_access,
+        **kwargs
+    ) as raw:
+        blocks = read_pipelined(raw.fd, merged, depth=depth)
+    starts = [start for start, _ in merged]
+    results = list()
+    for offset, length in ranges:
+        ind = bisect_right(starts, offset) - 1
+        relative_offset = offset - starts[ind]
+        results.append(blocks[ind][relative_offset:relative_offset + length])
+    return results
+
+
+def readinto_full(f, view: memoryview) -> int:
+    """
+    Call ``f.readinto`` until ``view`` is full or reach the end of the file,
+    a single ``readinto`` on SMB file may return less bytes than requested.
+
+    :return: number of bytes read into ``view``.
+
+    .. versionadded:: 0.0.2
+    """
+    total = 0
+    size = len(view)
+    while total < size:
+        n = f.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+
+def iter_records(
+    f,
+    delimiter: AnyStr,
+    chunk_size: int = DEFAULT_READ_AHEAD_CHUNK_SIZE,
+) -> Iterable[AnyStr]:
+    """
+    Split the content of a binary or text file object by ``delimiter``,
+    reading ``chunk_size`` at a time. Only the current chunk and the
+    incomplete record are kept in memory. The delimiter is not included in
+    the records, a trailing delimiter doesn't produce an empty record.
+
+    .. versionadded:: 0.0.2
+    """
+    if len(delimiter) == 0:
+        raise ValueError("delimiter cannot be empty")
+    if chunk_size < 1:
+        raise ValueError("chunk_size cannot smaller than 1")
+    buffer = delimiter[:0]
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        # the delimiter may be split between the previous and the new chunk
+        search_from = max(0, len(buffer) - len(delimiter) + 1)
+        buffer += chunk
+        start = 0
+        while True:
+            ind = buffer.find(delimiter, max(start, search_from))
+            if ind == -1:
+                break
+            yield buffer[start:ind]
+            start = ind + len(delimiter)
+        buffer = buffer[start:]
+    if buffer:
+        yield buffer
+
+
+class LineDecoder:
+    """
+    Incrementally decode bytes and split them into lines. ``\\n`` and
+    ``\\r\\n`` line endings are removed, the incomplete last line is kept
+    until more data arrives or :meth:`flush` is called.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(
+        self,
+        encoding: str = "utf-8",
+        errors: str = None,
+    ):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors or "strict")
+        self._pending = ""
+
+    def _split(self, text: str) -> List[str]:
+        lines = (self._pending + text).split("\n")
+        self._pending = lines.pop()
+        return [line[:-1] if line.endswith("\r") else line for line in lines]
+
+    def feed(self, data: bytes) -> List[str]:
+        """
+        Return the lines completed by ``data``.
+        """
+        return self._split(self._decoder.decode(data))
+
+    def flush(self) -> List[str]:
+        """
+        Return the remaining lines, including the incomplete last line.
+        """
+        lines = self._split(self._decoder.decode(b"", final=True))
+        if self._pending:
+            lines.append(self._pending[:-1] if self._pending.endswith("\r") else self._pending)
+            self._pending = ""
+        return lines
+
+    def reset(self):
+        """
+        Discard the buffered data.
+        """
+        self._decoder.reset()
+        self._pending = ""
+
+
+class ReadAheadReader(io.RawIOBase):
+    """
+    A read only raw stream on top of a SMB file handle, keeps up to
+    ``depth`` READ requests of ``chunk_size`` bytes in flight ahead of the
+    current position, :meth:`readinto` is served from the prefetched data.
+
+    Random access still works, :meth:`seek` out of the prefetched window
+    discards the requests in flight and restarts the read-ahead from the
+    new position.
+
+    Usually created by ``FsxPath.open("rb", read_ahead=...)``.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(
+        self,
+        raw: io.RawIOBase,
+        chunk_size: int = DEFAULT_READ_AHEAD_CHUNK_SIZE,
+        depth: int = DEFAULT_READ_AHEAD_DEPTH,
+    ):
+        super(ReadAheadReader, self).__init__()
+        if chunk_size < 1:
+            raise ValueError("chunk_size cannot smaller than 1")
+        if depth < 1:
+            raise ValueError("depth cannot smaller than 1")
+        self._raw = raw
+        self._fd = raw.fd
+        self._chunk_size = min(chunk_size, self._fd.connection.max_read_size)
+        self._depth = depth
+        self._size: int = self._fd.end_of_file
+        self._offset: int = raw.tell()  # position of the reader
+        self._next_offset: int = self._offset  # offset of next READ request
+        # (offset, length, request, recv) of the READ requests in flight
+        self._pending: Deque[Tuple[int, int, Any, Any]] = deque()
+        self._buffer = memoryview(b"")
+
+    @property
+    def name(self):
+        return self._raw.name
+
+    @property
+    def mode(self):
+        return self._raw.mode
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._offset
+
+    def _fill(self):
+        connection = self._fd.connection
+        charge = _credit_charge(connection, self._chunk_size)
+        while (len(self._pending) < self._depth) and (self._next_offset < self._size):
+            length = _fit_credits(
+                connection,
+                min(self._chunk_size, self._size - self._next_offset),
+                has_pending=bool(self._pending),
+            )
+            if not length:
+                break
+            message, recv = self._fd.read(self._next_offset, length, send=False)
+            request = _send(self._fd, message, _credit_charge(connection, length), charge * self._depth)
+            self._pending.append((self._next_offset, length, request, recv))
+            self._next_offset += length
+
+    def _discard(self):
+        """
+        Receive and drop all the responses in flight, so they don't stay in
+        the connection's outstanding requests.
+        """
+        while self._pending:
+            _, _, request, recv = self._pending.popleft()
+            try:
+                recv(request)
+            except Exception:  # pragma: no cover
+                pass
+        self._buffer = memoryview(b"")
+
+    def _next_chunk(self) -> bool:
+        self._fill()
+        if not self._pending:
+            return False
+        offset, length, request, recv = self._pending.popleft()
+        try:
+            data = recv(request)
+        except EndOfFile:  # truncated after it was opened
+            data = b""
+        # the length may be cut by the credits, compare with what was requested
+        if len(data) < length:  # short read, restart the read-ahead after it
+            self._discard()
+            self._next_offset = offset + len(data)
+            if not data:
+                self._size = offset
+        self._fill()
+        self._buffer = memoryview(data)
+        return bool(data)
+
+    def readinto(self, b) -> int:
+        if not self._buffer:
+            if (self._offset >= self._size) or (not self._next_chunk()):
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        self._offset += n
+        return n
+
+    def readall(self) -> bytes:
+        data = bytearray(self._buffer)
+        self._offset += len(self._buffer)
+        self._buffer = memoryview(b"")
+        while (self._offset < self._size) and self._next_chunk():
+            data += self._buffer
+            self._offset += len(self._buffer)
+            self._buffer = memoryview(b"")
+        return bytes(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            new_offset = offset
+        elif whence == io.SEEK_CUR:
+            new_offset = self._offset + offset
+        elif whence == io.SEEK_END:
+            new_offset = self._size + offset
+        else:  # pragma: no cover
+            raise ValueError(f"invalid whence ({whence})")
+        if new_offset < 0:
+            raise ValueError(f"negative seek position {new_offset}")
+
+        delta = new_offset - self._offset
+        if 0 <= delta <= len(self._buffer):  # still in the current chunk
+            self._buffer = self._buffer[delta:]
+        elif new_offset != self._offset:
+            self._discard()
+            self._next_offset = new_offset
+        self._offset = new_offset
+        return self._offset
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._discard()
+            finally:
+                self._raw.close()
+                super(ReadAheadReader, self).close()
+
+
+def open_read_ahead(
+    path: str,
+    mode: str = "rb",
+    chunk_size: int = DEFAULT_READ_AHEAD_CHUNK_SIZE,
+    depth: int = DEFAULT_READ_AHEAD_DEPTH,
+    buffering: int = -1,
+    encoding: str = None,
+    errors: str = None,
+    newline: str = None,
+    share_access: str = None,
+    **kwargs
+):
+    """
+    Similar to ``smbclient.open_file``, but the file is read through a
+    :class:`ReadAheadReader`. Only read modes ``"r"``, ``"rb"`` and ``"rt"``
+    are supported.
+
+    .. versionadded:: 0.0.2
+    """
+    if (not set(mode).issubset(set("rbt"))) or ("r" not in mode):
+        raise ValueError(f"read ahead only supports read mode, got {mode!r}")
+    raw = smbclient.open_file(
+        path,
+        mode="rb",
+        buffering=0,
+        share_access=share_access,
+        **kwargs
+    )
+    try:
+        reader = ReadAheadReader(raw, chunk_size=chunk_size, depth=depth)
+        if buffering == 0:
+            if "b" not in mode:
+                raise ValueError("can't have unbuffered text I/O")
+            return reader
+        if buffering in (-1, 1):
+            buffering = reader._chunk_size
+        buffered = io.BufferedReader(reader, buffer_size=buffering)
+        if "b" in mode:
+            return buffered
+        return io.TextIOWrapper(buffered, encoding, errors, newline)
+    except Exception:
+        raw.close()
+        raise
+
+
+class WriteBehindWriter(io.RawIOBase):
+    """
+    A write only raw stream on top of a SMB file handle. Each :meth:`write`
+    is split into WRITE requests of ``chunk_size`` bytes which are sent
+    without waiting for the response, at most ``depth`` requests are in
+    flight so the memory usage is bounded by ``chunk_size * depth``.
+
+    Because the responses are collected later, a failed WRITE is raised by
+    the next :meth:`write`, :meth:`flush` or :meth:`close`.
+
+    If ``preallocate`` is given, the file is extended to hold that many bytes
+    from the start position before writing, so the server doesn't have to
+    extend the file on every WRITE. The existing content is never cut, for
+    example in append mode. On close, the unused preallocated space is
+    truncated.
+
+    Usually created by ``FsxPath.open("wb", write_behind=...)``.
+
+    .. versionadded:: 0.0.2
+    """
+
+    def __init__(
+        self,
+        raw: io.RawIOBase,
+        chunk_size: int = DEFAULT_WRITE_BEHIND_CHUNK_SIZE,
+        depth: int = DEFAULT_WRITE_BEHIND_DEPTH,
+        preallocate: int = None,
+    ):
+        super(WriteBehindWriter, self).__init__()
+        if chunk_size < 1:
+            raise ValueError("chunk_size cannot smaller than 1")
+        if depth < 1:
+            raise ValueError("depth cannot smaller than 1")
+        self._raw = raw
+        self._fd = raw.fd
+        self._chunk_size = min(chunk_size, self._fd.connection.max_write_size)
+        self._depth = depth
+        self._offset: int = raw.tell()
+        self._end: int = self._offset  # end of the written data
+        self._pending: Deque[Tuple[int, int, Any, Any]] = deque()
+        self._error: Union[Exception, None] = None
+        self._written = False
+        # size of the file before writing, the preallocated space is after it
+        self._size: int = self._fd.end_of_file
+        self._preallocate_end: Union[int, None] = None
+        if preallocate and (self._offset + preallocate > self._size):
+            self._preallocate_end = self._offset + preallocate
+            raw.truncate(self._preallocate_end)
+
+    @property
+    def name(self):
+        return self._raw.name
+
+    @property
+    def mode(self):
+        return self._raw.mode
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._offset
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            new_offset = offset
+        elif whence == io.SEEK_CUR:
+            new_offset = self._offset + offset
+        elif whence == io.SEEK_END:
+            new_offset = self._end + offset
+        else:  # pragma: no cover
+            raise ValueError(f"invalid whence ({whence})")
+        if new_offset < 0:
+            raise ValueError(f"negative seek position {new_offset}")
+        self._offset = new_offset
+        return self._offset
+
+    def _receive_one(self):
+        offset, length, request, recv = self._pending.popleft()
+        try:
+            count = recv(request)
+            if count != length:
+                raise OSError(
+                    f"short write at offset {offset}: "
+                    f"{count} of {length} bytes are written"
+                )
+        except Exception as e:
+            if self._error is None:
+                self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _drain(self):
+        while self._pending:
+            self._receive_one()
+
+    def write(self, b) -> int:
+        self._raise_error()
+        connection = self._fd.connection
+        target_credits = _credit_charge(connection, self._chunk_size) * self._depth
+        view = memoryview(b).cast("B")
+        total = len(view)
+        pos = 0
+        while pos < total:
+            if len(self._pending) >= self._depth:
+                self._receive_one()
+            length = _fit_credits(
+                connection,
+                min(self._chunk_size, total - pos),
+                has_pending=bool(self._pending),
+            )
+            if not length:
+                self._receive_one()
+                continue
+            # the caller may reuse the buffer, the data in flight must be a copy
+            data = bytes(view[pos:pos + length])
+            message, recv = self._fd.write(data, offset=self._offset, send=False)
+            request = _send(self._fd, message, _credit_charge(connection, length), target_credits)
+            self._pending.append((self._offset, length, request, recv))
+            self._offset += length
+            self._end = max(self._end, self._offset)
+            self._written = True
+            pos += length
+        self._raise_error()
+        return total
+
+    def flush(self):
+        """
+        Wait for all the WRITE requests in flight, then flush the file on
+        the server.
+        """
+        if self.closed:
+            return
+        self._drain()
+        self._raise_error()
+        if self._written:
+            self._fd.flush()
+            self._written = False
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._drain()
+                if (self._preallocate_end is not None) and (self._end < self._preallocate_end):
+                    self._raw.truncate(max(self._end, self._size))
+                self._raise_error()
+            finally:
+                self._raw.close()
+                super(WriteBehindWriter, self).close()
+
+
+class _BufferedWriteBehind(io.BufferedWriter):
+    """
+    ``io.BufferedWriter.flush`` doesn't flush the raw stream, we need it to
+    wait for the WRITE requests in flight and surface the error.
+    """
+
+    def flush(self):
+        super(_BufferedWriteBehind, self).flush()
+        self.raw.flush()
+
+
+def open_write_behind(
+    path: str,
+    mode: str = "wb",
+    chunk_size: int = DEFAULT_WRITE_BEHIND_CHUNK_SIZE,
+    depth: int = DEFAULT_WRITE_BEHIND_DEPTH,
+    preallocate: int = None,
+    buffering: int = -1,
+    encoding: str = None,
+    errors: str = None,
+    newline: str = None,
+    share_access: str = None,
+    **kwargs
+):
+    """
+    Similar to ``smbclient.open_file``, but the file is written through a
+    :class:`WriteBehindWriter`. Only write modes ``"w"``, ``"x"``, ``"a"``
+    (binary or text) are supported.
+
+    .. versionadded:: 0.0.2
+    """
+    if (not set(mode).issubset(set("wxabt"))) or (len(set(mode) & set("wxa")) != 1):
+        raise ValueError(f"write behind only supports write mode, got {mode!r}")
+    raw_mode = mode.replace("t", "")
+    if "b" not in raw_mode:
+        raw_mode += "b"
+    raw = smbclient.open_file(
+        path,
+        mode=raw_mode,
+        buffering=0,
+        share_access=share_access,
+        **kwargs
+    )
+    try:
+        writer = WriteBehindWriter(
+            raw,
+            chunk_size=chunk_size,
+            depth=depth,
+            preallocate=preallocate,
+        )
+        if buffering == 0:
+            if "b" not in mode:
+                raise ValueError("can't have unbuffered text I/O")
+            return writer
+        if buffering in (-1, 1):
+            buffering = writer._chunk_size
+        buffered = _BufferedWriteBehind(writer, buffer_size=buffering)
+        if "b" in mode:
+            return buffered
+        return io.TextIOWrapper(buffered, encoding, errors, newline)
+    except Exception:
+        raw.close()
+        raise
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""
+Multi stream file transfer between FSx and local file system.
+
+The local side of the transfer is memory mapped. The SMB READ responses are
+copied straight into the mapped destination. On upload the source is read
+from the mapping instead of a ``read()`` buffer, but each WRITE request still
+holds a ``bytes`` copy of its chunk, as the data in flight must not change.
+"""
+
+import os
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Tuple, Union
+
+from . import exc
+from .hashes import DEFAULT_WORKERS
+from .stream import (
+    readinto_full,
+    DEFAULT_WRITE_BEHIND_CHUNK_SIZE,
+    DEFAULT_WRITE_BEHIND_DEPTH,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib_mate import Path
+    from .path import FsxPath
+
+DEFAULT_RANGE_SIZE = 1 << 26  # 64 MB per range
+
+
+def split_ranges(
+    size: int,
+    range_size: int,
+) -> List[Tuple[int, int]]:
+    """
+    Split ``size`` bytes into a list of ``(offset, length)``.
+
+    .. versionadded:: 0.0.2
+    """
+    if range_size < 1:
+        raise ValueError("range_size cannot smaller than 1")
+    return [
+        (offset, min(range_size, size - offset))
+        for offset in range(0, size, range_size)
+    ]
+
+
+def _advise_sequential(mm: mmap.mmap):
+    """
+    Tell the kernel the mapping is accessed sequentially, so it reads ahead
+    aggressively and drops the pages early. Not available on every platform.
+    """
+    if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+
+
+def _check_end(f_src, fpath: 'FsxPath', size: int):
+    """
+    Raise if there is still data after ``size`` bytes.
+    """
+    if f_src.read(1):
+        raise exc.FsxError(
+            f"{fpath.abspath} grows while downloading, expect {size} bytes"
+        )
+
+
+def _download_range(
+    fpath: 'FsxPath',
+    view: memoryview,
+    offset: int,
+    length: int,
+):
+    size = len(view)
+    with fpath.open(mode="rb", buffering=0) as f_src:
+        f_src.seek(offset)
+        n = readinto_full(f_src, view[offset:offset + length])
+        if n == length and offset + length == size:
+            _check_end(f_src, fpath, size)
+    if n < length:
+        raise EOFError(
+            f"{fpath.abspath} is truncated while downloading, "
+            f"expect {length} bytes from offset {offset}"
+        )
+
+
+def download_ranged(
+    fpath: 'FsxPath',
+    path: Union[str, 'Path'],
+    range_size: int = DEFAULT_RANGE_SIZE,
+    workers: int = DEFAULT_WORKERS,
+) -> int:
+    """
+    Download one FSx file to local with multiple streams. The local file is
+    preallocated and memory mapped, then the file is split into
+    ``range_size`` ranges, each range is read by a thread with its own SMB
+    file handle directly into its own region of the mapped file.
+
+    The size comes from the stat cached on ``fpath`` if any, for example
+    from the directory listing of a tree copy, so no extra SMB request is
+    sent per file. If the file changed size since then, nothing is
+    silently cut: a file truncated raises ``EOFError``, a file grown raises
+    :class:`~fsxpathlib.exc.FsxError`, the end of the file is checked after
+    the last range.
+
+    :return: number of bytes downloaded.
+
+    .. versionadded:: 0.0.2
+    """
+    if workers < 1:
+        raise ValueError("workers cannot smaller than 1")
+    local_path = os.fspath(path)
+    size = fpath.size
+    ranges = split_ranges(size, range_size)
+    with open(local_path, "w+b") as f:
+        if size == 0:  # cannot mmap an empty file
+            with fpath.open(mode="rb", buffering=0) as f_src:
+                _check_end(f_src, fpath, size)
+            return 0
+        f.truncate(size)
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_WRITE) as mm:
+            view = memoryview(mm)
+            try:
+                def download(range_: Tuple[int, int]):
+                    _download_range(fpath, view, range_[0], range_[1])
+
+                if workers == 1 or len(ranges) <= 1:
+                    for range_ in ranges:
+                        download(range_)
+                else:
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        # consume the iterator to raise the first error
+                        for _ in executor.map(download, ranges):
+                            pass
+                mm.flush()
+            finally:
+                view.release()
+    return size
+
+
+def upload_mmap(
+    path: Union[str, 'Path'],
+    fpath: 'FsxPath',
+    chunk_size: int = DEFAULT_WRITE_BEHIND_CHUNK_SIZE,
+    depth: int = DEFAULT_WRITE_BEHIND_DEPTH,
+) -> int:
+    """
+    Upload one local file to FSx. The local file is memory mapped, chunks of
+    the mapping are copied into pipelined WRITE requests, see
+    :class:`~fsxpathlib.stream.WriteBehindWriter`.
+
+    :return: number of bytes uploaded.
+
+    .. versionadded:: 0.0.2
+    """
+    local_path = os.fspath(path)
+    size = os.path.getsize(local_path)
+    with fpath.open(
+        mode="wb",
+        buffering=0,
+        write_behind=depth,
+        write_behind_chunk_size=chunk_size,
+        preallocate=size,
+    ) as f_out:
+        if size == 0:  # cannot mmap an empty file
+            return 0
+        with open(local_path, "rb") as f_in:
+            with mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                _advise_sequential(mm)
+                view = memoryview(mm)
+                try:
+                    f_out.write(view)
+                finally:
+                    view.release()
+    return size
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+"""
+Parallel disk usage aggregation, similar to ``du``.
+
+The tree is listed level by level, the directories of a level are listed
+concurrently. The size and modification time come from the directory
+listings, no per file ``stat`` request is sent. Only the directories within
+``depth`` levels from the root get their own :class:`DirUsage`, the deeper
+ones are accumulated into their ancestor at ``depth``, so the memory usage
+doesn't grow with the size of the tree.
+"""
+
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Tuple, Optional
+
+from .hashes import DEFAULT_WORKERS
+from .helper import repr_data_size
+from .logger import logger, TAB1
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .path import FsxPath
+
+
+class DirUsage:
+    """
+    The usage of a directory, including everything under it.
+
+    :param depth: 0 for the root directory, 1 for its children...
+
+    .. versionadded:: 0.0.2
+    """
+
+    __slots__ = (
+        "fpath", "depth", "parent",
+        "n_files", "n_dirs", "n_bytes", "newest_mtime_ns", "n_errors",
+    )
+
+    def __init__(
+        self,
+        fpath: 'FsxPath',
+        depth: int = 0,
+        parent: Optional['DirUsage'] = None,
+    ):
+        self.fpath = fpath
+        self.depth = depth
+        self.parent = parent
+        self.n_files = 0
+        self.n_dirs = 0
+        self.n_bytes = 0
+        self.newest_mtime_ns = 0
+        self.n_errors = 0
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({self.fpath.abspath!r}, "
+            f"n_files={self.n_files}, n_dirs={self.n_dirs}, "
+            f"n_bytes={repr_data_size(self.n_bytes)})"
+        )
+
+    @property
+    def newest_mtime(self) -> float:
+        """
+        The newest modification time of the files in it, 0 if no file.
+        """
+        return self.newest_mtime_ns / 1000000000
+
+    @property
+    def size_for_human(self) -> str:
+        return repr_data_size(self.n_bytes)
+
+    def _add(self, other: 'DirUsage'):
+        self.n_files += other.n_files
+        self.n_dirs += other.n_dirs
+        self.n_bytes += other.n_bytes
+        self.n_errors += other.n_errors
+        if other.newest_mtime_ns > self.newest_mtime_ns:
+            self.newest_mtime_ns = other.newest_mtime_ns
+
+
+def disk_usage(
+    fpath: 'FsxPath',
+    depth: int = 1,
+    workers: int = DEFAULT_WORKERS,
+) -> List[DirUsage]:
+    """
+    Compute the total size, number of files and directories and the newest
+    file modification time of the directory ``fpath`` and its sub
+    directories within ``depth`` levels, rolled up to the ancestors.
+
+    :return: the :class:`DirUsage` list sorted by path, the first one is
+        ``fpath``. Sub directories that cannot be listed are counted in
+        :attr:`DirUsage.n_errors`.
+
+    .. versionadded:: 0.0.2
+    """
+    if depth < 0:
+        raise ValueError("depth cannot smaller than 0")
+    if workers < 1:
+        raise ValueError("workers cannot smaller than 1")
+    fpath.assert_is_dir_and_exists()
+    logger.info(f"compute disk usage of {fpath.abspath} with {workers} workers")
+
+    root = DirUsage(fpath)
+    nodes: List[DirUsage] = [root]
+    lock = threading.Lock()
+
+    def list_dir(task: Tuple['FsxPath', int, DirUsage]) -> List[Tuple['FsxPath', int, DirUsage]]:
+        p_dir, level, node = task
+        # accumulate locally, then merge into the shared node under the lock
+        usage = DirUsage(p_dir)
+        children = list()
+        try:
+            dirs, files = p_dir._scandir()
+        except OSError:
+            usage.n_errors += 1
+            dirs, files = [], []
+        for p in files:
+            st = p._stat()
+            usage.n_files += 1
+            usage.n_bytes += st.st_size
+            if st.st_mtime_ns > usage.newest_mtime_ns:
+                usage.newest_mtime_ns = st.st_mtime_ns
+        for p in dirs:
+            usage.n_dirs += 1
+            if stat.S_ISLNK(p._stat().st_mode):
+                continue
+            children.append(p)
+        with lock:
+            node._add(usage)
+            tasks = list()
+            for p in children:
+                if level < depth:
+                    child = DirUsage(p, level + 1, parent=node)
+                    nodes.append(child)
+                else:
+                    child = node
+                tasks.append((p, level + 1, child))
+        return tasks
+
+    level_tasks = [(fpath, 0, root)]
+    if workers == 1:
+        while level_tasks:
+            level_tasks = [t for task in level_tasks for t in list_dir(task)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while level_tasks:
+                level_tasks = [
+                    t
+                    for tasks in executor.map(list_dir, level_tasks)
+                    for t in tasks
+                ]
+
+    # nodes are created parent first, roll up in reverse order
+    for node in reversed(nodes):
+        if node.parent is not None:
+            node.parent._add(node)
+    logger.info(
+        f"{TAB1}done, {root.n_files} files ({root.size_for_human}) "
+        f"in {root.n_dirs} dirs, {root.n_errors} errors"
+    )
+    return sorted(nodes, key=lambda node: [part.lower() for part in node.fpath.parts])
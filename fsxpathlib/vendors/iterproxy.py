@@ -4,8 +4,59 @@
 Improve iter_objects API by giving it better iterator that support filters.
 """
 
+import heapq
+from collections import deque
 from itertools import islice
-from typing import Iterable, Iterator, Union, Set
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from operator import attrgetter
+from typing import Iterable, Iterator, Union, Set, Dict, Callable, Any
+
+Key = Union[str, Callable[[Any], Any]]
+
+
+def _to_key_func(key: Key) -> Callable[[Any], Any]:
+    """
+    A string key is the name of the item attribute.
+    """
+    if isinstance(key, str):
+        return attrgetter(key)
+    return key
+
+
+class Aggregate:
+    """
+    Running ``count``, ``sum``, ``min`` and ``max`` of the values of a group,
+    see :meth:`IterProxy.group_by`. ``sum``, ``min`` and ``max`` are None
+    if no value function is given.
+
+    .. versionadded:: 0.0.2
+    """
+
+    __slots__ = ("count", "sum", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.sum = None
+        self.min = None
+        self.max = None
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(count={self.count}, sum={self.sum}, "
+            f"min={self.min}, max={self.max})"
+        )
+
+    def add(self, value: Any = None):
+        self.count += 1
+        if value is not None:
+            if self.sum is None:
+                self.sum = self.min = self.max = value
+            else:
+                self.sum += value
+                if value < self.min:
+                    self.min = value
+                if value > self.max:
+                    self.max = value
 
 
 class IterProxy:
@@ -22,6 +73,12 @@ class IterProxy:
     - :meth:`many`: take many items
     - :meth:`all`: take all items
     - :meth:`skip`: skip k items
+    - :meth:`top_k`, :meth:`bottom_k`: take k largest / smallest items
+    - :meth:`sort_by`: take sorted items
+    - :meth:`group_by`: aggregate items by group
+    - :meth:`batch`: group items into lists
+    - :meth:`map`, :meth:`for_each`: apply a function with a thread pool
+    - :meth:`close`: stop the iteration early, also used as context manager
 
     .. versionadded:: 1.0.3
     """
@@ -64,6 +121,34 @@ class IterProxy:
             if and_all_true:
                 return item
 
+    def close(self):
+        """
+        Stop the iteration and close the underlying generator, which runs
+        its ``finally`` blocks right away, for example to close the open
+        directory handles of a directory walk. No more item is yielded
+        after that. It is also called when leaving the ``with`` block.
+
+        Example:
+
+        .. code-block:: python
+
+            >>> with IterProxy(walk()) as proxy:
+            ...     item = proxy.one()
+
+        .. versionadded:: 0.0.2
+        """
+        self._to_iterator()
+        close = getattr(self._iterator, "close", None)
+        if close is not None:
+            close()
+        self._iterator = iter(())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def filter(self, *funcs: callable):
         """
         Add one / multiple callable function that only takes one argument
@@ -266,3 +351,211 @@ class IterProxy:
         for _ in islice(self, k):
             pass
         return self
+
+    def top_k(self, key: Key, k: int) -> list:
+        """
+        Return the k largest remaining items by ``key``, largest first. Only
+        k items are kept in memory while consuming the iterator.
+
+        ``key`` is a callable, or the name of the item attribute.
+
+        Example:
+
+        .. code-block:: python
+
+            >>> IterProxy(range(10)).top_k(lambda i: i % 7, 3)
+            [6, 5, 4]
+
+        .. versionadded:: 0.0.2
+        """
+        if k < 0:
+            raise ValueError("k cannot smaller than 0")
+        self._to_iterator()
+        return heapq.nlargest(k, self, key=_to_key_func(key))
+
+    def bottom_k(self, key: Key, k: int) -> list:
+        """
+        Return the k smallest remaining items by ``key``, smallest first.
+        Only k items are kept in memory while consuming the iterator.
+
+        .. versionadded:: 0.0.2
+        """
+        if k < 0:
+            raise ValueError("k cannot smaller than 0")
+        self._to_iterator()
+        return heapq.nsmallest(k, self, key=_to_key_func(key))
+
+    def sort_by(self, key: Key, limit: int = None, reverse: bool = False) -> list:
+        """
+        Return the remaining items sorted by ``key``. With ``limit``, only
+        the first ``limit`` items are returned and kept in memory, see
+        :meth:`top_k` and :meth:`bottom_k`, otherwise all items are loaded.
+
+        .. versionadded:: 0.0.2
+        """
+        if limit is not None:
+            if reverse:
+                return self.top_k(key, limit)
+            return self.bottom_k(key, limit)
+        self._to_iterator()
+        return sorted(self, key=_to_key_func(key), reverse=reverse)
+
+    def group_by(self, key: Key, value: Key = None) -> Dict[Any, Aggregate]:
+        """
+        Consume the remaining items, return the :class:`Aggregate` of
+        ``value`` per ``key``. Only one aggregate per group is kept in memory.
+
+        Example:
+
+        .. code-block:: python
+
+            >>> groups = IterProxy(range(10)).group_by(lambda i: i % 2, lambda i: i)
+            >>> groups[0]
+            Aggregate(count=5, sum=20, min=0, max=8)
+
+        .. versionadded:: 0.0.2
+        """
+        key_func = _to_key_func(key)
+        value_func = None if value is None else _to_key_func(value)
+        groups: Dict[Any, Aggregate] = dict()
+        self._to_iterator()
+        for item in self:
+            group = key_func(item)
+            try:
+                agg = groups[group]
+            except KeyError:
+                agg = groups[group] = Aggregate()
+            agg.add(None if value_func is None else value_func(item))
+        return groups
+
+    def batch(self, n: int) -> 'IterProxy':
+        """
+        Group the remaining items into lists of ``n`` items, the last list
+        may be shorter. Items are pulled lazily one batch at a time, closing
+        the returned proxy closes this one.
+
+        Example:
+
+        .. code-block:: python
+
+            >>> IterProxy(range(5)).batch(2).all()
+            [[0, 1], [2, 3], [4]]
+
+        .. versionadded:: 0.0.2
+        """
+        if n < 1:
+            raise ValueError("n cannot smaller than 1")
+        self._to_iterator()
+
+        def iter_batches():
+            try:
+                while True:
+                    items = list(islice(self, n))
+                    if not items:
+                        return
+                    yield items
+            finally:
+                self.close()
+
+        return IterProxy(iter_batches())
+
+    def _map(
+        self,
+        func: Callable[[Any], Any],
+        workers: int,
+        ordered: bool,
+        max_pending: int,
+    ) -> Iterable[Any]:
+        self._to_iterator()
+        if workers == 1:
+            try:
+                for item in self:
+                    yield func(item)
+            finally:
+                self.close()
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            if ordered:
+                pending = deque()
+            else:
+                pending = set()
+            try:
+                for item in self:
+                    # backpressure, don't pull more items than the workers can take
+                    while len(pending) >= max_pending:
+                        if ordered:
+                            yield pending.popleft().result()
+                        else:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                yield future.result()
+                    future = executor.submit(func, item)
+                    if ordered:
+                        pending.append(future)
+                    else:
+                        pending.add(future)
+                while pending:
+                    if ordered:
+                        yield pending.popleft().result()
+                    else:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+            finally:
+                # the consumer stopped early or an error is raised
+                for future in pending:
+                    future.cancel()
+                self.close()
+
+    def map(
+        self,
+        func: Callable[[Any], Any],
+        workers: int = 1,
+        ordered: bool = False,
+        max_pending: int = None,
+    ) -> 'IterProxy':
+        """
+        Apply ``func`` to the remaining items with ``workers`` threads, return
+        an :class:`IterProxy` of the results. At most ``max_pending`` items
+        (default ``2 * workers``) are pulled ahead of the finished ones, so
+        the source iterator doesn't run ahead of the workers. The first
+        error raised by ``func`` is re-raised when its result is reached,
+        the items not started yet are cancelled. Closing the returned proxy
+        cancels the pending items and closes this one.
+
+        :param ordered: yield the results in the order of the items,
+            otherwise in the order of completion.
+
+        Example:
+
+        .. code-block:: python
+
+            >>> IterProxy(range(5)).map(lambda i: i * i, workers=4, ordered=True).all()
+            [0, 1, 4, 9, 16]
+
+        .. versionadded:: 0.0.2
+        """
+        if workers < 1:
+            raise ValueError("workers cannot smaller than 1")
+        if max_pending is None:
+            max_pending = 2 * workers
+        if max_pending < 1:
+            raise ValueError("max_pending cannot smaller than 1")
+        return IterProxy(self._map(func, workers, ordered, max_pending))
+
+    def for_each(
+        self,
+        func: Callable[[Any], Any],
+        workers: int = 1,
+        max_pending: int = None,
+    ) -> int:
+        """
+        Call ``func`` on every remaining item with ``workers`` threads, see
+        :meth:`map`. Return the number of items processed.
+
+        .. versionadded:: 0.0.2
+        """
+        n = 0
+        for _ in self.map(func, workers=workers, ordered=False, max_pending=max_pending):
+            n += 1
+        return n
@@ -29,7 +29,9 @@ download_url = "https://pypi.python.org/pypi/{}/{}#downloads".format(
 )
 install_requires = read_requirements_file(os.path.join(dir_here, "requirements.txt"))
 extras_require = {
-    "tests": read_requirements_file(os.path.join(dir_here, "requirements-test.txt"))
+    "tests": read_requirements_file(os.path.join(dir_here, "requirements-test.txt")),
+    "fsspec": ["fsspec>=2023.1.0"],
+    "export": ["numpy", "pyarrow>=7.0.0"],
 }
 packages = [package_name, ] + [
     "{}.{}".format(package_name, file)
@@ -70,6 +72,12 @@ setup(
     python_requires=">=3.6, <4",
     install_requires=install_requires,
     extras_require=extras_require,
+    entry_points={
+        # allow ``fsspec.filesystem("fsx")`` and ``fsx://`` url
+        "fsspec.specs": [
+            "fsx = fsxpathlib.fs:FsxFileSystem",
+        ],
+    },
 )
 
 """
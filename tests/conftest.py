@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import smbclient
+
+from fakes import FakeShare
+
+
+@pytest.fixture
+def share(monkeypatch) -> FakeShare:
+    """
+    An empty :class:`~fakes.FakeShare` at :data:`~fakes.ROOT` patched over
+    ``smbclient``, so :class:`~fsxpathlib.path.FsxPath` works offline.
+    """
+    share = FakeShare()
+    monkeypatch.setattr(smbclient, "stat", share.stat)
+    monkeypatch.setattr(smbclient, "scandir", share.scandir)
+    monkeypatch.setattr(smbclient, "remove", share.remove)
+    monkeypatch.setattr(smbclient, "rmdir", share.rmdir)
+    monkeypatch.setattr(smbclient.path, "isdir", share.isdir)
+    return share
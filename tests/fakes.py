@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fakes shared by the offline tests.
+
+- :class:`LocalPath` and :class:`LocalFile` look like a
+  :class:`~fsxpathlib.path.FsxPath` to the helper modules, backed by the local
+  file system.
+- :class:`FakeShare` is an in memory SMB share, patched over ``smbclient`` by
+  the ``share`` fixture in ``conftest.py``, to test :class:`~fsxpathlib.path.FsxPath`
+  itself without a FSx server.
+"""
+
+import os
+import hashlib
+import threading
+from pathlib import PurePath
+from datetime import datetime, timezone, timedelta
+
+import smbclient
+
+from fsxpathlib.path import FsxPath
+
+ROOT = FsxPath("server", "share", "root")
+
+
+class LocalPath:
+    """
+    A local path that looks like a :class:`~fsxpathlib.path.FsxPath` to
+    :mod:`fsxpathlib.bulk`, :mod:`fsxpathlib.usage` and :mod:`fsxpathlib.s3sync`.
+    Files named ``locked.txt`` cannot be removed.
+    """
+
+    def __init__(self, path: str):
+        self.abspath = path
+        self.basename = os.path.basename(path)
+        self.parts = PurePath(path).parts
+
+    def assert_is_dir_and_exists(self):
+        assert os.path.isdir(self.abspath)
+
+    def _stat(self):
+        return os.lstat(self.abspath)
+
+    @property
+    def md5(self) -> str:
+        with open(self.abspath, "rb") as f:
+            return hashlib.md5(f.read()).hexdigest()
+
+    def _scandir(self):
+        dirs, files = list(), list()
+        for entry in os.scandir(self.abspath):
+            if entry.is_dir():
+                dirs.append(LocalPath(entry.path))
+            else:
+                files.append(LocalPath(entry.path))
+        return dirs, files
+
+    def remove(self):
+        if self.basename == "locked.txt":
+            raise PermissionError(self.abspath)
+        os.remove(self.abspath)
+
+    def rmdir(self):
+        os.rmdir(self.abspath)
+
+    def move_to(self, target: 'LocalPath', overwrite: bool = False):
+        if (not overwrite) and os.path.exists(target.abspath):
+            raise FileExistsError(target.abspath)
+        os.replace(self.abspath, target.abspath)
+        return target
+
+
+class LocalFile:
+    """
+    A local file that looks like a :class:`~fsxpathlib.path.FsxPath` to
+    :mod:`fsxpathlib.transfer` and :mod:`fsxpathlib.cache`, counts the stat
+    and open calls. The FSx only ``open`` arguments are ignored.
+    """
+
+    def __init__(self, path: str):
+        self.abspath = path
+        self._stat_cache = None
+        self.n_stat = 0
+        self.n_open = 0
+
+    def _stat(self):
+        if self._stat_cache is None:
+            self.n_stat += 1
+            self._stat_cache = os.stat(self.abspath)
+        return self._stat_cache
+
+    @property
+    def size(self) -> int:
+        return self._stat().st_size
+
+    def open(
+        self,
+        mode="rb",
+        buffering=-1,
+        encoding=None,
+        errors=None,
+        newline=None,
+        **kwargs
+    ):
+        self.n_open += 1
+        return open(
+            self.abspath,
+            mode,
+            buffering=buffering,
+            encoding=encoding,
+            errors=errors,
+            newline=newline,
+        )
+
+
+def make_tree(
+    root,
+    n_dirs: int = 3,
+    n_files: int = 5,
+    depth: int = 3,
+    empty: bool = False,
+):
+    """
+    Create ``depth`` levels of ``n_dirs`` sub directories, each level has
+    ``n_files`` files of 5 bytes, the modification time of a file is
+    ``1600000000 + depth * 10 + index``. With ``empty``, every directory
+    also has an empty sub directory ``empty``.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    for ind in range(n_files):
+        p = root / f"{ind}.txt"
+        p.write_text("hello")
+        mtime_ns = (1600000000 + depth * 10 + ind) * 10 ** 9
+        os.utime(p, ns=(mtime_ns, mtime_ns))
+    if depth > 1:
+        for ind in range(n_dirs):
+            make_tree(root / f"dir{ind}", n_dirs, n_files, depth - 1, empty)
+    if empty:
+        (root / "empty").mkdir()
+
+
+def write_files(root, files: dict):
+    """
+    Create the files from ``{"a/b.txt": content}``, all modified at
+    ``1600000000``.
+    """
+    for relpath, content in files.items():
+        p = root.joinpath(*relpath.split("/"))
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(content)
+        os.utime(p, ns=(1600000000 * 10 ** 9, 1600000000 * 10 ** 9))
+
+
+class SmbInfo:
+    def __init__(self, is_dir: bool, size: int, mtime: datetime):
+        self.file_attributes = 0x10 if is_dir else 0x20
+        self.end_of_file = size
+        self.file_id = 0
+        self.last_access_time = mtime
+        self.last_write_time = mtime
+        self.creation_time = mtime
+        self.change_time = mtime
+
+
+class DirEntry:
+    """
+    ``is_dir()`` of a symlink would follow the link with another SMB request,
+    it fails here.
+    """
+
+    def __init__(
+        self,
+        dirpath: str,
+        name: str,
+        is_dir: bool,
+        size: int,
+        mtime: datetime,
+        is_symlink: bool = False,
+    ):
+        self.name = name
+        self.path = f"{dirpath}\\{name}"
+        self._is_dir = is_dir
+        self._is_symlink = is_symlink
+        self.smb_info = SmbInfo(is_dir, size, mtime)
+
+    def is_dir(self):
+        assert not self._is_symlink, f"is_dir() follows the symlink {self.path}"
+        return self._is_dir
+
+    def is_symlink(self):
+        return self._is_symlink
+
+
+class FakeShare:
+    """
+    In memory directory tree under :data:`ROOT`, the ``smbclient`` methods
+    take the absolute path, :meth:`add`, :meth:`delete` and :meth:`modify`
+    take the path relative to :data:`ROOT`. Every change moves the clock one
+    second forward, the modification time of a directory changes when an
+    entry is added or removed. A directory lists its entries by name. A
+    symlink is added as an entry with ``symlink=True``, its target is not
+    part of the tree.
+    """
+
+    def __init__(self):
+        self.clock = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        self.nodes = dict()  # lower abspath -> [name, is_dir, size, mtime]
+        self.children = dict()  # lower abspath -> set of lower names
+        self.nodes[ROOT.abspath.lower()] = ["root", True, 0, self.clock]
+        self.children[ROOT.abspath.lower()] = set()
+        self.listed = list()  # abspath of every scandir call
+        self.n_open = 0  # number of directory handles not closed yet
+        self.broken = dict()  # abspath -> number of entries listed before an error
+        self.symlinks = set()  # lower abspath
+        self._lock = threading.Lock()
+
+    def tick(self) -> datetime:
+        self.clock += timedelta(seconds=1)
+        return self.clock
+
+    def add(
+        self,
+        relpath: str,
+        is_dir: bool = False,
+        size: int = 0,
+        symlink: bool = False,
+    ):
+        parent, _, name = (ROOT.abspath + "\\" + relpath).rpartition("\\")
+        key = f"{parent}\\{name}".lower()
+        self.nodes[key] = [name, is_dir, size, self.tick()]
+        if symlink:
+            self.symlinks.add(key)
+        elif is_dir:
+            self.children[key] = set()
+        self.children[parent.lower()].add(name.lower())
+        self.nodes[parent.lower()][3] = self.clock
+
+    def delete(self, relpath: str):
+        self._delete(ROOT.abspath + "\\" + relpath)
+
+    def _delete(self, path: str):
+        parent, _, name = path.rpartition("\\")
+        key = path.lower()
+        with self._lock:
+            for k in [k for k in self.nodes if k == key or k.startswith(key + "\\")]:
+                del self.nodes[k]
+                self.children.pop(k, None)
+                self.symlinks.discard(k)
+            self.children[parent.lower()].discard(name.lower())
+            self.nodes[parent.lower()][3] = self.tick()
+
+    def modify(self, relpath: str, size: int):
+        node = self.nodes[(ROOT.abspath + "\\" + relpath).lower()]
+        node[2] = size
+        node[3] = self.tick()
+
+    def stat(self, path: str, **kwargs):
+        try:
+            _, is_dir, size, mtime = self.nodes[path.lower()]
+        except KeyError:
+            raise FileNotFoundError(path)
+        ns = int(mtime.timestamp()) * 1000000000
+        return smbclient.SMBStatResult(
+            0o40777 if is_dir else 0o100666, 0, 0, 1, 0, 0, size,
+            ns / 1e9, ns / 1e9, ns / 1e9, ns / 1e9, ns, ns, ns, ns,
+            0x10 if is_dir else 0x20, 0,
+        )
+
+    def isdir(self, path: str, **kwargs) -> bool:
+        return path.lower() in self.children
+
+    def scandir(self, path: str, **kwargs):
+        with self._lock:
+            self.listed.append(path)
+            self.n_open += 1
+        try:
+            if path.lower() not in self.children:
+                raise FileNotFoundError(path)
+            for ind, name in enumerate(sorted(self.children[path.lower()])):
+                if self.broken.get(path) == ind:
+                    raise PermissionError(path)
+                key = f"{path}\\{name}".lower()
+                yield DirEntry(path, *self.nodes[key], is_symlink=key in self.symlinks)
+        finally:
+            with self._lock:
+                self.n_open -= 1
+
+    def remove(self, path: str, **kwargs):
+        node = self.nodes.get(path.lower())
+        if node is None or node[1]:
+            raise FileNotFoundError(path)
+        self._delete(path)
+
+    def rmdir(self, path: str, **kwargs):
+        if self.children.get(path.lower(), True):
+            raise OSError(path)
+        self._delete(path)
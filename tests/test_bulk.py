@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from fsxpathlib.bulk import rmtree, remove_many, purge, move_many
+from fsxpathlib.path import FsxPath, FsxPathIterProxy
+
+from fakes import LocalPath, make_tree
+
+
+def test_rmtree(tmp_path):
+    root = tmp_path / "root"
+    make_tree(root, empty=True)
+    progress = list()
+    result = rmtree(LocalPath(str(root)), workers=4, on_progress=progress.append)
+    assert result.ok
+    assert result.n_files == 5 * (1 + 3 + 9)
+    assert result.n_dirs == 1 + 3 + 9 + 13
+    assert len(progress) == result.n_done
+    assert root.exists() is False
+
+
+def test_rmtree_with_error(tmp_path):
+    root = tmp_path / "root"
+    make_tree(root, depth=2, empty=True)
+    (root / "dir1" / "locked.txt").write_text("locked")
+    result = rmtree(LocalPath(str(root)), workers=4)
+    assert len(result.errors) == 1
+    assert result.errors[0][0].abspath.endswith("locked.txt")
+    # only the ancestors of the failed file are left
+    assert sorted(os.listdir(root)) == ["dir1"]
+    assert os.listdir(root / "dir1") == ["locked.txt"]
+
+
+def test_remove_many(tmp_path):
+    make_tree(tmp_path / "root", depth=2, empty=True)
+    paths = [
+        LocalPath(str(tmp_path / "root" / "0.txt")),
+        LocalPath(str(tmp_path / "root" / "1.txt")),
+        LocalPath(str(tmp_path / "root" / "dir0")),
+    ]
+    result = remove_many(paths, workers=2)
+    assert (result.n_files, result.n_dirs) == (7, 2)
+    assert sorted(os.listdir(tmp_path / "root")) == [
+        "2.txt", "3.txt", "4.txt", "dir1", "dir2", "empty",
+    ]
+    assert remove_many([]).n_done == 0
+
+
+def test_remove_all(tmp_path):
+    make_tree(tmp_path, depth=2, empty=True)
+    proxy = FsxPathIterProxy(
+        LocalPath(str(p)) for p in tmp_path.iterdir() if p.name != "0.txt"
+    )
+    result = proxy.remove_all(workers=2)
+    assert result.ok
+    assert os.listdir(tmp_path) == ["0.txt"]
+
+
+def test_purge(tmp_path):
+    now = datetime.now().timestamp()
+    for name, size, days in [
+        ("old.log", 100, 40),
+        ("old-small.LOG", 10, 40),
+        ("new.log", 100, 1),
+        ("old.txt", 100, 40),
+    ]:
+        p = tmp_path / name
+        p.write_bytes(b"x" * size)
+        mtime = now - days * 86400
+        os.utime(p, (mtime, mtime))
+
+    def paths():
+        return [LocalPath(str(p)) for p in tmp_path.iterdir()]
+
+    result = purge(paths(), older_than=timedelta(days=30), pattern="*.log")
+    assert result.dry_run is True
+    assert sorted(p.basename for p in result.matched) == ["old-small.LOG", "old.log"]
+    assert (result.n_files, result.n_bytes) == (2, 110)
+    assert len(list(tmp_path.iterdir())) == 4
+
+    result = purge(
+        paths(),
+        older_than=datetime.fromtimestamp(now - 30 * 86400),
+        larger_than=50,
+        dry_run=False,
+        workers=2,
+    )
+    assert (result.n_files, result.n_bytes) == (2, 200)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new.log", "old-small.LOG"]
+
+    with pytest.raises(TypeError):
+        purge(paths(), older_than=30)
+
+
+def test_move_many(tmp_path):
+    make_tree(tmp_path / "src", depth=2, empty=True)
+    (tmp_path / "dst").mkdir()
+    (tmp_path / "dst" / "0.txt").write_text("exists")
+    pairs = [
+        (LocalPath(str(tmp_path / "src" / name)), LocalPath(str(tmp_path / "dst" / name)))
+        for name in ["0.txt", "1.txt", "2.txt", "dir0"]
+    ]
+    result = move_many(pairs, workers=2)
+    assert (result.n_files, result.n_dirs, result.n_bytes) == (2, 1, 10)
+    assert len(result.errors) == 1
+    assert isinstance(result.errors[0][1], FileExistsError)
+    assert sorted(os.listdir(tmp_path / "dst")) == ["0.txt", "1.txt", "2.txt", "dir0"]
+
+    result = move_many(pairs[:1], overwrite=True)
+    assert result.ok
+    assert (tmp_path / "dst" / "0.txt").read_text() == "hello"
+
+
+def test_fsx_path_purge(share):
+    share.add("old.log", size=100)
+    share.add("old.txt", size=100)
+    share.add("folder", is_dir=True)
+    share.add(r"folder\old.log", size=10)
+    cutoff = share.tick()
+    share.add("new.log", size=100)
+    root = FsxPath("server", "share", "root")
+
+    result = root.purge(older_than=cutoff, pattern="*.log")
+    assert sorted(p.basename for p in result.matched) == ["old.log", "old.log"]
+    assert (result.n_files, result.n_bytes) == (2, 110)
+    assert len(share.nodes) == 6
+
+    result = root.purge(older_than=cutoff, recursive=False, dry_run=False)
+    assert (result.n_files, result.n_bytes) == (2, 200)
+    assert sorted(p.basename for p in root.select_file()) == ["new.log", "old.log"]
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
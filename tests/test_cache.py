@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+from fsxpathlib.cache import DiskCache
+
+from fakes import LocalFile
+
+
+class TestDiskCache:
+    def test_read(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache", max_size=250)
+        src = tmp_path / "a.txt"
+        src.write_bytes(b"a" * 100)
+        fpath = LocalFile(str(src))
+
+        # miss
+        with cache.open(fpath, "rb") as f:
+            assert f.read() == b"a" * 100
+        assert fpath.n_open == 1
+
+        # hit, only one stat
+        n_stat = fpath.n_stat
+        with cache.open(fpath, "r", encoding="utf-8") as f:
+            assert f.read() == "a" * 100
+        assert fpath.n_open == 1
+        assert fpath.n_stat == n_stat + 1
+
+        # the file is modified
+        src.write_bytes(b"b" * 120)
+        os.utime(src, ns=(0, 10 ** 18))
+        with cache.open(fpath) as f:
+            assert f.read() == b"b" * 120
+        assert fpath.n_open == 2
+
+        with pytest.raises(ValueError):
+            cache.open(fpath, "wb")
+
+    def test_evict(self, tmp_path):
+        cache = DiskCache(tmp_path / "cache", max_size=250)
+        fpaths = list()
+        for ind in range(3):
+            src = tmp_path / f"{ind}.txt"
+            src.write_bytes(str(ind).encode("utf-8") * 100)
+            fpaths.append(LocalFile(str(src)))
+
+        path0 = cache.get(fpaths[0])
+        os.utime(path0, (0, 0))  # make it the least recently used
+        cache.get(fpaths[1])
+        cache.get(fpaths[2])
+        assert cache.total_size() == 200
+        assert os.path.exists(path0) is False
+
+        # larger than max_size, read from the source directly
+        src = tmp_path / "large.txt"
+        src.write_bytes(b"x" * 300)
+        with cache.open(LocalFile(str(src))) as f:
+            assert f.read() == b"x" * 300
+        assert cache.total_size() == 200
+        with pytest.raises(ValueError):
+            cache.get(LocalFile(str(src)))
+        assert cache.total_size() == 200
+        assert os.path.exists(cache.get(fpaths[2]))
+
+        cache.clear()
+        assert cache.total_size() == 0
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from pathlib_mate import Path
+from fsxpathlib.dedup import find_duplicates
+
+
+def test_find_duplicates(tmp_path):
+    dir_root = Path(str(tmp_path))
+    Path(dir_root, "a.txt").write_text("hello world")
+    Path(dir_root, "b.txt").write_text("hello world")
+    Path(dir_root, "c.txt").write_text("hello alice")  # same size, different content
+    Path(dir_root, "d.bin").write_bytes(b"x" * 1000 + b"1")
+    Path(dir_root, "e.bin").write_bytes(b"x" * 1000 + b"1")
+    Path(dir_root, "f.bin").write_bytes(b"x" * 1000 + b"2")  # same leading bytes
+    Path(dir_root, "g.txt").write_text("")
+    Path(dir_root, "h.txt").write_text("")
+
+    groups = find_duplicates(dir_root.select_file(), nbytes=16, workers=2)
+    assert len(groups) == 2
+    assert groups[0].size == 1001
+    assert groups[0].reclaimable_bytes == 1001
+    assert sorted(p.basename for p in groups[0].paths) == ["d.bin", "e.bin"]
+    assert sorted(p.basename for p in groups[1].paths) == ["a.txt", "b.txt"]
+
+    groups = find_duplicates(dir_root.select_file(), min_size=0)
+    assert len(groups) == 3
+
+    with pytest.raises(ValueError):
+        find_duplicates(dir_root.select_file(), nbytes=0)
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+from pathlib_mate import Path
+
+from fsxpathlib.diff import (
+    iter_local_tree, diff_trees, prefetch,
+    ADDED, REMOVED, CHANGED, SAME,
+)
+
+from fsxpathlib.path import FsxPath
+
+from fakes import write_files
+
+
+def test_diff_trees(tmp_path):
+    left = Path(tmp_path, "left")
+    right = Path(tmp_path, "right")
+    write_files(left, {
+        "a.txt": "a",
+        "b/c.txt": "c",
+        "b/d.txt": "d",
+        "e/f.txt": "f",
+        "same.txt": "same",
+        "x": "file in left",
+    })
+    write_files(right, {
+        "a.txt": "aa",
+        "b/C.TXT": "c",
+        "b/new.txt": "new",
+        "same.txt": "same",
+        "x/y.txt": "dir in right",
+    })
+
+    entries = list(diff_trees(iter_local_tree(left), iter_local_tree(right)))
+    assert [(e.status, e.relpath) for e in entries] == [
+        (CHANGED, "a.txt"),
+        (SAME, "b"),
+        (SAME, r"b\c.txt"),
+        (REMOVED, r"b\d.txt"),
+        (ADDED, r"b\new.txt"),
+        (REMOVED, "e"),
+        (REMOVED, r"e\f.txt"),
+        (SAME, "same.txt"),
+        (CHANGED, "x"),
+        (ADDED, r"x\y.txt"),
+    ]
+    assert entries[0].left.path.read_text() == "a"
+    assert entries[0].right.path.read_text() == "aa"
+
+    entries = list(diff_trees(
+        iter_local_tree(left), iter_local_tree(right), include_same=False,
+    ))
+    assert SAME not in {e.status for e in entries}
+
+    # mtime only differences
+    os.utime(Path(right, "same.txt"), ns=(1700000000 * 10 ** 9, 1700000000 * 10 ** 9))
+    statuses = {
+        e.relpath: e.status
+        for e in diff_trees(iter_local_tree(left), iter_local_tree(right))
+    }
+    assert statuses["same.txt"] == CHANGED
+    statuses = {
+        e.relpath: e.status
+        for e in diff_trees(iter_local_tree(left), iter_local_tree(right), use_mtime=False)
+    }
+    assert statuses["same.txt"] == SAME
+
+
+def test_prefetch():
+    assert list(prefetch(range(100), size=3)) == list(range(100))
+
+    def fail():
+        yield 1
+        raise ValueError("boom")
+
+    it = prefetch(fail(), size=3)
+    assert next(it) == 1
+    with pytest.raises(ValueError):
+        next(it)
+
+    it = prefetch(iter(range(1000000)), size=3)
+    assert next(it) == 0
+    it.close()  # the producer thread stops
+
+
+def test_fsx_path_diff(share, tmp_path):
+    share.add("left", is_dir=True)
+    share.add(r"left\a.txt", size=1)
+    share.add(r"left\b", is_dir=True)
+    share.add(r"left\b\c.txt", size=1)
+    share.add("right", is_dir=True)
+    share.add(r"right\a.txt", size=2)
+    share.add(r"right\b", is_dir=True)
+    share.add(r"right\b\c.txt", size=1)
+    share.add(r"right\d.txt", size=1)
+    left = FsxPath("server", "share", "root", "left")
+
+    entries = list(left.diff(
+        FsxPath("server", "share", "root", "right"), use_mtime=False, include_same=False,
+    ))
+    assert [(e.status, e.relpath) for e in entries] == [(CHANGED, "a.txt"), (ADDED, "d.txt")]
+    assert entries[0].left.path.abspath == left.abspath + r"\a.txt"
+    assert entries[0].right.size == 2
+
+    # the modification time on the share is 2023, the local files are older
+    write_files(tmp_path, {"a.txt": "a", "b/c.txt": "c", "x.txt": "x"})
+    entries = list(left.diff(tmp_path))
+    assert [(e.status, e.relpath) for e in entries] == [
+        (CHANGED, "a.txt"), (SAME, "b"), (CHANGED, r"b\c.txt"), (ADDED, "x.txt"),
+    ]
+    assert {e.status for e in left.diff(tmp_path, use_mtime=False)} == {SAME, ADDED}
+
+
+if __name__ == "__main__":
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from fsxpathlib.path import FsxPath
+from fsxpathlib.export import (
+    iter_batches, to_numpy, to_arrow, to_parquet, COLUMNS,
+)
+
+root = FsxPath("server", "share", "root")
+
+
+@pytest.fixture
+def share(share):
+    share.add("a", is_dir=True)
+    share.add("x.txt", size=10)
+    share.add(r"a\b", is_dir=True)
+    share.add(r"a\y.txt", size=20)
+    share.add(r"a\b\z.txt", size=30)
+    return share
+
+
+def test_iter_batches(share):
+    batches = list(iter_batches(root, batch_size=2))
+    assert [len(batch["path"]) for batch in batches] == [2, 2, 1]
+    rows = [
+        dict(zip(COLUMNS, values))
+        for batch in batches
+        for values in zip(*[batch[column] for column in COLUMNS])
+    ]
+    assert [row["path"] for row in rows] == [
+        r"server\share\root\a",
+        r"server\share\root\x.txt",
+        r"server\share\root\a\b",
+        r"server\share\root\a\y.txt",
+        r"server\share\root\a\b\z.txt",
+    ]
+    assert [row["depth"] for row in rows] == [1, 1, 2, 2, 3]
+    assert rows[4]["parent"] == r"server\share\root\a\b"
+    assert rows[4]["size"] == 30
+    assert rows[0]["is_dir"] is True
+    assert rows[0]["mtime_ns"] == 1672531204 * 1000000000  # last entry added
+
+    assert len(list(iter_batches(root, recursive=False))[0]["path"]) == 2
+
+    with pytest.raises(ValueError):
+        list(iter_batches(root, batch_size=0))
+
+
+def test_to_numpy(share):
+    np = pytest.importorskip("numpy")
+    arr = to_numpy(root, batch_size=2)
+    assert len(arr) == 5
+    assert arr["size"][~arr["is_dir"]].sum() == 60
+    assert arr["depth"].max() == 3
+
+
+def test_to_arrow_and_parquet(share, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = to_arrow(root, batch_size=2)
+    assert table.num_rows == 5
+    assert table.column_names == list(COLUMNS)
+
+    path = tmp_path / "listing.parquet"
+    assert to_parquet(root, path, batch_size=2) == 5
+    assert pq.read_table(path).equals(table)
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
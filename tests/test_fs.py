@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+import smbclient
+import smbclient.shutil
+
+from fsxpathlib.fs import LRUBlockCache, FsxFileSystem, _resolve_range
+
+
+class Fetcher:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.calls = list()
+
+    def __call__(self, start: int, end: int) -> bytes:
+        self.calls.append((start, end))
+        return self.data[start:end]
+
+
+class TestLRUBlockCache:
+    def test_fetch(self):
+        data = bytes(range(256)) * 4
+        fetcher = Fetcher(data)
+        cache = LRUBlockCache(100, fetcher, len(data), max_blocks=4, read_ahead=2)
+
+        # miss, block 0 and 2 read ahead blocks are fetched in one call
+        assert cache._fetch(10, 20) == data[10:20]
+        assert fetcher.calls == [(0, 300)]
+
+        # hit
+        assert cache._fetch(150, 250) == data[150:250]
+        assert len(fetcher.calls) == 1
+        assert (cache.hit_count, cache.miss_count) == (1, 1)
+
+        # cross the end of the file
+        assert cache._fetch(1000, 2000) == data[1000:]
+        assert fetcher.calls[-1] == (1000, 1024)
+        assert cache._fetch(2000, 3000) == b""
+        assert cache._fetch(None, None) == data
+
+        # least recently used blocks are evicted
+        assert len(cache._blocks) == 4
+        assert list(cache._blocks) == [7, 8, 9, 10]
+
+    def test_request_larger_than_cache(self):
+        data = bytes(range(256)) * 4
+        cache = LRUBlockCache(100, Fetcher(data), len(data), max_blocks=2, read_ahead=0)
+        assert cache._fetch(50, 950) == data[50:950]
+        assert len(cache._blocks) == 2
+
+    def test_bad_args(self):
+        with pytest.raises(ValueError):
+            LRUBlockCache(100, Fetcher(b""), 0, max_blocks=0)
+
+
+def test_resolve_range():
+    def get_size():
+        return 100
+
+    assert _resolve_range(10, 20, None) == (10, 10)
+    assert _resolve_range(None, 20, None) == (0, 20)
+    assert _resolve_range(-10, None, get_size) == (90, 10)
+    assert _resolve_range(10, -10, get_size) == (10, 80)
+    assert _resolve_range(50, 10, None) == (50, 0)
+
+
+def test_path_conversion():
+    fs = FsxFileSystem()
+    fpath = fs._to_fsxpath("fsx://server/share/folder/file.txt")
+    assert fpath.parts == ("server", "share", "folder", "file.txt")
+    assert fs._to_path(fpath) == "server/share/folder/file.txt"
+    assert fs._strip_protocol("\\\\server\\share\\file.txt") == "server/share/file.txt"
+    assert fs._strip_protocol(fpath) == "server/share/folder/file.txt"
+
+
+def test_cp_file(monkeypatch):
+    calls = list()
+
+    def copyfile(src, dst, **kwargs):
+        calls.append((src, dst))
+
+    monkeypatch.setattr(smbclient, "copyfile", copyfile)
+    monkeypatch.setattr(smbclient.shutil, "copyfile", copyfile)
+    fs = FsxFileSystem()
+    fs.cp_file("fsx://server/share/a.txt", "server/share/folder/b.txt")
+    # both paths are remote UNC paths, so the copy is done server side
+    assert calls == [
+        ("\\\\server\\share\\a.txt", "\\\\server\\share\\folder\\b.txt"),
+    ]
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
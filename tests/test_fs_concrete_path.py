@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from fsxpathlib.path import FsxPath
+from fsxpathlib.fs import FsxFileSystem
+from fsxpathlib.tests import fsx_client, FsxPathBaseTest, fpath_prefix
+
+
+class TestFsxFileSystem(FsxPathBaseTest):
+    def test(self):
+        fs = FsxFileSystem(block_size=100, cache_blocks=4, read_ahead=2)
+        fpath_dir = FsxPath(fpath_prefix, "fsspec")
+        fpath_dir.remove_if_exists()
+        root = fs._to_path(fpath_dir)
+        b = bytes(range(256)) * 4
+
+        fs.makedirs(f"{root}/folder", exist_ok=True)
+        with fs.open(f"fsx://{root}/folder/file.dat", "wb") as f:
+            f.write(b)
+
+        assert fs.isdir(root)
+        assert fs.isfile(f"{root}/folder/file.dat")
+        assert fs.ls(root, detail=False) == [f"{root}/folder"]
+        assert fs.info(f"{root}/folder/file.dat")["size"] == len(b)
+
+        with fs.open(f"{root}/folder/file.dat", "rb") as f:
+            f.seek(900)
+            assert f.read(50) == b[900:950]
+            f.seek(10)
+            assert f.read(20) == b[10:30]
+
+        assert fs.cat_file(f"{root}/folder/file.dat") == b
+        assert fs.cat_file(f"{root}/folder/file.dat", start=-10) == b[-10:]
+        assert fs.cat_ranges(
+            [f"{root}/folder/file.dat"] * 2, [0, 500], [10, 600],
+        ) == [b[:10], b[500:600]]
+
+        fs.cp_file(f"{root}/folder/file.dat", f"{root}/folder/copy.dat")
+        assert fs.cat_file(f"{root}/folder/copy.dat") == b
+
+        fs.rm(root, recursive=True)
+        assert fs.exists(root) is False
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 
 import pytest
+import hashlib
 from pathlib import Path
-from fsxpathlib.hashes import get_hash
+from fsxpathlib.hashes import get_hash, get_merkle_hash, MerkleHash
 
 
 def test_get_hash():
@@ -17,6 +18,43 @@ def test_get_hash():
         get_hash(p, chunk_size=0)
 
 
+def test_get_merkle_hash(tmp_path):
+    p = Path(__file__)
+    data = p.read_bytes()
+
+    # single block merkle hash is the same as regular hash
+    mh = get_merkle_hash(p, block_size=len(data))
+    assert mh.root == get_hash(p)
+    assert mh.size == len(data)
+
+    mh = get_merkle_hash(p, block_size=100, chunk_size=7, workers=4)
+    assert len(mh.block_hashes) == (len(data) + 99) // 100
+    for ind, block_hash in enumerate(mh.block_hashes):
+        offset, length = mh.block_range(ind)
+        assert hashlib.md5(data[offset:offset + length]).hexdigest() == block_hash
+    assert mh == get_merkle_hash(p, block_size=100, workers=1)
+    assert MerkleHash.from_dict(mh.to_dict()) == mh
+    assert mh != mh.to_dict()
+    assert mh.__eq__(None) is NotImplemented
+
+    # locate changed blocks
+    p_new = tmp_path / "new.py"
+    p_new.write_bytes(data[:250] + b"#" + data[251:] + b"appended")
+    mh_new = get_merkle_hash(p_new, block_size=100)
+    assert mh_new.root != mh.root
+    diff = mh_new.diff(mh)
+    assert diff[0] == 2
+    assert diff[-1] == len(mh_new.block_hashes) - 1
+
+    with pytest.raises(ValueError):
+        mh.diff(get_merkle_hash(p, block_size=200))
+
+    # empty file
+    p_empty = tmp_path / "empty.txt"
+    p_empty.write_bytes(b"")
+    assert get_merkle_hash(p_empty).root == get_hash(p_empty)
+
+
 if __name__ == "__main__":
     import os
 
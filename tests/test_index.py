@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+
+import pytest
+
+from fsxpathlib.path import FsxPath
+from fsxpathlib.index import MetadataIndex
+
+root = FsxPath("server", "share", "root")
+
+
+@pytest.fixture
+def share(share):
+    share.add("logs", is_dir=True)
+    share.add(r"logs\2023", is_dir=True)
+    share.add(r"logs\2023\jan.log", size=3000)
+    share.add(r"logs\app.LOG", size=5000)
+    share.add("data", is_dir=True)
+    share.add(r"data\a.csv", size=100)
+    share.add("README.md", size=10)
+    return share
+
+
+def relpaths(paths) -> list:
+    return [str(p.relative_to(root)) for p in paths]
+
+
+def test_refresh_and_query(share, tmp_path):
+    with MetadataIndex(root, tmp_path / "index.sqlite", workers=4) as index:
+        result = index.refresh()
+        assert result.n_dirs_listed == 4
+        assert index.count() == 7
+        assert index.total_size() == 8110
+        assert index.total_size(prefix="logs") == 8000
+
+        files = index.query_file().all()
+        assert relpaths(files) == [
+            r"data\a.csv", r"logs\2023\jan.log", r"logs\app.LOG", "README.md",
+        ]
+        assert files[1].size == 3000  # stat from the snapshot
+        assert relpaths(index.query(exts=[".log"])) == [r"logs\2023\jan.log", r"logs\app.LOG"]
+        assert relpaths(index.query(min_size=1000)) == [r"logs\2023\jan.log", r"logs\app.LOG"]
+        assert relpaths(index.query_dir()) == ["data", "logs", r"logs\2023"]
+        assert relpaths(index.query(prefix="LOGS", recursive=False)) == [r"logs\2023", r"logs\app.LOG"]
+        assert relpaths(index.query(recursive=False)) == ["data", "logs", "README.md"]
+        assert len(index.query(newer_than=datetime(2022, 1, 1)).all()) == 7
+        assert len(index.query(older_than=datetime(2022, 1, 1)).all()) == 0
+
+        # nothing changed, no directory is listed again
+        n_scandir = len(share.listed)
+        result = index.refresh()
+        assert result.n_dirs_listed == 0
+        assert result.n_dirs_unchanged == 4
+        assert len(share.listed) == n_scandir
+
+        # only the changed directories are listed again
+        share.add(r"logs\2023\feb.log", size=1000)
+        share.delete("data")
+        result = index.refresh()
+        assert result.n_dirs_listed == 2  # root and logs\2023
+        assert relpaths(index.query_file()) == [
+            r"logs\2023\feb.log", r"logs\2023\jan.log", r"logs\app.LOG", "README.md",
+        ]
+        assert relpaths(index.query_dir()) == ["logs", r"logs\2023"]
+
+        # modified in place, only picked up by a full refresh
+        share.modify("README.md", size=20)
+        index.refresh()
+        assert index.total_size() == 9010
+        result = index.refresh(full=True)
+        assert result.n_dirs_listed == 3
+        assert index.total_size() == 9020
+
+    with pytest.raises(ValueError):
+        MetadataIndex(FsxPath("server", "share", "other"), tmp_path / "index.sqlite")
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+import pytest
+from fsxpathlib.vendors.iterproxy import IterProxy
+
+
+class Item:
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+        self.ext = name.rsplit(".", 1)[-1]
+
+
+items = [
+    Item("a.txt", 30),
+    Item("b.csv", 10),
+    Item("c.txt", 50),
+    Item("d.csv", 20),
+    Item("e.json", 40),
+]
+
+
+def names(items_: list) -> list:
+    return [item.name for item in items_]
+
+
+class TestIterProxy:
+    def test_top_k(self):
+        assert IterProxy(range(10)).top_k(lambda i: i % 7, 3) == [6, 5, 4]
+        assert names(IterProxy(items).top_k("size", 2)) == ["c.txt", "e.json"]
+        assert names(IterProxy(items).bottom_k("size", 2)) == ["b.csv", "d.csv"]
+        assert IterProxy(items).top_k("size", 0) == []
+        assert len(IterProxy(items).top_k("size", 100)) == 5
+
+        proxy = IterProxy(items).filter(lambda item: item.ext == "csv")
+        assert names(proxy.top_k("size", 1)) == ["d.csv"]
+
+        # works on a one shot generator without loading everything
+        assert IterProxy(i for i in range(1000000)).top_k(lambda i: -i, 2) == [0, 1]
+
+        with pytest.raises(ValueError):
+            IterProxy(items).top_k("size", -1)
+
+    def test_sort_by(self):
+        assert names(IterProxy(items).sort_by("size")) == [
+            "b.csv", "d.csv", "a.txt", "e.json", "c.txt",
+        ]
+        assert names(IterProxy(items).sort_by("size", reverse=True, limit=2)) == [
+            "c.txt", "e.json",
+        ]
+        assert names(IterProxy(items).sort_by("name", limit=2)) == ["a.txt", "b.csv"]
+
+    def test_group_by(self):
+        groups = IterProxy(range(10)).group_by(lambda i: i % 2, lambda i: i)
+        assert (groups[0].count, groups[0].sum, groups[0].min, groups[0].max) == (5, 20, 0, 8)
+
+        groups = IterProxy(items).group_by("ext", "size")
+        assert {ext: (agg.count, agg.sum) for ext, agg in groups.items()} == {
+            "txt": (2, 80), "csv": (2, 30), "json": (1, 40),
+        }
+
+        groups = IterProxy(items).group_by("ext")
+        assert groups["txt"].count == 2
+        assert groups["txt"].sum is None
+
+    def test_batch(self):
+        assert IterProxy(range(5)).batch(2).all() == [[0, 1], [2, 3], [4]]
+        assert IterProxy([]).batch(2).all() == []
+        proxy = IterProxy(range(10)).filter(lambda i: i % 2)
+        assert proxy.batch(3).one() == [1, 3, 5]
+        with pytest.raises(ValueError):
+            IterProxy(range(5)).batch(0)
+
+    def test_map(self):
+        def square(i: int) -> int:
+            time.sleep(0.001 * (i % 3))
+            return i * i
+
+        expected = [i * i for i in range(50)]
+        assert IterProxy(range(50)).map(square).all() == expected
+        assert IterProxy(range(50)).map(square, workers=4, ordered=True).all() == expected
+        assert sorted(IterProxy(range(50)).map(square, workers=4).all()) == expected
+
+        # backpressure: the source doesn't run ahead of the consumer
+        pulled = list()
+
+        def source():
+            for i in range(1000):
+                pulled.append(i)
+                yield i
+
+        proxy = IterProxy(source()).map(square, workers=2, max_pending=3)
+        assert len(proxy.many(5)) == 5
+        assert len(pulled) <= 5 + 3 + 1
+
+        def fail(i: int) -> int:
+            if i == 3:
+                raise ValueError(i)
+            return i
+
+        with pytest.raises(ValueError):
+            IterProxy(range(10)).map(fail, workers=4, ordered=True).all()
+
+        with pytest.raises(ValueError):
+            IterProxy(range(10)).map(fail, workers=0)
+
+    def test_for_each(self):
+        seen = set()
+        lock = threading.Lock()
+
+        def add(i: int):
+            with lock:
+                seen.add(i)
+
+        assert IterProxy(range(100)).for_each(add, workers=8) == 100
+        assert seen == set(range(100))
+
+    def test_close(self):
+        closed = list()
+
+        def gen():
+            try:
+                yield from range(10)
+            finally:
+                closed.append(True)
+
+        with IterProxy(gen()) as proxy:
+            assert proxy.many(3) == [0, 1, 2]
+            assert closed == []
+        assert closed == [True]
+        assert proxy.one_or_none() is None
+
+        proxy = IterProxy(range(10))
+        proxy.close()
+        assert proxy.all() == []
+
+        closed.clear()
+        with IterProxy(gen()).batch(2) as proxy:
+            assert proxy.one() == [0, 1]
+        assert closed == [True]
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
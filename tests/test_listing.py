@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fsxpathlib.path import FsxPath
+from fsxpathlib.listing import Listing, KIND_FILE, KIND_DIR
+
+root = FsxPath("server", "share", "data")
+now_ns = int(datetime.now().timestamp() * 1000000000)
+day_ns = 86400 * 1000000000
+
+
+def make_listing() -> Listing:
+    listing = Listing(root=root)
+    t = listing._table
+    d1 = t.append(-1, "logs", KIND_DIR, 0, now_ns, 0x10)
+    t.append(-1, "README.md", KIND_FILE, 100, now_ns - 10 * day_ns, 0x20)
+    d2 = t.append(d1, "2023", KIND_DIR, 0, now_ns, 0x10)
+    t.append(d1, "app.log", KIND_FILE, 5000, now_ns - 2 * day_ns, 0x20)
+    t.append(d2, "jan.log", KIND_FILE, 3000, now_ns - 30 * day_ns, 0x20)
+    t.append(d2, "Feb.LOG", KIND_FILE, 1000, now_ns - 20 * day_ns, 0x20)
+    return listing
+
+
+class TestListing:
+    def test_access(self):
+        listing = make_listing()
+        assert len(listing) == 6
+        assert listing.name(4) == "jan.log"
+        assert listing.relpath(4) == r"logs\2023\jan.log"
+        assert listing.abspath(4) == r"server\share\data\logs\2023\jan.log"
+        assert listing.size(4) == 3000
+        assert listing.is_dir(0) and (not listing.is_file(0))
+        assert listing.is_file(-1)
+
+        p = listing[4]
+        assert isinstance(p, FsxPath)
+        assert p == FsxPath(root, "logs", "2023", "jan.log")
+        assert str(p) == listing.abspath(4)
+        assert [str(p) for p in listing] == [listing.abspath(i) for i in range(6)]
+
+        with pytest.raises(IndexError):
+            listing[6]
+
+        assert listing.total_size() == 9100
+        assert listing.nbytes() < 500
+
+    def test_filter_and_sort(self):
+        listing = make_listing()
+
+        files = listing.files()
+        assert len(files) == 4
+        assert len(listing.dirs()) == 2
+        assert files.total_size() == 9100
+
+        logs = listing.filter(pattern="*.log")
+        assert [logs.name(i) for i in range(len(logs))] == ["app.log", "jan.log", "Feb.LOG"]
+
+        old = listing.filter(include_dirs=False, older_than=timedelta(days=15))
+        assert {old.name(i) for i in range(len(old))} == {"jan.log", "Feb.LOG"}
+
+        big = files.filter(min_size=1000, max_size=3000)
+        assert {big.name(i) for i in range(len(big))} == {"jan.log", "Feb.LOG"}
+
+        recent = files.filter(newer_than=timedelta(days=5))
+        assert [recent.name(i) for i in range(len(recent))] == ["app.log"]
+
+        custom = files.filter(lambda lst, i: lst.size(i) > 1000)
+        assert len(custom) == 2
+
+        by_size = files.sort_by("size", reverse=True)
+        assert [by_size.size(i) for i in range(len(by_size))] == [5000, 3000, 1000, 100]
+        top = by_size[:2]
+        assert [p.basename for p in top] == ["app.log", "jan.log"]
+
+        by_path = listing.sort_by("path")
+        assert [by_path.relpath(i) for i in range(len(by_path))] == [
+            r"logs",
+            r"logs\2023",
+            r"logs\2023\Feb.LOG",
+            r"logs\2023\jan.log",
+            r"logs\app.log",
+            r"README.md",
+        ]
+
+        by_name = files.sort_by("name")
+        assert by_name.name(0) == "app.log"
+
+        with pytest.raises(ValueError):
+            listing.sort_by("owner")
+
+    def test_slice(self):
+        listing = make_listing()
+        view = listing[1:5:2]
+        # slicing doesn't copy the row numbers
+        assert isinstance(view._rows, range)
+        assert view.nbytes() == listing.nbytes()
+        assert [p.basename for p in view] == ["README.md", "app.log"]
+        assert [p.basename for p in view[::-1]] == ["app.log", "README.md"]
+        assert [p.basename for p in listing.files()[1:3]] == ["app.log", "jan.log"]
+
+    def test_sort_by_path(self):
+        rnd = random.Random(1)
+        listing = Listing(root=root)
+        t = listing._table
+        dirs = [-1]
+        for ind in range(300):
+            name = rnd.choice(["a", "B", "c", "a-b", "ab", "a.b"]) + str(ind)
+            if rnd.random() < 0.3:
+                dirs.append(t.append(rnd.choice(dirs), name, KIND_DIR, 0, 0, 0x10))
+            else:
+                t.append(rnd.choice(dirs), name, KIND_FILE, ind, 0, 0x20)
+        expected = sorted(
+            range(len(listing)),
+            key=lambda i: [name.lower() for name in listing.relpath(i).split("\\")],
+        )
+        by_path = listing.sort_by("path")
+        assert [by_path.relpath(i) for i in range(len(by_path))] == [
+            listing.relpath(i) for i in expected
+        ]
+        by_path = listing.files().sort_by("path", reverse=True)
+        assert [by_path.relpath(i) for i in range(len(by_path))] == [
+            listing.relpath(i) for i in reversed(expected) if listing.is_file(i)
+        ]
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
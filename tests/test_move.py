@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import io
+from types import SimpleNamespace
+
+import pytest
+import smbclient
+
+from fsxpathlib import bulk
+from fsxpathlib.path import FsxPath, FsxPathIterProxy
+
+
+class FakeServers:
+    """
+    Files on fake SMB servers, keyed by the lower case absolute path.
+    """
+
+    def __init__(self):
+        self.files = dict()
+        self.server_side_copies = list()
+
+    def copyfile(self, src: str, dst: str, **kwargs):
+        # the same check as smbclient.copyfile
+        if src.split("\\")[2].lower() != dst.split("\\")[2].lower():
+            raise ValueError("Cannot copy a file to a different host than the src.")
+        self.server_side_copies.append((src, dst))
+        self.files[dst[2:].lower()] = self.files[src[2:].lower()]
+
+    def rename(self, src: str, dst: str, **kwargs):
+        if src.split("\\")[2:4] != dst.split("\\")[2:4]:
+            raise ValueError("Cannot rename a file to a different root than the src.")
+        self.files[dst[2:].lower()] = self.files.pop(src[2:].lower())
+
+
+@pytest.fixture
+def servers(monkeypatch) -> FakeServers:
+    servers = FakeServers()
+    monkeypatch.setattr(smbclient, "copyfile", servers.copyfile)
+    monkeypatch.setattr(smbclient, "rename", servers.rename)
+
+    def is_file(self):
+        return self.abspath.lower() in servers.files
+
+    def read_file(self, mode="rb", **kwargs):
+        return io.BytesIO(servers.files[self.abspath.lower()])
+
+    def write_from_stream(self, f_in, size=None):
+        servers.files[self.abspath.lower()] = f_in.read()
+
+    def remove(self):
+        del servers.files[self.abspath.lower()]
+
+    monkeypatch.setattr(FsxPath, "is_file", is_file)
+    monkeypatch.setattr(FsxPath, "is_dir", lambda self: False)
+    monkeypatch.setattr(FsxPath, "exists", is_file)
+    monkeypatch.setattr(FsxPath, "_stat", lambda self: SimpleNamespace(st_size=1))
+    monkeypatch.setattr(FsxPath, "open", read_file)
+    monkeypatch.setattr(FsxPath, "_write_from_stream", write_from_stream)
+    monkeypatch.setattr(FsxPath, "remove", remove)
+    return servers
+
+
+def test_move_to(servers):
+    servers.files[r"server1\share1\a.txt"] = b"a"
+
+    # same share, server side rename
+    p = FsxPath("server1", "share1", "a.txt").move_to(FsxPath("server1", "share1", "b.txt"))
+    assert servers.files == {r"server1\share1\b.txt": b"a"}
+    assert servers.server_side_copies == []
+
+    # same server, different share, server side copy
+    p = p.move_to(FsxPath("server1", "share2", "b.txt"))
+    assert servers.files == {r"server1\share2\b.txt": b"a"}
+    assert len(servers.server_side_copies) == 1
+
+    # different server, streamed through the client
+    p = p.move_to(FsxPath("server2", "share1", "b.txt"))
+    assert servers.files == {r"server2\share1\b.txt": b"a"}
+    assert len(servers.server_side_copies) == 1
+
+
+def test_move_all_to(monkeypatch):
+    calls = list()
+
+    def move_many(pairs, **kwargs):
+        calls.append(([(src.abspath, dst.abspath) for src, dst in pairs], kwargs))
+
+    monkeypatch.setattr(bulk, "move_many", move_many)
+    proxy = FsxPathIterProxy([
+        FsxPath("server", "share", "a.txt"),
+        FsxPath("server", "share", "folder", "b.txt"),
+    ])
+    proxy.move_all_to(r"server\share\dst", workers=2)
+    assert calls == [
+        (
+            [
+                (r"server\share\a.txt", r"server\share\dst\a.txt"),
+                (r"server\share\folder\b.txt", r"server\share\dst\b.txt"),
+            ],
+            dict(overwrite=False, workers=2, on_progress=None),
+        )
+    ]
@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import os
 import pytest
+import tempfile
 import smbclient
 from datetime import datetime, timezone
+from pathlib_mate import Path
 from fsxpathlib.path import FsxPath
+from fsxpathlib.cache import DiskCache
+from fsxpathlib.bulk import remove_many, move_many
+from fsxpathlib.export import to_numpy
+from fsxpathlib.index import MetadataIndex
 from fsxpathlib.tests import fsx_client, FsxPathBaseTest, fpath_prefix
 
 
@@ -35,6 +42,59 @@ class TestFsxPathAsConcretePath(FsxPathBaseTest):
         p.write_bytes(b)
         assert p.read_bytes() == b
 
+        buffer = bytearray(4)
+        assert p.read_into(buffer, offset=2) == 4
+        assert buffer == b[2:6]
+        assert b"".join(bytes(view) for view in p.iter_read_into(buffer)) == b
+        assert [len(view) for view in p.iter_read_into(buffer, read_ahead=2)] == [4, 4, 1]
+        assert p.read_bytes(read_ahead=4) == b
+        with p.open("rb", read_ahead=4, read_ahead_chunk_size=4) as f:
+            assert f.read(5) == b[:5]
+            f.seek(1)
+            assert f.read() == b[1:]
+
+        assert p.read_range(2, 3) == b[2:5]
+        assert p.read_range(-2, 10) == b[-2:]
+        assert p.read_range(100, 10) == b""
+        assert p.read_ranges([(6, 2), (0, 2), (4, 100)]) == [b[6:8], b[0:2], b[4:]]
+        assert b"".join(p.iter_chunks(chunk_size=4)) == b
+
+        p_text = FsxPath(fsx_client.server, "share", "lines.txt")
+        p_text.write_text("α\nβ\r\n\nγ")
+        assert list(p_text.iter_lines(chunk_size=2)) == ["α\n", "β\n", "\n", "γ"]
+        assert list(p_text.iter_records("\r\n", chunk_size=2)) == ["α\nβ", "\nγ"]
+        assert list(p_text.iter_records(b"\n", read_ahead=2)) == [
+            "α".encode("utf-8"), b"\xce\xb2\r", b"", "γ".encode("utf-8"),
+        ]
+
+        p_log = FsxPath(fsx_client.server, "share", "app.log")
+        p_log.write_text("".join(f"line {i}\n" for i in range(100)))
+        assert p_log.tail(3, chunk_size=10) == ["line 97", "line 98", "line 99"]
+        assert p_log.tail(200) == [f"line {i}" for i in range(100)]
+        assert p_log.tail(0) == []
+
+        lines = p_log.follow(interval=0.1, idle_timeout=5)
+        with p_log.open("a") as f:
+            f.write("line 100\nline 1")
+        assert next(lines) == "line 100"
+        with p_log.open("a") as f:
+            f.write("01\n")
+        assert next(lines) == "line 101"
+        p_log.write_text("new\n")  # truncated
+        assert next(lines) == "new"
+        lines.close()
+
+        cache = DiskCache(tempfile.mkdtemp())
+        assert p.read_bytes(cache=cache) == b
+        assert p.read_text(cache=cache) == "BigBinary"
+        assert cache.total_size() == len(b)
+
+        p.write_bytes(b * 1000, write_behind=4)
+        assert p.read_bytes() == b * 1000
+        with p.open("wb", write_behind=4, write_behind_chunk_size=100, preallocate=1000) as f:
+            f.write(b)
+        assert p.read_bytes() == b
+
     def test_bool_test_methods(self):
         dir_prefix = FsxPath(fsx_client.server, "share", "bool_test_methods")
         path_readme = FsxPath(dir_prefix, "readme.txt")
@@ -151,6 +211,136 @@ class TestFsxPathAsConcretePath(FsxPathBaseTest):
         assert len(fpath_root.select_by_ext([".txt"]).all()) == 9
         assert len(fpath_root.select_by_ext([".jpg"]).all()) == 3
         assert len(fpath_root.select(recursive=False).all()) == 6
+        assert len(fpath_root.select(max_depth=2).all()) == 12
+        assert len(fpath_root.select_file(max_depth=2).all()) == 10
+        assert fpath_root.select_dir(topdown=False).one().basename == "subfolder"
+        with fpath_root.select_by_ext([".jpg"]) as proxy:
+            assert proxy.one().basename == "image.jpg"
+
+        largest = fpath_root.select_file().top_k("size", 3)
+        assert [p.basename for p in largest] == ["large-file.txt"] * 3
+        assert fpath_root.select_file().bottom_k("size", 1)[0].size == len("log file")
+        groups = fpath_root.select_file().group_by("ext", "size")
+        assert (groups[".txt"].count, groups[".jpg"].count, groups[".md"].count) == (9, 3, 3)
+
+        md5_list = fpath_root.select_file().map(lambda p: p.md5, workers=4).all()
+        assert len(md5_list) == 15
+        assert sum(len(b) for b in fpath_root.select_file().batch(4)) == 15
+
+        listing = fpath_root.listing()
+        assert len(listing) == 17
+        assert len(listing.files()) == 15
+        assert len(listing.filter(pattern="*.txt")) == 9
+        assert len(fpath_root.listing(recursive=False)) == 6
+        assert {str(p) for p in listing} == {str(p) for p in fpath_root.select()}
+        assert listing.files().total_size() == sum(p.size for p in fpath_root.select_file())
+
+        arr = to_numpy(fpath_root)
+        assert len(arr) == 17
+        assert arr["size"][~arr["is_dir"]].sum() == listing.files().total_size()
+
+        usages = fpath_root.disk_usage(depth=1, workers=4)
+        assert [u.fpath.basename for u in usages] == ["select", "folder"]
+        assert (usages[0].n_files, usages[0].n_dirs) == (15, 2)
+        assert (usages[1].n_files, usages[1].n_dirs) == (10, 1)
+        assert usages[0].n_bytes == listing.files().total_size()
+
+        with tempfile.TemporaryDirectory() as dir_tmp:
+            with MetadataIndex(fpath_root, os.path.join(dir_tmp, "index.sqlite")) as index:
+                assert index.refresh().n_dirs_listed == 3
+                assert index.count() == 17
+                assert len(index.query(exts=[".txt"]).all()) == 9
+                assert index.refresh().n_dirs_listed == 0
+                FsxPath(fpath_root, "folder", "new.txt").write_text("new file")
+                assert index.refresh().n_dirs_listed == 1
+                assert len(index.query(exts=[".txt"]).all()) == 10
+                FsxPath(fpath_root, "folder", "new.txt").remove()
+
+        # stat is taken from the directory listing
+        sizes = {
+            p.basename: p.size
+            for p in fpath_root.select_file(recursive=False)
+        }
+        assert sizes["log.txt"] == 8
+        assert sizes["large-file.txt"] == 11000
+
+        dup_groups = fpath_root.find_duplicates()
+        assert len(dup_groups) == 5
+        assert all(len(group.paths) == 3 for group in dup_groups)
+        assert dup_groups[0].reclaimable_bytes == 22000
+
+        result = fpath_root.purge(larger_than=100)
+        assert (result.n_files, result.n_bytes) == (3, 33000)
+        result = fpath_root.purge(pattern="LOG.*", recursive=False, dry_run=False)
+        assert (result.n_files, result.n_bytes) == (1, 8)
+
+        result = remove_many(fpath_root.select_by_ext([".jpg"]), workers=4)
+        assert result.n_files == 3
+        assert len(fpath_root.select_by_ext([".jpg"]).all()) == 0
+
+        result = fpath_root.rmtree(workers=4)
+        assert (result.n_files, result.n_dirs) == (11, 3)
+        assert fpath_root.exists() is False
+
+
+    def test_move(self):
+        fpath_root = FsxPath(fpath_prefix, "move")
+        fpath_root.remove_if_exists()
+        FsxPath(fpath_root, "folder").mkdir(parents=True)
+        p_a = FsxPath(fpath_root, "a.txt")
+        p_a.write_text("a")
+        FsxPath(fpath_root, "b.txt").write_text("b")
+        FsxPath(fpath_root, "folder", "c.txt").write_text("c")
+
+        p_a2 = p_a.rename(FsxPath(fpath_root, "a2.txt"))
+        assert p_a.exists() is False
+        assert p_a2.read_text() == "a"
+        with pytest.raises(OSError):
+            FsxPath(fpath_root, "b.txt").rename(p_a2)
+        p_a2 = FsxPath(fpath_root, "b.txt").replace(p_a2)
+        assert p_a2.read_text() == "b"
+
+        p_folder2 = FsxPath(fpath_root, "folder").move_to(FsxPath(fpath_root, "folder2"))
+        assert FsxPath(p_folder2, "c.txt").read_text() == "c"
+
+        result = move_many(
+            [
+                (p_a2, FsxPath(p_folder2, "a2.txt")),
+                (FsxPath(fpath_root, "not-exists.txt"), FsxPath(p_folder2, "x.txt")),
+            ],
+            workers=2,
+        )
+        assert (result.n_files, len(result.errors)) == (1, 1)
+        assert sorted(p.basename for p in p_folder2.select_file()) == ["a2.txt", "c.txt"]
+
+        fpath_root.rmtree()
+
+    def test_diff(self):
+        fpath_root = FsxPath(fpath_prefix, "diff")
+        fpath_root.remove_if_exists()
+        fpath_left = FsxPath(fpath_root, "left")
+        fpath_right = FsxPath(fpath_root, "right")
+        FsxPath(fpath_left, "folder").mkdir(parents=True)
+        FsxPath(fpath_left, "a.txt").write_text("a")
+        FsxPath(fpath_left, "folder", "b.txt").write_text("b")
+        fpath_left.copy_to(fpath_right)
+        FsxPath(fpath_right, "a.txt").write_text("aa")
+        FsxPath(fpath_right, "c.txt").write_text("c")
+
+        entries = list(fpath_left.diff(fpath_right, use_mtime=False))
+        assert [(e.status, e.relpath) for e in entries] == [
+            ("changed", "a.txt"),
+            ("added", "c.txt"),
+            ("same", "folder"),
+            ("same", r"folder\b.txt"),
+        ]
+
+        with tempfile.TemporaryDirectory() as dir_tmp:
+            fpath_left.copy_to(Path(dir_tmp))
+            entries = list(fpath_left.diff(Path(dir_tmp), use_mtime=False, include_same=False))
+            assert entries == []
+
+        fpath_root.rmtree()
 
 
 if __name__ == "__main__":
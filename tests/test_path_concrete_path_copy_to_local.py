@@ -48,6 +48,15 @@ class TestFsxPathCopyToLocal(FsxPathBaseTest):
 
         self.assert_fsxpath_equal_to_path(fpath_datalake, dir_datalake_dst)
 
+        # copy with parallel ranged download
+        path_log_txt_dst.remove_if_exists()
+        fpath_log_txt.copy_to(path_log_txt_dst, workers=4, range_size=100)
+        self.assert_fsxpath_equal_to_path(fpath_log_txt, path_log_txt_dst)
+
+        dir_datalake_dst.remove_if_exists()
+        fpath_datalake.copy_to(dir_datalake_dst, workers=4, range_size=100)
+        self.assert_fsxpath_equal_to_path(fpath_datalake, dir_datalake_dst)
+
 
 if __name__ == "__main__":
     import os
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import pytest
+from fsxpathlib import path as path_module
 from fsxpathlib.path import FsxPath
 
 server = "drive"
@@ -85,6 +86,50 @@ class TestFsxPathAsPurePath:
         with pytest.raises(ValueError):
             p.change(new_basename="hello.txt", new_ext="hello")
 
+    @pytest.mark.parametrize("fast", [True, False])
+    def test_make_descendant(self, monkeypatch, fast):
+        monkeypatch.setattr(path_module, "_FAST_MAKE_CHILD", fast)
+        p = FsxPath(server, "database")
+        for names in [("table",), ("table", "file.json")]:
+            p1 = p._make_descendant(*names)
+            p2 = FsxPath(p, *names)
+            assert str(p1) == str(p2)
+            assert p1.parts == p2.parts
+            assert p1 == p2
+            assert p1.parent == p2.parent
+            assert p1.basename == p2.basename
+
+        # absolute, root and relative parents, like the public constructor
+        p_table = FsxPath(server, "database", "table")
+        for parent in [
+            p_table,
+            FsxPath(server),
+            FsxPath(server, "database").relative_to(FsxPath(server, "database")),
+            p_table.relative_to(FsxPath(server, "database")),
+        ]:
+            for names in [("a",), ("a", "b.txt")]:
+                p1 = parent._make_descendant(*names)
+                p2 = FsxPath(parent, *names)
+                assert str(p1) == str(p2)
+                assert p1.parts == p2.parts
+                assert p1 == p2
+
+        for name in ["", ".", "..", "a\\b", "a/b"]:
+            with pytest.raises(ValueError):
+                p._make_descendant(name)
+
+        # the slots are set on every Python version
+        p1 = p._make_descendant("table")
+        assert p1._stat_cache is None
+        assert p1.is_absolute() is True
+        p1 = p._make_descendant("table").relative_to(p)._make_descendant("file.json")
+        assert p1.is_absolute() is False
+        assert str(p1) == r"table\file.json"
+
+        # pathlib's own ``_make_child`` is not shadowed
+        assert p / "table" == FsxPath(p, "table")
+        assert p.joinpath("table", "file.json") == FsxPath(p, "table", "file.json")
+
 
 if __name__ == "__main__":
     import os
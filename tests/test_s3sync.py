@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+
+import pytest
+from s3pathlib import S3Path
+
+from fsxpathlib import s3sync
+from fsxpathlib.diff import TreeEntry
+from fsxpathlib.path import FsxPath
+from fsxpathlib.s3sync import iter_fsx_files_s3_order, plan_s3_upload
+
+from fakes import LocalPath, write_files
+
+
+def test_iter_fsx_files_s3_order(tmp_path):
+    keys = ["a/b.txt", "a-c.txt", "a.txt", "ab/c.txt", "B.txt", "z"]
+    write_files(tmp_path, {key: key for key in keys})
+    entries = list(iter_fsx_files_s3_order(LocalPath(str(tmp_path))))
+    assert [entry.key for entry in entries] == sorted(keys)
+    assert entries[0].size == len(entries[0].key)
+
+
+def test_plan_s3_upload(tmp_path, monkeypatch):
+    write_files(tmp_path, {
+        "new.txt": "new",
+        "same.txt": "same",
+        "size.txt": "size changed",
+        "folder/modified.txt": "modified",
+    })
+    s3dir = S3Path("bucket", "backup/")
+    uploaded_at = 1700000000 * 10 ** 9
+    objects = [
+        ("deleted.txt", 1, uploaded_at),
+        ("folder/modified.txt", 8, 1500000000 * 10 ** 9),
+        ("same.txt", 4, uploaded_at),
+        ("size.txt", 4, uploaded_at),
+    ]
+
+    def iter_s3_files(s3dir_: S3Path):
+        assert s3dir_ is s3dir
+        for key, size, mtime_ns in objects:
+            yield TreeEntry(key, key, False, size, mtime_ns, S3Path(s3dir, key))
+
+    monkeypatch.setattr(s3sync, "iter_s3_files", iter_s3_files)
+
+    plan = plan_s3_upload(LocalPath(str(tmp_path)), s3dir)
+    assert [(p.basename, s3path.key) for p, s3path in plan.uploads] == [
+        ("modified.txt", "backup/folder/modified.txt"),
+        ("new.txt", "backup/new.txt"),
+        ("size.txt", "backup/size.txt"),
+    ]
+    assert plan.n_bytes == 8 + 3 + 12
+    assert [s3path.key for s3path in plan.deletes] == ["backup/deleted.txt"]
+    assert plan.n_same == 1
+
+    plan = plan_s3_upload(LocalPath(str(tmp_path)), s3dir, use_mtime=False)
+    assert len(plan.uploads) == 2
+    assert plan.n_same == 2
+
+    # the md5 of same.txt is compared, a multipart object without md5
+    # metadata is not uploaded again
+    md5 = {"same.txt": None}
+    monkeypatch.setattr(s3sync, "get_s3_md5", lambda s3path, key: md5[s3path.basename])
+    plan = plan_s3_upload(LocalPath(str(tmp_path)), s3dir, checksum=True)
+    assert plan.n_same == 1
+    md5["same.txt"] = hashlib.md5(b"same").hexdigest()
+    plan = plan_s3_upload(LocalPath(str(tmp_path)), s3dir, checksum=True)
+    assert plan.n_same == 1
+    md5["same.txt"] = hashlib.md5(b"other").hexdigest()
+    plan = plan_s3_upload(LocalPath(str(tmp_path)), s3dir, checksum=True)
+    assert plan.n_same == 0
+
+
+def test_fsx_path_plan_copy_to_s3(share, monkeypatch):
+    share.add("folder", is_dir=True)
+    share.add(r"folder\a.txt", size=10)
+    share.add("b.txt", size=20)
+    share.add("c.txt", size=30)
+    s3dir = S3Path("bucket", "backup/")
+    uploaded_at = int(share.tick().timestamp()) * 10 ** 9
+    objects = [
+        ("b.txt", 20, uploaded_at),
+        ("c.txt", 3, uploaded_at),
+        ("d.txt", 1, uploaded_at),
+    ]
+
+    def iter_s3_files(s3dir_: S3Path):
+        for key, size, mtime_ns in objects:
+            yield TreeEntry(key, key, False, size, mtime_ns, S3Path(s3dir_, key))
+
+    monkeypatch.setattr(s3sync, "iter_s3_files", iter_s3_files)
+
+    plan = FsxPath("server", "share", "root").plan_copy_to_s3(s3dir)
+    assert [(p.abspath, s3path.key) for p, s3path in plan.uploads] == [
+        (r"server\share\root\c.txt", "backup/c.txt"),
+        (r"server\share\root\folder\a.txt", "backup/folder/a.txt"),
+    ]
+    assert plan.n_bytes == 40
+    assert [s3path.key for s3path in plan.deletes] == ["backup/d.txt"]
+    assert plan.n_same == 1
+
+
+if __name__ == "__main__":
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
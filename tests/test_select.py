@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from fsxpathlib.path import FsxPath
+
+from fakes import ROOT
+
+
+@pytest.fixture
+def share(share):
+    share.add("a", is_dir=True)
+    share.add("x.txt", size=10)
+    share.add("c", is_dir=True)
+    share.add(r"a\b", is_dir=True)
+    share.add(r"a\y.txt", size=10)
+    share.add(r"a\b\z.txt", size=10)
+    return share
+
+
+def relpaths(paths):
+    return [str(p.relative_to(ROOT)) for p in paths]
+
+
+def test_select_max_depth(share):
+    root = FsxPath("server", "share", "root")
+    assert relpaths(root.select().all()) == [
+        "a", "c", "x.txt", r"a\b", r"a\y.txt", r"a\b\z.txt",
+    ]
+    assert relpaths(root.select(recursive=False).all()) == ["a", "c", "x.txt"]
+    assert relpaths(root.select(max_depth=1).all()) == ["a", "c", "x.txt"]
+    assert relpaths(root.select_file(max_depth=2).all()) == ["x.txt", r"a\y.txt"]
+    assert relpaths(root.select_dir(max_depth=2).all()) == ["a", "c", r"a\b"]
+    # max_depth overrides recursive
+    assert len(root.select(recursive=False, max_depth=3).all()) == 6
+    assert root.select_file().one().size == 10
+
+    with pytest.raises(ValueError):
+        root.select(max_depth=0)
+
+
+def test_select_bottom_up(share):
+    root = FsxPath("server", "share", "root")
+    assert relpaths(root.select(topdown=False).all()) == [
+        r"a\b\z.txt", r"a\y.txt", r"a\b", "x.txt", "a", "c",
+    ]
+    assert relpaths(root.select_dir(topdown=False).all()) == [r"a\b", "a", "c"]
+    assert relpaths(root.select(max_depth=1, topdown=False).all()) == ["x.txt", "a", "c"]
+
+
+def test_select_early_termination(share):
+    root = FsxPath("server", "share", "root")
+    with root.select_file() as proxy:
+        assert proxy.one().basename == "x.txt"
+        # no directory handle is open between two directories
+        assert share.n_open == 0
+    assert share.listed == [ROOT.abspath]
+    assert proxy.one_or_none() is None
+
+    # derived proxies close the walk too
+    share.listed.clear()
+    with root.select().map(lambda p: p.basename) as proxy:
+        assert proxy.many(2) == ["a", "c"]
+    assert share.n_open == 0
+    assert share.listed == [ROOT.abspath]
+
+
+def test_select_error(share):
+    root = FsxPath("server", "share", "root")
+
+    # the error of the root directory is raised, even after a partial listing
+    share.broken[ROOT.abspath] = 1
+    with pytest.raises(PermissionError):
+        root.select(recursive=False).all()
+    assert share.n_open == 0
+
+    # sub directories that cannot be listed are skipped
+    share.broken = {ROOT.abspath + r"\a": 1}
+    assert relpaths(root.select().all()) == ["a", "c", "x.txt"]
+    assert share.n_open == 0
+
+
+def test_select_sort_and_group_by(share):
+    root = FsxPath("server", "share", "root")
+    assert relpaths(root.select_dir().sort_by("basename", reverse=True)) == ["c", r"a\b", "a"]
+    groups = root.select().group_by(lambda p: p.ext, "size")
+    assert (groups[".txt"].count, groups[".txt"].sum) == (3, 30)
+    assert groups[""].count == 3
+
+
+def test_walk(share):
+    root = FsxPath("server", "share", "root")
+    dirpaths = [p for p, _, _ in root._walk()]
+    assert dirpaths[0] == root
+    assert relpaths(dirpaths[1:]) == ["a", r"a\b", "c"]
+    assert [len(files) for _, _, files in root._walk(max_depth=2)] == [1, 1, 0]
+    assert relpaths([p for p, _, _ in root._walk(topdown=False) if p != root]) == [
+        r"a\b", "a", "c",
+    ]
+
+    # prune the walk by modifying dirs in place
+    dirpaths = list()
+    for p, dirs, _ in root._walk():
+        dirpaths.append(p)
+        dirs[:] = [d for d in dirs if d.basename != "a"]
+    assert relpaths(dirpaths[1:]) == ["c"]
+
+
+def test_select_symlink(share):
+    root = FsxPath("server", "share", "root")
+    share.add("link", is_dir=True, symlink=True)
+
+    # the link is a directory, but it is not followed
+    share.listed.clear()
+    assert relpaths(root.select_dir().all()) == ["a", "c", "link", r"a\b"]
+    assert ROOT.abspath + r"\link" not in share.listed
+
+    share.listed.clear()
+    listing = root.listing()
+    assert [listing.relpath(i) for i in range(len(listing))] == [
+        "a", "c", "link", "x.txt", r"a\b", r"a\y.txt", r"a\b\z.txt",
+    ]
+    assert listing.is_symlink(2) and (not listing.is_dir(2))
+    assert ROOT.abspath + r"\link" not in share.listed
@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+
+import io
+import random
+
+import pytest
+import smbclient
+from smbprotocol.exceptions import EndOfFile
+
+from fsxpathlib import stream
+from fsxpathlib.path import FsxPath
+from fsxpathlib.stream import (
+    readinto_full, read_pipelined, read_range, read_ranges, coalesce_ranges,
+    iter_records, LineDecoder,
+    ReadAheadReader, open_read_ahead,
+    WriteBehindWriter, open_write_behind,
+)
+
+
+class FakeConnection:
+    """
+    Simulate the credit window and out of band send / receive API of
+    ``smbprotocol.connection.Connection``.
+    """
+
+    def __init__(self, data: bytearray):
+        self.data = data
+        self.supports_multi_credit = True
+        self.max_read_size = 1 << 16
+        self.max_write_size = 1 << 16
+        self.sequence_window = {"low": 0, "high": 4}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_write_at = None
+        self.max_credits = None  # the most credits the server grants
+        self.read_requests = list()  # (offset, length) of the READ requests
+
+    def send(self, message, sid=None, tid=None, credit_request=None):
+        command, offset, payload = message
+        charge = (max(0, len(payload) if command == "write" else payload) - 1) // 65536 + 1
+        assert charge <= self.sequence_window["high"] - self.sequence_window["low"]
+        self.sequence_window["low"] += charge
+        if command == "read":
+            self.read_requests.append((offset, payload))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return dict(message=message, credit_request=credit_request)
+
+    def receive(self, request):
+        self.in_flight -= 1
+        self.sequence_window["high"] += request["credit_request"]
+        if self.max_credits is not None:
+            self.sequence_window["high"] = min(
+                self.sequence_window["high"],
+                self.sequence_window["low"] + self.max_credits,
+            )
+        command, offset, payload = request["message"]
+        if command == "read":
+            if offset >= len(self.data):
+                raise EndOfFile(None)
+            return bytes(self.data[offset:offset + payload])
+        else:
+            if offset == self.fail_write_at:
+                return 0
+            if len(self.data) < offset + len(payload):
+                self.data.extend(b"\x00" * (offset + len(payload) - len(self.data)))
+            self.data[offset:offset + len(payload)] = payload
+            return len(payload)
+
+
+class FakeTreeConnect:
+    class session:
+        session_id = 1
+
+    tree_connect_id = 1
+
+
+class FakeOpen:
+    def __init__(self, data: bytearray):
+        self.connection = FakeConnection(data)
+        self.tree_connect = FakeTreeConnect()
+
+    @property
+    def end_of_file(self):
+        return len(self.connection.data)
+
+    def read(self, offset, length, send=False):
+        return ("read", offset, length), self.connection.receive
+
+    def write(self, data, offset=0, send=False):
+        return ("write", offset, bytes(data)), self.connection.receive
+
+    def flush(self):
+        self.flushed = True
+
+
+class FakeRaw(io.RawIOBase):
+    def __init__(self, data: bytearray, mode="rb"):
+        super(FakeRaw, self).__init__()
+        self.fd = FakeOpen(data)
+        self.name = "fake"
+        self.mode = mode
+
+    def tell(self):
+        if "a" in self.mode:
+            return len(self.fd.connection.data)
+        return 0
+
+    def truncate(self, size):
+        data = self.fd.connection.data
+        del data[size:]
+        data.extend(b"\x00" * (size - len(data)))
+        return size
+
+
+def make_data(n: int) -> bytearray:
+    rnd = random.Random(n)
+    return bytearray(rnd.getrandbits(8) for _ in range(n))
+
+
+class ChoppyRaw(io.RawIOBase):
+    """
+    A raw stream that returns at most 7 bytes per readinto.
+    """
+
+    def __init__(self, data: bytes):
+        super(ChoppyRaw, self).__init__()
+        self._f = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self._f.readinto(memoryview(b)[:7])
+
+
+def test_readinto_full():
+    data = make_data(100)
+    view = memoryview(bytearray(30))
+    f = ChoppyRaw(bytes(data))
+    assert readinto_full(f, view) == 30
+    assert view == data[:30]
+    assert readinto_full(f, view) == 30
+    assert readinto_full(f, view) == 30
+    assert readinto_full(f, view) == 10
+    assert view[:10] == data[90:]
+    assert readinto_full(f, view) == 0
+
+
+def test_coalesce_ranges():
+    assert coalesce_ranges([], gap=10) == []
+    assert coalesce_ranges([(50, 10), (0, 10), (15, 10)], gap=10) == [
+        (0, 25), (50, 10),
+    ]
+    assert coalesce_ranges([(0, 100), (10, 5)], gap=0) == [(0, 100)]
+    with pytest.raises(ValueError):
+        coalesce_ranges([(-1, 10)])
+
+
+def test_read_pipelined():
+    data = make_data(300000)
+    fd = FakeOpen(data)
+    ranges = [(0, 10), (1000, 150000), (299990, 100), (400000, 10)]
+    results = read_pipelined(fd, ranges, chunk_size=20000, depth=4)
+    assert results == [
+        bytes(data[0:10]),
+        bytes(data[1000:151000]),
+        bytes(data[299990:]),
+        b"",
+    ]
+    assert 1 < fd.connection.max_in_flight <= 4
+    assert fd.connection.in_flight == 0
+
+
+def test_read_range_fallback(monkeypatch):
+    data = make_data(1000)
+    opened = list()
+
+    def open_file(path, mode="rb", buffering=-1, **kwargs):
+        assert (mode, buffering) == ("rb", 0)
+        raw = FakeRaw(data)
+        opened.append(raw)
+        return raw
+
+    monkeypatch.setattr(smbclient, "open_file", open_file)
+
+    # the private smbclient API for the compound request is not available
+    monkeypatch.setattr(stream, "SMBFileTransaction", None)
+    assert read_range("fake", 10, 20) == bytes(data[10:30])
+    assert read_range("fake", 990, 20) == bytes(data[990:])
+    assert read_range("fake", 10, 0) == b""
+    assert len(opened) == 2
+
+    # the private smbclient API has changed
+    class SMBFileIO:
+        def __init__(self, path, **kwargs):
+            pass
+
+    monkeypatch.setattr(stream, "SMBFileTransaction", object)
+    monkeypatch.setattr(stream, "SMBFileIO", SMBFileIO)
+    assert read_range("fake", 10, 20) == bytes(data[10:30])
+    assert read_ranges("fake", [(500, 5), (0, 10)]) == [bytes(data[500:505]), bytes(data[:10])]
+    assert len(opened) == 4
+    assert all(raw.closed for raw in opened)
+
+
+def test_iter_records():
+    data = b"alice\r\nbob\r\n\r\ncathy"
+    for chunk_size in [1, 2, 3, 100]:
+        records = list(iter_records(io.BytesIO(data), b"\r\n", chunk_size=chunk_size))
+        assert records == [b"alice", b"bob", b"", b"cathy"]
+
+    text = "α|β||γ|"
+    for chunk_size in [1, 2, 100]:
+        records = list(iter_records(io.StringIO(text), "|", chunk_size=chunk_size))
+        assert records == ["α", "β", "", "γ"]
+
+    assert list(iter_records(io.BytesIO(b""), b"\n")) == []
+    with pytest.raises(ValueError):
+        list(iter_records(io.BytesIO(b""), b""))
+
+
+def test_line_decoder():
+    decoder = LineDecoder("utf-8")
+    data = "α\r\nβ\n\nγ".encode("utf-8")
+    lines = list()
+    for ind in range(len(data)):  # split in the middle of chars and "\r\n"
+        lines.extend(decoder.feed(data[ind:ind + 1]))
+    assert lines == ["α", "β", ""]
+    assert decoder.flush() == ["γ"]
+    assert decoder.flush() == []
+
+    assert decoder.feed(b"abc") == []
+    decoder.reset()
+    assert decoder.feed(b"d\n") == ["d"]
+
+
+class TestReadAheadReader:
+    def test_read(self):
+        data = make_data(300000)
+        raw = FakeRaw(data)
+        reader = ReadAheadReader(raw, chunk_size=20000, depth=4)
+        assert reader.readall() == bytes(data)
+        assert 1 < raw.fd.connection.max_in_flight <= 4
+        assert raw.fd.connection.in_flight == 0
+
+        reader = io.BufferedReader(
+            ReadAheadReader(FakeRaw(data), chunk_size=7000, depth=3),
+            buffer_size=5000,
+        )
+        chunks = list()
+        while True:
+            chunk = reader.read(3333)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        assert b"".join(chunks) == bytes(data)
+
+    def test_read_with_few_credits(self):
+        # a chunk costs 4 credits, the server grants at most 3
+        data = make_data(1000000)
+        raw = FakeRaw(data)
+        connection = raw.fd.connection
+        connection.max_read_size = 1 << 20
+        connection.max_credits = 3
+        connection.sequence_window["high"] = 3
+        reader = ReadAheadReader(raw, chunk_size=1 << 18, depth=4)
+        assert reader.readall() == bytes(data)
+        # the requests are cut by the credits, but nothing is read twice
+        assert max(length for _, length in connection.read_requests) < 1 << 18
+        assert sum(length for _, length in connection.read_requests) == len(data)
+        assert connection.in_flight == 0
+
+    def test_read_truncated(self):
+        data = make_data(100000)
+        reader = ReadAheadReader(FakeRaw(data), chunk_size=10000, depth=4)
+        assert reader.read(100) == bytes(data[:100])
+        del data[50000:]  # truncated after it was opened
+        assert reader.readall() == bytes(data[100:])
+        assert reader.read(100) == b""
+
+    def test_seek(self):
+        data = make_data(100000)
+        raw = FakeRaw(data)
+        reader = ReadAheadReader(raw, chunk_size=10000, depth=4)
+        buf = bytearray(100)
+        reader.readinto(buf)
+        assert buf == data[:100]
+
+        reader.seek(150)  # in current chunk
+        assert reader.read(50) == bytes(data[150:200])
+
+        reader.seek(-100, io.SEEK_END)  # out of prefetched window
+        assert reader.tell() == 99900
+        assert reader.read(1000) == bytes(data[99900:])
+        assert reader.read(1000) == b""
+
+        reader.seek(5)
+        assert reader.readall() == bytes(data[5:])
+        reader.close()
+        assert raw.fd.connection.in_flight == 0
+
+        with pytest.raises(ValueError):
+            reader = ReadAheadReader(FakeRaw(data))
+            reader.seek(-1)
+
+    def test_open_read_ahead(self, monkeypatch):
+        data = bytearray("hello\nworld\n".encode("utf-8") * 1000)
+        monkeypatch.setattr(smbclient, "open_file", lambda *args, **kwargs: FakeRaw(data))
+        with open_read_ahead("fake", mode="rb", chunk_size=1000, depth=2) as f:
+            assert f.read() == bytes(data)
+        with open_read_ahead("fake", mode="r", chunk_size=1000, depth=2) as f:
+            assert f.readline() == "hello\n"
+            assert len(f.readlines()) == 1999
+        with pytest.raises(ValueError):
+            open_read_ahead("fake", mode="wb")
+
+
+class TestWriteBehindWriter:
+    def test_write(self):
+        data = make_data(300000)
+        raw = FakeRaw(bytearray(), mode="wb")
+        writer = WriteBehindWriter(raw, chunk_size=20000, depth=4, preallocate=400000)
+        assert len(raw.fd.connection.data) == 400000
+        buf = bytearray(30000)
+        for offset in range(0, len(data), 30000):
+            n = min(30000, len(data) - offset)
+            buf[:n] = data[offset:offset + n]  # buffer is reused
+            assert writer.write(memoryview(buf)[:n]) == n
+        assert 1 < raw.fd.connection.max_in_flight <= 4
+        writer.flush()
+        assert raw.fd.flushed is True
+        writer.close()
+        assert raw.fd.connection.data == data
+        assert raw.fd.connection.in_flight == 0
+
+    def test_append_preallocate(self):
+        # preallocate smaller than the existing file
+        raw = FakeRaw(bytearray(b"existing"), mode="ab")
+        writer = WriteBehindWriter(raw, chunk_size=3, depth=2, preallocate=4)
+        assert raw.fd.connection.data == b"existing\x00\x00\x00\x00"
+        writer.write(b"more")
+        writer.close()
+        assert raw.fd.connection.data == b"existingmore"
+
+        # less data written than preallocated
+        raw = FakeRaw(bytearray(b"existing"), mode="ab")
+        writer = WriteBehindWriter(raw, chunk_size=3, depth=2, preallocate=100)
+        assert len(raw.fd.connection.data) == 108
+        writer.write(b"more")
+        writer.close()
+        assert raw.fd.connection.data == b"existingmore"
+
+    def test_error(self):
+        raw = FakeRaw(bytearray(), mode="wb")
+        raw.fd.connection.fail_write_at = 100
+        writer = WriteBehindWriter(raw, chunk_size=100, depth=4)
+        writer.write(b"x" * 250)
+        with pytest.raises(OSError):
+            writer.close()
+
+    def test_open_write_behind(self, monkeypatch):
+        data = bytearray()
+        monkeypatch.setattr(smbclient, "open_file", lambda *args, **kwargs: FakeRaw(data, mode="wb"))
+        with open_write_behind("fake", mode="w", chunk_size=1000, depth=2) as f:
+            for _ in range(1000):
+                f.write("hello\n")
+        assert data == b"hello\n" * 1000
+        with pytest.raises(ValueError):
+            open_write_behind("fake", mode="rb")
+        with pytest.raises(ValueError):
+            open_write_behind("fake", mode="w+b")
+
+
+def test_fsx_path_open(monkeypatch):
+    calls = list()
+
+    def open_file(path, mode="rb", **kwargs):
+        calls.append((path, kwargs))
+        return FakeRaw(bytearray(b"hello"), mode=mode)
+
+    monkeypatch.setattr(smbclient, "open_file", open_file)
+    p = FsxPath("server", "share", "a.txt")
+    access = dict(share_access="r", desired_access=1, file_attributes=2)
+    with p.open("rb", read_ahead=2, **access) as f:
+        assert f.read() == b"hello"
+    with p.open("wb", write_behind=2, **access) as f:
+        f.write(b"hello")
+    assert len(calls) == 2
+    for path, kwargs in calls:
+        assert path == p.abspath
+        assert {key: kwargs[key] for key in access} == access
+
+    with pytest.raises(ValueError):
+        p.open("rb", read_ahead=2, file_type="pipe")
+    with pytest.raises(ValueError):
+        p.open("wb", write_behind=2, file_type="pipe")
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+from fsxpathlib.exc import FsxError
+from fsxpathlib.transfer import split_ranges, download_ranged, upload_mmap
+
+from fakes import LocalFile
+
+
+def test_split_ranges():
+    assert split_ranges(0, 10) == []
+    assert split_ranges(10, 10) == [(0, 10)]
+    assert split_ranges(25, 10) == [(0, 10), (10, 10), (20, 5)]
+    with pytest.raises(ValueError):
+        split_ranges(10, 0)
+
+
+def test_download_ranged(tmp_path):
+    data = os.urandom(100000)
+    src = tmp_path / "src.bin"
+    src.write_bytes(data)
+    dst = tmp_path / "dst.bin"
+    dst.write_bytes(b"old content is longer than the new content" * 10000)
+
+    n = download_ranged(LocalFile(str(src)), dst, range_size=7000, workers=4)
+    assert n == len(data)
+    assert dst.read_bytes() == data
+
+    src.write_bytes(b"")
+    assert download_ranged(LocalFile(str(src)), dst) == 0
+    assert dst.read_bytes() == b""
+
+
+def test_download_ranged_cached_stat(tmp_path):
+    src = tmp_path / "src.bin"
+    src.write_bytes(b"x" * 1000)
+    dst = tmp_path / "dst.bin"
+
+    # the stat cached from the listing is used, no extra stat
+    fpath = LocalFile(str(src))
+    fpath._stat_cache = os.stat(str(src))
+    assert download_ranged(fpath, dst, range_size=300, workers=2) == 1000
+    assert fpath.n_stat == 0
+
+    # the file is truncated after the listing
+    src.write_bytes(b"x" * 10)
+    with pytest.raises(EOFError):
+        download_ranged(fpath, dst, range_size=300)
+
+    # the file grows after the listing
+    src.write_bytes(b"x" * 1001)
+    for workers in [1, 2]:
+        with pytest.raises(FsxError):
+            download_ranged(fpath, dst, range_size=300, workers=workers)
+
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    fpath = LocalFile(str(empty))
+    fpath._stat_cache = os.stat(str(empty))
+    empty.write_bytes(b"x")
+    with pytest.raises(FsxError):
+        download_ranged(fpath, dst)
+
+
+def test_upload_mmap(tmp_path):
+    data = os.urandom(100000)
+    src = tmp_path / "src.bin"
+    src.write_bytes(data)
+    dst = tmp_path / "dst.bin"
+
+    assert upload_mmap(src, LocalFile(str(dst))) == len(data)
+    assert dst.read_bytes() == data
+
+    src.write_bytes(b"")
+    assert upload_mmap(src, LocalFile(str(dst))) == 0
+    assert dst.read_bytes() == b""
+
+
+if __name__ == "__main__":
+    import os
+
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])
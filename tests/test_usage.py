@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+from fsxpathlib.path import FsxPath
+from fsxpathlib.usage import disk_usage
+
+from fakes import ROOT, LocalPath, make_tree
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_disk_usage(tmp_path, workers):
+    make_tree(tmp_path)
+    root = LocalPath(str(tmp_path))
+
+    usages = disk_usage(root, depth=0, workers=workers)
+    assert len(usages) == 1
+    assert usages[0].n_files == 5 * (1 + 3 + 9)
+    assert usages[0].n_dirs == 3 + 9
+    assert usages[0].n_bytes == 5 * usages[0].n_files
+    assert usages[0].newest_mtime == 1600000000 + 30 + 4
+
+    usages = disk_usage(root, depth=1, workers=workers)
+    assert [u.fpath.abspath for u in usages] == [
+        str(tmp_path),
+        str(tmp_path / "dir0"),
+        str(tmp_path / "dir1"),
+        str(tmp_path / "dir2"),
+    ]
+    assert usages[0].n_files == 65
+    assert [u.n_files for u in usages[1:]] == [20, 20, 20]
+    assert [u.n_dirs for u in usages[1:]] == [3, 3, 3]
+    assert [u.depth for u in usages] == [0, 1, 1, 1]
+    assert usages[1].newest_mtime == 1600000000 + 20 + 4
+
+    usages = disk_usage(root, depth=5, workers=workers)
+    assert len(usages) == 1 + 3 + 9
+    assert usages[0].n_files == 65
+
+    with pytest.raises(ValueError):
+        disk_usage(root, depth=-1)
+
+
+def test_fsx_path_disk_usage(share):
+    share.add("a", is_dir=True)
+    share.add(r"a\x.txt", size=10)
+    share.add(r"a\b", is_dir=True)
+    share.add(r"a\b\y.txt", size=20)
+    share.add("z.txt", size=30)
+
+    usages = FsxPath("server", "share", "root").disk_usage(depth=1, workers=2)
+    assert [usage.fpath.abspath for usage in usages] == [ROOT.abspath, ROOT.abspath + r"\a"]
+    assert (usages[0].n_files, usages[0].n_dirs, usages[0].n_bytes) == (3, 2, 60)
+    assert (usages[1].n_files, usages[1].n_dirs, usages[1].n_bytes) == (2, 1, 30)
+    assert usages[0].newest_mtime == share.clock.timestamp()  # z.txt
+    assert usages[1].newest_mtime < usages[0].newest_mtime
+
+
+if __name__ == "__main__":
+    basename = os.path.basename(__file__)
+    pytest.main([basename, "-s", "--tb=native"])